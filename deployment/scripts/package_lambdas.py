@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+RevOps AI Framework - Lambda Packaging Script
+=============================================
+
+Builds deployment zips for the Lambda functions in config/config.json.
+Each zip holds the function's source_dir at the archive root plus every
+directory listed in its shared_packages, so shared helper packages such as
+tools/firebolt/firebolt_common are importable from /var/task without a
+layer or sys.path changes.
+
+Usage:
+    python3 package_lambdas.py                              # Package all functions
+    python3 package_lambdas.py --function firebolt_query    # Package one function
+    python3 package_lambdas.py --output dist --update       # Package and update function code
+
+Requirements:
+    - Python 3.9+
+    - AWS CLI configured with SSO profile (only for --update)
+"""
+
+import os
+import sys
+import json
+import zipfile
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+CONFIG_FILE = REPO_ROOT / "deployment" / "config" / "config.json"
+SKIPPED_DIRS = {'__pycache__', '.pytest_cache'}
+SKIPPED_SUFFIXES = ('.pyc', '.pyo')
+
+def load_config() -> Dict[str, Any]:
+    """Load deployment configuration"""
+    with open(CONFIG_FILE, 'r') as f:
+        return json.load(f)
+
+def add_directory(zipf: zipfile.ZipFile, directory: Path, prefix: str = '') -> int:
+    """
+    Add a directory tree to a zip under prefix, skipping caches.
+
+    Args:
+        zipf (zipfile.ZipFile): Open archive
+        directory (Path): Directory to add
+        prefix (str): Path inside the archive ('' for the root)
+
+    Returns:
+        int: Number of files added
+    """
+    added = 0
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+        for file in sorted(files):
+            if file.endswith(SKIPPED_SUFFIXES):
+                continue
+            file_path = Path(root) / file
+            arcname = os.path.join(prefix, os.path.relpath(file_path, directory))
+            zipf.write(file_path, arcname)
+            added += 1
+    return added
+
+def package_function(name: str, function_config: Dict[str, Any], output_dir: Path) -> Path:
+    """
+    Build the deployment zip for one function.
+
+    Args:
+        name (str): Function key in config.json lambda_functions
+        function_config (Dict[str, Any]): Function configuration
+        output_dir (Path): Directory the zip is written to
+
+    Returns:
+        Path: Path of the zip
+    """
+    source_dir = REPO_ROOT / function_config['source_dir']
+    zip_path = output_dir / f"{function_config.get('function_name', name)}.zip"
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        files = add_directory(zipf, source_dir)
+        for package in function_config.get('shared_packages', []):
+            package_dir = REPO_ROOT / package
+            if not (package_dir / '__init__.py').exists():
+                raise FileNotFoundError(f"Shared package not found: {package}")
+            files += add_directory(zipf, package_dir, package_dir.name)
+    print(f"✓ {name}: {zip_path} ({files} files)")
+    return zip_path
+
+def update_function_code(function_config: Dict[str, Any], zip_path: Path, config: Dict[str, Any]) -> None:
+    """Upload a packaged zip as the function's code."""
+    import boto3
+    session = boto3.Session(profile_name=config.get('profile_name'))
+    lambda_client = session.client('lambda', region_name=config.get('region_name', 'us-east-1'))
+    with open(zip_path, 'rb') as f:
+        lambda_client.update_function_code(FunctionName=function_config['function_name'], ZipFile=f.read())
+    print(f"✓ Updated {function_config['function_name']}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Package RevOps Lambda functions')
+    parser.add_argument('--function', help='Function key in config.json (default: all)')
+    parser.add_argument('--output', default='dist', help='Output directory for zips')
+    parser.add_argument('--update', action='store_true', help='Update the deployed function code')
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    functions = config.get('lambda_functions', {})
+    if args.function:
+        if args.function not in functions:
+            print(f"❌ Unknown function: {args.function}")
+            return 1
+        functions = {args.function: functions[args.function]}
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, function_config in functions.items():
+        zip_path = package_function(name, function_config, output_dir)
+        if args.update:
+            update_function_code(function_config, zip_path, config)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+RevOps AI Framework V2 - Query Lambda Benchmark
+
+End-to-end benchmark of the Firebolt query lambda against the offline
+stand-in (firebolt_standin.py). The stand-in runs in a subprocess so its
+memory does not count towards the lambda's; the lambda runs in this process
+exactly as deployed, through lambda_handler, with the result cache bypassed.
+
+For each result size it reports handler latency, peak Python memory
+(tracemalloc), the raw engine response size and the size of the payload the
+handler returns to the agent.
+
+    python benchmark_query_lambda.py
+    python benchmark_query_lambda.py --sizes 10,1000,100000 --iterations 5 --path function
+    python benchmark_query_lambda.py --format columnar --page-size 500 --output results.json
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Dict, Any, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+QUERY_LAMBDA_DIR = os.path.join(BENCHMARK_DIR, '..', 'query_lambda')
+# Parent of firebolt_common, which the deployed zip carries at its root
+FIREBOLT_TOOLS_DIR = os.path.join(BENCHMARK_DIR, '..')
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+HANDLER_PATHS = ('direct', 'function', 'action', 'legacy')
+
+def start_standin(rows: int, latency_ms: float) -> Tuple[subprocess.Popen, str]:
+    """
+    Launch the stand-in in a subprocess and wait for its URL.
+
+    Args:
+        rows (int): Rows to seed
+        latency_ms (float): Artificial per-query server delay
+
+    Returns:
+        Tuple[subprocess.Popen, str]: Process handle and base URL
+    """
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARK_DIR, 'firebolt_standin.py'),
+         '--rows', str(rows), '--port', '0', '--latency-ms', str(latency_ms)],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    ready = json.loads(process.stdout.readline())
+    return process, ready['url']
+
+def build_event(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Wrap query parameters in one of the event formats lambda_handler accepts.
+
+    Args:
+        path (str): 'direct', 'function', 'action' or 'legacy'
+        params (Dict[str, Any]): query_fire parameters
+
+    Returns:
+        Dict[str, Any]: Lambda event
+    """
+    if path == 'direct':
+        return dict(params)
+    as_list = [{'name': name, 'value': value} for name, value in params.items()]
+    if path == 'function':
+        return {'function': 'query_fire', 'actionGroup': 'firebolt_query', 'parameters': as_list}
+    if path == 'action':
+        return {'actionGroup': 'firebolt_query', 'action': 'query_fire', 'body': {'parameters': params}}
+    return {'parameters': as_list}
+
+def response_payload(path: str, response: Dict[str, Any]) -> str:
+    """Serialized body the agent would receive for the given event format."""
+    if path == 'function':
+        return response['response']['functionResponse']['responseBody']['TEXT']['body']
+    if path == 'action':
+        return response['actionGroupOutput']['body']
+    return json.dumps(response, default=str)
+
+def run_case(lambda_module, path: str, size: int, iterations: int, params: Dict[str, Any],
+             measure_memory: bool) -> Dict[str, Any]:
+    """
+    Benchmark one result size.
+
+    Args:
+        lambda_module: Imported query lambda module
+        path (str): Handler event format
+        size (int): Rows to return
+        iterations (int): Timed runs
+        params (Dict[str, Any]): Extra query_fire parameters
+        measure_memory (bool): Track peak allocations with tracemalloc
+
+    Returns:
+        Dict[str, Any]: Latency percentiles, peak memory and payload sizes
+    """
+    event = build_event(path, dict(params, query=f"SELECT * FROM benchmark_rows LIMIT {size}", cache='bypass'))
+    latencies = []
+    peaks = []
+    payload_bytes = 0
+    engine_bytes = 0
+    rows_returned = 0
+
+    for _ in range(iterations):
+        if measure_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()) as captured:
+            response = lambda_module.lambda_handler(event, None)
+            payload = response_payload(path, response)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if measure_memory:
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        result = json.loads(payload)
+        if not result.get('success'):
+            raise RuntimeError(f"Query failed for size {size}: {result.get('error')}")
+        payload_bytes = len(payload.encode('utf-8'))
+        rows_returned = result.get('row_count', 0)
+        # Engine response size comes from the instrumentation record
+        for line in captured.getvalue().splitlines():
+            if line.startswith('{"_aws"'):
+                engine_bytes = json.loads(line).get('Bytes', engine_bytes)
+        del response, payload, result, captured
+
+    return {
+        'rows': size,
+        'rows_returned': rows_returned,
+        'iterations': iterations,
+        'latency_ms_p50': round(statistics.median(latencies), 1),
+        'latency_ms_min': round(min(latencies), 1),
+        'latency_ms_max': round(max(latencies), 1),
+        'peak_memory_mb': round(max(peaks) / (1024 * 1024), 2) if peaks else None,
+        'engine_response_bytes': engine_bytes,
+        'payload_bytes': payload_bytes
+    }
+
+def main():
+    """Run the query lambda benchmark suite"""
+    parser = argparse.ArgumentParser(description='Benchmark the Firebolt query lambda against the offline stand-in')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated result sizes in rows')
+    parser.add_argument('--iterations', type=int, default=3, help='Timed runs per size')
+    parser.add_argument('--path', choices=HANDLER_PATHS, default='direct', help='Handler event format')
+    parser.add_argument('--format', choices=['rows', 'columnar'], default='rows', help='Result layout')
+    parser.add_argument('--page-size', type=int, help='Page size passed to query_fire')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Artificial per-query server delay')
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc (faster, less overhead)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    print(f"Seeding stand-in with {max(sizes):,} rows...")
+    process, url = start_standin(max(sizes), args.latency_ms)
+
+    try:
+        os.environ.update({
+            'FIREBOLT_API_ENDPOINT': url,
+            'FIREBOLT_AUTH_ENDPOINT': f"{url}/oauth/token",
+            'FIREBOLT_ACCOUNT_NAME': 'benchmark',
+            'FIREBOLT_ENGINE_NAME': 'benchmark_engine',
+            'FIREBOLT_DATABASE': 'benchmark_db',
+            # Keep the measured path free of cross-run effects
+            'FIREBOLT_SHARED_STORE_URI': '',
+            'FIREBOLT_PREFLIGHT_MODE': 'off'
+        })
+        sys.path.insert(0, os.path.abspath(FIREBOLT_TOOLS_DIR))
+        sys.path.insert(0, os.path.abspath(QUERY_LAMBDA_DIR))
+        import lambda_function
+
+        # The stand-in accepts any client credentials, so skip Secrets Manager
+        lambda_function.load_firebolt_credentials = lambda secret_name, region_name=None: {
+            'client_id': 'benchmark', 'client_secret': 'benchmark'
+        }
+
+        params = {'format': args.format}
+        if args.page_size:
+            params['page_size'] = args.page_size
+
+        # Warm up: token fetch, connection pool and imports
+        run_case(lambda_function, args.path, min(sizes), 1, params, measure_memory=False)
+
+        results = []
+        print(f"{'rows':>9} {'p50 ms':>10} {'min ms':>10} {'max ms':>10} {'peak MB':>9} {'engine KB':>11} {'payload KB':>11}")
+        for size in sizes:
+            case = run_case(lambda_function, args.path, size, args.iterations, params, not args.no_memory)
+            results.append(case)
+            peak = f"{case['peak_memory_mb']:>9.2f}" if case['peak_memory_mb'] is not None else f"{'-':>9}"
+            print(f"{size:>9,} {case['latency_ms_p50']:>10.1f} {case['latency_ms_min']:>10.1f} "
+                  f"{case['latency_ms_max']:>10.1f} {peak} {case['engine_response_bytes'] / 1024:>11.1f} "
+                  f"{case['payload_bytes'] / 1024:>11.1f}")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'config': {key: value for key, value in vars(args).items() if key != 'output'},
+                    'python': sys.version.split()[0],
+                    'results': results
+                }, f, indent=2)
+            print(f"Results written to {args.output}")
+    finally:
+        process.terminate()
+        process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+RevOps AI Framework V2 - Offline Firebolt Stand-in
+
+Local HTTP server that speaks the same protocol the Firebolt lambdas use:
+
+    POST /oauth/token                         client credentials -> access_token
+    POST /?engine=<engine>&database=<db>      text/plain SQL -> JSON meta/data/statistics
+
+Queries run against SQLite (SQLite SQL dialect), seeded with a synthetic
+opportunity dataset in the benchmark_rows table. Point a lambda at it with:
+
+    FIREBOLT_API_ENDPOINT=http://127.0.0.1:<port>
+    FIREBOLT_AUTH_ENDPOINT=http://127.0.0.1:<port>/oauth/token
+
+Run standalone:
+
+    python firebolt_standin.py --rows 100000 --port 8123
+"""
+
+import json
+import time
+import random
+import sqlite3
+import argparse
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Iterator, Tuple
+
+STANDIN_TOKEN = 'standin-access-token'
+DATASET_TABLE = 'benchmark_rows'
+
+_ACCOUNTS = [f"Account {i:03d}" for i in range(200)]
+_STAGES = ['Prospecting', 'Discovery', 'Evaluation', 'Proposal', 'Negotiation', 'Commit', 'Closed Won', 'Closed Lost']
+_OWNERS = [f"rep{i:02d}@example.com" for i in range(40)]
+
+_FIREBOLT_TYPES = {
+    int: 'bigint',
+    float: 'double precision',
+    str: 'text',
+    bytes: 'bytea'
+}
+
+def generate_rows(count: int, seed: int = 42) -> Iterator[Tuple]:
+    """
+    Deterministic synthetic opportunity rows.
+
+    Args:
+        count (int): Number of rows
+        seed (int): Random seed
+
+    Yields:
+        Tuple: (id, opportunity_id, account_name, stage, amount, close_date, is_won, owner_email, notes)
+    """
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    for i in range(count):
+        stage = rng.choice(_STAGES)
+        yield (
+            i + 1,
+            f"006{i:015x}",
+            rng.choice(_ACCOUNTS),
+            stage,
+            round(rng.uniform(1000, 250000), 2),
+            (start + timedelta(days=rng.randint(0, 900))).isoformat(),
+            1 if stage == 'Closed Won' else 0,
+            rng.choice(_OWNERS),
+            None if rng.random() < 0.3 else f"Follow-up note {rng.randint(1, 10 ** 6)}"
+        )
+
+def seed_dataset(connection: sqlite3.Connection, rows: int) -> None:
+    """
+    Create and fill the benchmark_rows table.
+
+    Args:
+        connection (sqlite3.Connection): Target database
+        rows (int): Number of rows to generate
+    """
+    connection.execute(f"DROP TABLE IF EXISTS {DATASET_TABLE}")
+    connection.execute(f"""
+        CREATE TABLE {DATASET_TABLE} (
+            id INTEGER PRIMARY KEY,
+            opportunity_id TEXT,
+            account_name TEXT,
+            stage TEXT,
+            amount REAL,
+            close_date TEXT,
+            is_won INTEGER,
+            owner_email TEXT,
+            notes TEXT
+        )
+    """)
+    connection.executemany(f"INSERT INTO {DATASET_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", generate_rows(rows))
+    connection.commit()
+
+class FireboltStandIn:
+    """
+    SQLite-backed Firebolt stand-in running on a background thread.
+    """
+
+    def __init__(self, rows: int = 0, port: int = 0, database: str = ':memory:', latency_ms: float = 0):
+        """
+        Initialize the stand-in.
+
+        Args:
+            rows: Rows to seed into benchmark_rows (0 keeps an existing table)
+            port: Port to listen on (0 picks a free port)
+            database: SQLite database path
+            latency_ms: Artificial server-side delay added to every query
+        """
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.latency_ms = latency_ms
+        self.stats = {'queries': 0, 'errors': 0, 'tokens_issued': 0}
+        if rows:
+            seed_dataset(self.connection, rows)
+
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if self.path.startswith('/oauth/token'):
+                    standin.stats['tokens_issued'] += 1
+                    self._send(200, {'access_token': STANDIN_TOKEN, 'expires_in': 3600, 'token_type': 'Bearer'})
+                    return
+                if self.headers.get('Authorization') != f"Bearer {STANDIN_TOKEN}":
+                    self._send(401, {'error': 'Unauthorized', 'message': 'Invalid or missing access token'})
+                    return
+                status, payload = standin.execute(body.decode('utf-8'))
+                self._send(status, payload)
+
+            def _send(self, status: int, payload: Dict[str, Any]):
+                data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def execute(self, sql: str) -> Tuple[int, Dict[str, Any]]:
+        """
+        Run one statement and build a Firebolt-style response.
+
+        Args:
+            sql (str): SQL text (SQLite dialect)
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: HTTP status and JSON payload
+        """
+        start = time.perf_counter()
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        try:
+            with self.lock:
+                cursor = self.connection.execute(sql.strip().rstrip(';'))
+                names = [col[0] for col in cursor.description or []]
+                rows = cursor.fetchall()
+                self.connection.commit()
+        except sqlite3.Error as e:
+            self.stats['errors'] += 1
+            return 400, {'error': f"SQL error: {str(e)}", 'message': 'Query execution failed'}
+
+        self.stats['queries'] += 1
+        meta = []
+        for index, name in enumerate(names):
+            values = [row[index] for row in rows]
+            sample = next((value for value in values if value is not None), None)
+            nullable = ' null' if None in values else ''
+            meta.append({'name': name, 'type': _FIREBOLT_TYPES.get(type(sample), 'text') + nullable})
+        data = [dict(zip(names, row)) for row in rows]
+        elapsed = time.perf_counter() - start
+        return 200, {
+            'meta': meta,
+            'data': data,
+            'rows': len(data),
+            'statistics': {
+                'elapsed': round(elapsed, 6),
+                'rows_read': len(data),
+                'bytes_read': 0,
+                'time_before_execution': 0,
+                'time_to_execute': round(elapsed, 6)
+            }
+        }
+
+    def start(self) -> str:
+        """Serve on a background thread and return the base URL."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    """Run the stand-in until interrupted"""
+    parser = argparse.ArgumentParser(description='Offline Firebolt stand-in backed by SQLite')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows to seed into benchmark_rows')
+    parser.add_argument('--port', type=int, default=8123, help='Port to listen on (0 picks a free port)')
+    parser.add_argument('--database', default=':memory:', help='SQLite database path')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Artificial per-query server delay')
+
+    args = parser.parse_args()
+
+    standin = FireboltStandIn(rows=args.rows, port=args.port, database=args.database, latency_ms=args.latency_ms)
+    # Machine-readable first line so a parent process can discover the port
+    print(json.dumps({'url': standin.url, 'rows': args.rows}), flush=True)
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Shared Firebolt helpers package
+Contains components shared by the Firebolt query, writer and metadata lambdas;
+the Gong retrieval lambda also uses shared_store.
+Packaged into each function's zip at its root (see
+deployment/scripts/package_lambdas.py and shared_packages in config.json).
+"""
@@ -0,0 +1,183 @@
+"""
+RevOps AI Framework V2 - Shared Firebolt Authentication Cache
+
+Module-level credential and OAuth token cache shared by the Firebolt query,
+writer and metadata Lambdas. The cache lives for the lifetime of a warm
+container, so only cold starts and token expiry pay for the Secrets Manager
+and id.app.firebolt.io round trips.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+from typing import Dict, Any, Callable, Tuple
+
+from firebolt_common.http_client import get_http_client
+
+FIREBOLT_AUTH_ENDPOINT = os.environ.get('FIREBOLT_AUTH_ENDPOINT', 'https://id.app.firebolt.io/oauth/token')
+FIREBOLT_AUDIENCE = 'https://api.firebolt.io'
+
+# Refresh the token this many seconds before it actually expires
+TOKEN_EXPIRY_BUFFER = int(os.environ.get('FIREBOLT_TOKEN_EXPIRY_BUFFER', '300'))
+# Re-read the secret periodically so rotated credentials are picked up
+CREDENTIALS_TTL = int(os.environ.get('FIREBOLT_CREDENTIALS_TTL', '900'))
+
+# Guards refreshes so concurrent threads that find the cache expired only
+# trigger a single Secrets Manager / OAuth round trip
+_lock = threading.Lock()
+
+credentials_cache = {
+    'key': None,
+    'credentials': None,
+    'expiry_time': 0
+}
+
+token_cache = {
+    'client_id': None,
+    'access_token': None,
+    'expiry_time': 0
+}
+
+cache_stats = {
+    'credential_hits': 0,
+    'credential_misses': 0,
+    'token_hits': 0,
+    'token_misses': 0
+}
+
+def request_access_token(credentials: Dict[str, str], timeout: int = 10) -> Tuple[str, int]:
+    """
+    Request a new access token using the client credentials OAuth flow.
+
+    Args:
+        credentials (Dict[str, str]): Firebolt credentials containing client_id and client_secret
+        timeout (int): Request timeout in seconds
+
+    Returns:
+        Tuple[str, int]: Access token and its lifetime in seconds
+    """
+    client_id = credentials.get('client_id')
+    client_secret = credentials.get('client_secret')
+
+    if not client_id or not client_secret:
+        raise Exception("Missing client_id or client_secret in credentials")
+
+    data = {
+        'grant_type': 'client_credentials',
+        'client_id': client_id,
+        'client_secret': client_secret,
+        'audience': FIREBOLT_AUDIENCE
+    }
+    form_data = urllib.parse.urlencode(data).encode('ascii')
+
+    try:
+        response = get_http_client().request(
+            'POST',
+            FIREBOLT_AUTH_ENDPOINT,
+            body=form_data,
+            headers={
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Content-Length': str(len(form_data))
+            },
+            idempotent=True,
+            read_timeout=timeout
+        )
+        token_data = json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        error_body = e.read().decode('utf-8') if hasattr(e, 'read') else "No error details"
+        raise Exception(f"Failed to get Firebolt access token - HTTP {e.code}: {error_body}")
+    except Exception as e:
+        raise Exception(f"Failed to get Firebolt access token: {str(e)}")
+
+    token = token_data.get('access_token')
+    if not token:
+        raise Exception("No access_token in response from Firebolt auth endpoint")
+
+    return token, int(token_data.get('expires_in', 3600))
+
+def get_cached_credentials(
+    secret_name: str,
+    region_name: str,
+    loader: Callable[[str, str], Dict[str, str]]
+) -> Dict[str, str]:
+    """
+    Get Firebolt credentials, calling the loader only when the cache is cold or stale.
+
+    Args:
+        secret_name (str): Name of the secret containing client_id and client_secret
+        region_name (str): AWS region where the secret is stored
+        loader (Callable): Uncached loader, called as loader(secret_name, region_name)
+
+    Returns:
+        Dict[str, str]: Dictionary with client credentials
+    """
+    key = f"{region_name}/{secret_name}"
+
+    if credentials_cache['key'] == key and time.time() < credentials_cache['expiry_time']:
+        cache_stats['credential_hits'] += 1
+        return credentials_cache['credentials']
+
+    with _lock:
+        # Another thread may have refreshed while we waited for the lock
+        if credentials_cache['key'] == key and time.time() < credentials_cache['expiry_time']:
+            cache_stats['credential_hits'] += 1
+            return credentials_cache['credentials']
+
+        cache_stats['credential_misses'] += 1
+        credentials = loader(secret_name, region_name)
+        credentials_cache['key'] = key
+        credentials_cache['credentials'] = credentials
+        credentials_cache['expiry_time'] = time.time() + CREDENTIALS_TTL
+        return credentials
+
+def get_cached_token(credentials: Dict[str, str]) -> str:
+    """
+    Get a cached access token or request a new one if it is missing or about to expire.
+
+    Args:
+        credentials (Dict[str, str]): Firebolt credentials containing client_id and client_secret
+
+    Returns:
+        str: Access token for Firebolt API calls
+    """
+    client_id = credentials.get('client_id')
+
+    if (token_cache['access_token'] and token_cache['client_id'] == client_id
+            and time.time() < token_cache['expiry_time']):
+        cache_stats['token_hits'] += 1
+        return token_cache['access_token']
+
+    with _lock:
+        if (token_cache['access_token'] and token_cache['client_id'] == client_id
+                and time.time() < token_cache['expiry_time']):
+            cache_stats['token_hits'] += 1
+            return token_cache['access_token']
+
+        cache_stats['token_misses'] += 1
+        token, expires_in = request_access_token(credentials)
+        # Refresh early, but never treat a short-lived token as already expired
+        buffer = min(TOKEN_EXPIRY_BUFFER, expires_in // 2)
+        token_cache['client_id'] = client_id
+        token_cache['access_token'] = token
+        token_cache['expiry_time'] = time.time() + expires_in - buffer
+        return token
+
+def invalidate_token() -> None:
+    """Drop the cached token, e.g. after the engine rejects it with HTTP 401."""
+    with _lock:
+        token_cache['access_token'] = None
+        token_cache['expiry_time'] = 0
+
+def get_auth_cache_stats() -> Dict[str, Any]:
+    """
+    Snapshot of the credential and token cache counters for response metadata.
+
+    Returns:
+        Dict[str, Any]: Hit/miss counters and remaining token lifetime
+    """
+    stats = dict(cache_stats)
+    stats['token_ttl_seconds'] = max(0, int(token_cache['expiry_time'] - time.time()))
+    return stats
@@ -0,0 +1,245 @@
+"""
+RevOps AI Framework V2 - Shared Firebolt HTTP Client
+
+Keep-alive HTTP client used by the Firebolt query, writer and metadata
+Lambdas. Connections are pooled per host at module level, so warm
+invocations reuse the TCP/TLS session to the Firebolt engine and auth
+endpoints instead of paying a fresh handshake on every call.
+
+Non-idempotent requests (INSERT, MERGE, COPY) are never re-sent once the
+server may have read them. They only reuse a connection that has been idle
+for less than WRITE_IDLE_TIMEOUT, and are retried on a fresh connection only
+when sending on a reused connection failed.
+
+Errors are raised as urllib.error.HTTPError / URLError so callers keep the
+same error handling they used with urllib.request.urlopen.
+"""
+
+import io
+import os
+import ssl
+import time
+import threading
+import http.client
+import urllib.error
+import urllib.parse
+from typing import Dict, Any, Optional, Tuple
+
+CONNECT_TIMEOUT = float(os.environ.get('FIREBOLT_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.environ.get('FIREBOLT_READ_TIMEOUT', '30'))
+MAX_RETRIES = int(os.environ.get('FIREBOLT_HTTP_MAX_RETRIES', '2'))
+POOL_SIZE = int(os.environ.get('FIREBOLT_HTTP_POOL_SIZE', '8'))
+# Drop idle connections before the server-side keep-alive timeout closes them
+IDLE_TIMEOUT = float(os.environ.get('FIREBOLT_HTTP_IDLE_TIMEOUT', '50'))
+# Non-idempotent requests open a fresh connection instead of reusing one idle this long
+WRITE_IDLE_TIMEOUT = float(os.environ.get('FIREBOLT_HTTP_WRITE_IDLE_TIMEOUT', '5'))
+
+# Errors that indicate the connection was reset underneath us
+RETRYABLE_ERRORS = (
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine
+)
+
+class PooledResponse:
+    """
+    Fully-read HTTP response. Mirrors the parts of the urlopen response API
+    the lambdas use (status, headers, read() and context manager support).
+    """
+
+    def __init__(self, status: int, reason: str, headers, body: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._body = body
+
+    def read(self) -> bytes:
+        return self._body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+class FireboltHTTPClient:
+    """
+    Thread-safe HTTP client with a per-host keep-alive connection pool.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        pool_size: int = POOL_SIZE,
+        idle_timeout: float = IDLE_TIMEOUT,
+        write_idle_timeout: float = WRITE_IDLE_TIMEOUT
+    ):
+        """
+        Initialize the HTTP client.
+
+        Args:
+            connect_timeout: Seconds allowed for TCP connect and TLS handshake
+            read_timeout: Default seconds allowed between bytes of the response
+            max_retries: Retries for idempotent requests after a connection reset
+            pool_size: Idle connections kept per host
+            idle_timeout: Idle connections older than this are discarded
+            write_idle_timeout: Non-idempotent requests skip connections idle longer than this
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.write_idle_timeout = write_idle_timeout
+        self._ssl_context = ssl.create_default_context()
+        self._pool = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'connections_created': 0,
+            'connections_reused': 0,
+            'connection_errors': 0,
+            'retries': 0
+        }
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False,
+        read_timeout: Optional[float] = None
+    ) -> PooledResponse:
+        """
+        Send a request over a pooled connection.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            body: Request body
+            headers: Request headers
+            idempotent: Whether the request may be re-sent after a connection reset;
+                other requests are only re-sent when it failed while being sent on a reused connection
+            read_timeout: Override of the default read timeout for this request
+
+        Returns:
+            PooledResponse: Response with the body already read
+
+        Raises:
+            urllib.error.HTTPError: For HTTP status codes >= 400
+            urllib.error.URLError: When the connection fails
+        """
+        parsed = urllib.parse.urlsplit(url)
+        path = parsed.path or '/'
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+
+        attempts = self.max_retries + 1
+        max_idle = self.idle_timeout if idempotent else min(self.idle_timeout, self.write_idle_timeout)
+        for attempt in range(attempts):
+            try:
+                conn, reused = self._acquire(key, max_idle)
+            except OSError as e:
+                self._count('connection_errors')
+                raise urllib.error.URLError(e)
+
+            sent = False
+            try:
+                conn.sock.settimeout(read_timeout or self.read_timeout)
+                conn.request(method, path, body=body, headers=headers or {})
+                sent = True
+                response = conn.getresponse()
+                data = response.read()
+            except RETRYABLE_ERRORS as e:
+                conn.close()
+                self._count('connection_errors')
+                # A request that never left a stale pooled connection was not seen by the server
+                if attempt < attempts - 1 and (idempotent or (reused and not sent)):
+                    self._count('retries')
+                    continue
+                raise urllib.error.URLError(e)
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+
+            if response.status >= 400:
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(data))
+
+            return PooledResponse(response.status, response.reason, response.headers, data)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._lock:
+            for connections in self._pool.values():
+                for conn, _ in connections:
+                    conn.close()
+            self._pool = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of connection reuse counters."""
+        with self._lock:
+            idle = sum(len(connections) for connections in self._pool.values())
+            stats = dict(self.stats)
+        stats['idle_connections'] = idle
+        return stats
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _acquire(self, key: Tuple[str, str, Optional[int]], max_idle: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """Pooled connection idle less than max_idle, or a new one; the flag says whether it was reused."""
+        now = time.time()
+        with self._lock:
+            connections = self._pool.get(key, [])
+            while connections:
+                conn, last_used = connections.pop()
+                if now - last_used < max_idle and conn.sock is not None:
+                    self.stats['connections_reused'] += 1
+                    return conn, True
+                conn.close()
+
+        scheme, host, port = key
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=self.connect_timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.connect_timeout)
+        conn.connect()
+        self._count('connections_created')
+        return conn, False
+
+    def _release(self, key: Tuple[str, str, Optional[int]], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            connections = self._pool.setdefault(key, [])
+            if len(connections) < self.pool_size:
+                connections.append((conn, time.time()))
+                return
+        conn.close()
+
+# Module-level client shared across warm invocations
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client() -> FireboltHTTPClient:
+    """
+    Get the module-level HTTP client, creating it on first use.
+
+    Returns:
+        FireboltHTTPClient: Shared client instance
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = FireboltHTTPClient()
+    return _client
@@ -0,0 +1,141 @@
+"""
+RevOps AI Framework V2 - Shared Blob Store
+
+Minimal key/value blob store used as the shared tier behind the per-container
+caches of the Firebolt lambdas. Backed by an S3 prefix in production, or by a
+local directory as a stand-in for development and offline tests.
+
+Configured with FIREBOLT_SHARED_STORE_URI:
+    s3://bucket/prefix   -> S3Store
+    file:///tmp/path     -> LocalFileStore
+    /tmp/path            -> LocalFileStore
+"""
+
+import os
+import logging
+import tempfile
+from typing import Optional, List
+
+logger = logging.getLogger()
+
+class LocalFileStore:
+    """
+    Blob store on the local filesystem. Keys map to relative file paths.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the local file store.
+
+        Args:
+            root: Directory that holds the blobs
+        """
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        safe_key = key.replace('..', '_').lstrip('/')
+        return os.path.join(self.root, safe_key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        keys = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                key = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+class S3Store:
+    """
+    Blob store on an S3 prefix.
+    """
+
+    def __init__(self, bucket: str, prefix: str = '', client=None):
+        """
+        Initialize the S3 store.
+
+        Args:
+            bucket: S3 bucket name
+            prefix: Key prefix under which all blobs are stored
+            client: Optional boto3 S3 client
+        """
+        if client is None:
+            import boto3
+            client = boto3.client('s3')
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+            return response['Body'].read()
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        keys = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        full_prefix = self._key(prefix)
+        strip = len(self.prefix) + 1 if self.prefix else 0
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=full_prefix):
+            for item in page.get('Contents', []):
+                keys.append(item['Key'][strip:])
+        return keys
+
+def get_shared_store(uri: Optional[str] = None):
+    """
+    Build the shared store described by a URI or FIREBOLT_SHARED_STORE_URI.
+
+    Args:
+        uri: Store URI; falls back to the environment variable
+
+    Returns:
+        LocalFileStore, S3Store or None when no shared tier is configured
+    """
+    uri = uri if uri is not None else os.environ.get('FIREBOLT_SHARED_STORE_URI')
+    if not uri:
+        return None
+
+    try:
+        if uri.startswith('s3://'):
+            bucket, _, prefix = uri[len('s3://'):].partition('/')
+            return S3Store(bucket, prefix)
+        if uri.startswith('file://'):
+            uri = uri[len('file://'):]
+        return LocalFileStore(uri)
+    except Exception as e:
+        logger.warning(f"Shared store unavailable ({uri}): {str(e)}")
+        return None
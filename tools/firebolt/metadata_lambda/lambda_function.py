@@ -8,17 +8,17 @@ import traceback
 from typing import Dict, Any, List, Optional
 import boto3
 
-# Always import urllib as fallback
 import urllib.request
 import urllib.parse
 import urllib.error
 
-# Use requests library for better HTTP handling if available
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+# Shared Firebolt helpers - packaged into the function zip (see
+# deployment/scripts/package_lambdas.py)
+from firebolt_common import auth as firebolt_auth
+from firebolt_common.http_client import get_http_client
+from firebolt_common.shared_store import get_shared_store
+from schema_catalog import get_catalog, table_key, REFRESH_AUTO, REFRESH_FORCE, REFRESH_MODES
+from table_stats import get_stats_cache
 
 # Configure logging
 logger = logging.getLogger()
@@ -31,12 +31,16 @@ FIREBOLT_ACCOUNT_NAME = os.environ.get('FIREBOLT_ACCOUNT_NAME', 'firebolt-dwh')
 FIREBOLT_ENGINE_NAME = os.environ.get('FIREBOLT_ENGINE_NAME', 'dwh_prod_analytics')
 FIREBOLT_DATABASE = os.environ.get('FIREBOLT_DATABASE', 'dwh_prod')
 FIREBOLT_API_REGION = os.environ.get('FIREBOLT_API_REGION', 'us-east-1')
-FIREBOLT_AUTH_ENDPOINT = 'https://id.app.firebolt.io/oauth/token'
-TOKEN_EXPIRY_BUFFER = 300  # 5 minutes buffer before token expiry
 
 # Initialize AWS clients
 secretsmanager = boto3.client('secretsmanager')
 
+# Keep-alive HTTP client shared across warm invocations
+http_client = get_http_client()
+
+# Shared tier (S3 or local directory) for the schema catalog snapshot
+shared_store = get_shared_store()
+
 # Initialize metrics
 metrics = {
     'service': 'firebolt-metadata-lambda',
@@ -45,11 +49,11 @@ metrics = {
     'latency_ms': 0
 }
 
-def get_firebolt_credentials():
+def load_firebolt_credentials(secret_name, region_name=None):
     """Retrieve Firebolt credentials from AWS Secrets Manager"""
     try:
-        logger.info(f"Retrieving Firebolt credentials from secret: {FIREBOLT_CREDENTIALS_SECRET}")
-        response = secretsmanager.get_secret_value(SecretId=FIREBOLT_CREDENTIALS_SECRET)
+        logger.info(f"Retrieving Firebolt credentials from secret: {secret_name}")
+        response = secretsmanager.get_secret_value(SecretId=secret_name)
         secret_string = response['SecretString']
         credentials = json.loads(secret_string)
         
@@ -61,76 +65,18 @@ def get_firebolt_credentials():
             raise Exception(f"Missing required fields in credentials: {', '.join(missing_fields)}")
             
         return credentials
-    except ClientError as e:
+    except Exception as e:
         logger.error(f"Error retrieving secret: {str(e)}")
         raise
 
-def get_firebolt_token(client_id, client_secret):
-    """Get OAuth token from Firebolt API using client credentials flow"""
-    logger.info("Getting Firebolt token using client credentials flow")
-    url = FIREBOLT_AUTH_ENDPOINT
-    
-    # Prepare request data
-    data = {
-        'grant_type': 'client_credentials',
-        'client_id': client_id,
-        'client_secret': client_secret,
-        'audience': 'https://api.firebolt.io'
-    }
-    
-    data = urllib.parse.urlencode(data).encode('ascii')
-    
-    # Create request
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            'Content-Type': 'application/x-www-form-urlencoded'
-        },
-        method='POST'
-    )
-    
-    try:
-        # Send request and get response
-        with urllib.request.urlopen(req) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
-        
-        # Extract token and expiry
-        token = response_data.get('access_token')
-        expires_in = response_data.get('expires_in', 3600)
-        expiry_time = time.time() + expires_in - TOKEN_EXPIRY_BUFFER
-        
-        if not token:
-            raise Exception("No access token in response")
-        
-        logger.info("Successfully obtained Firebolt token")
-        return token, expiry_time
-        
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8') if hasattr(e, 'read') else "No error details"
-        error_msg = f"Failed to get Firebolt token - HTTP {e.code}: {error_body}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
-    except Exception as e:
-        error_msg = f"Failed to get Firebolt token: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
-
-# Cache for Firebolt token
-token_cache = {
-    'access_token': None,
-    'expiry_time': 0
-}
+def get_firebolt_credentials():
+    """Get Firebolt credentials, cached for the lifetime of the warm container"""
+    region_name = os.environ.get('AWS_REGION', 'us-east-1')
+    return firebolt_auth.get_cached_credentials(FIREBOLT_CREDENTIALS_SECRET, region_name, load_firebolt_credentials)
 
 def get_cached_token(credentials):
     """Get a cached token or request a new one if expired"""
-    current_time = time.time()
-    if token_cache['access_token'] is None or current_time >= token_cache['expiry_time']:
-        token, expiry_time = get_firebolt_token(credentials['client_id'], credentials['client_secret'])
-        token_cache['access_token'] = token
-        token_cache['expiry_time'] = expiry_time
-    
-    return token_cache['access_token']
+    return firebolt_auth.get_cached_token(credentials)
 
 def execute_firebolt_query(token, account_name=None, engine_name=None, database=None, query=None):
     """Execute a query against Firebolt REST API with retry and better error handling"""
@@ -191,59 +137,33 @@ def execute_firebolt_query(token, account_name=None, engine_name=None, database=
             try:
                 logger.info(f"Attempt {attempt + 1}/{max_attempts} for {endpoint}")
                 
-                if REQUESTS_AVAILABLE:
-                    # Use requests library if available
-                    logger.info(f"Using requests library to connect to {endpoint}")
-                    response = requests.post(
-                        endpoint, 
-                        data=query_data,  # Send raw SQL as text/plain
-                        headers=headers,
-                        timeout=timeout
-                    )
-                    
-                    # Check if the request was successful
-                    response.raise_for_status()
+                # Use the shared keep-alive client so warm invocations reuse connections
+                with http_client.request(
+                    'POST',
+                    endpoint,
+                    body=query_data,  # Send raw SQL as text/plain
+                    headers=headers,
+                    idempotent=True,
+                    read_timeout=timeout
+                ) as response:
+                    response_data = response.read().decode('utf-8')
+                    logger.info(f"Query successful with status code: {response.status}")
+                    return json.loads(response_data)
                     
-                    logger.info(f"Query successful with status code: {response.status_code}")
-                    return response.json()
+            except urllib.error.HTTPError as e:
+                logger.error(f"HTTP error with URL {endpoint}: {str(e)}")
                 
-                else:
-                    # Fall back to urllib if requests is not available
-                    logger.info(f"Using urllib to connect to {endpoint}")
-                    req = urllib.request.Request(
-                        endpoint, 
-                        data=query_data,  # Send raw SQL as text/plain
-                        headers=headers
-                    )
-                    
-                    with urllib.request.urlopen(req, timeout=timeout) as response:
-                        response_data = response.read().decode('utf-8')
-                        logger.info(f"Query successful with urllib")
-                        return json.loads(response_data)
-                    
-            except requests.exceptions.RequestException as e:
-                if REQUESTS_AVAILABLE:
-                    logger.error(f"Requests error with URL {endpoint}: {str(e)}")
-                    
-                    # Don't retry certain client errors
-                    if hasattr(e, 'response') and e.response is not None:
-                        if 400 <= e.response.status_code < 500 and e.response.status_code != 429:
-                            last_error = f"HTTP Error {e.response.status_code}: {e.response.text}"
-                            break
-                    
-                    last_error = f"Connection error: {str(e)}"
-                    
-            except (urllib.error.HTTPError, urllib.error.URLError, socket.timeout) as e:
-                if not REQUESTS_AVAILABLE:
-                    logger.error(f"URLlib error with URL {endpoint}: {str(e)}")
-                    
-                    if isinstance(e, urllib.error.HTTPError):
-                        error_body = e.read().decode('utf-8') if hasattr(e, 'read') else "No error details"
-                        if e.code < 500 and e.code != 429:
-                            last_error = f"HTTP Error {e.code}: {error_body}"
-                            break
-                    
-                    last_error = f"Connection error: {str(e)}"
+                # Don't retry certain client errors
+                error_body = e.read().decode('utf-8') if hasattr(e, 'read') else "No error details"
+                if e.code < 500 and e.code != 429:
+                    last_error = f"HTTP Error {e.code}: {error_body}"
+                    break
+                
+                last_error = f"HTTP Error {e.code}: {error_body}"
+                
+            except (urllib.error.URLError, socket.timeout) as e:
+                logger.error(f"Connection error with URL {endpoint}: {str(e)}")
+                last_error = f"Connection error: {str(e)}"
                 
             except Exception as e:
                 logger.error(f"Unexpected error with URL {endpoint}: {str(e)}")
@@ -260,51 +180,76 @@ def execute_firebolt_query(token, account_name=None, engine_name=None, database=
     logger.error(error_msg)
     raise Exception(error_msg)
 
-def get_database_metadata(token, account_name, engine_name, database):
-    """Get metadata for a specific database"""
-    query = f"""
-    SELECT table_schema, table_name, column_name, data_type
-    FROM information_schema.columns
-    WHERE table_catalog = '{database}'
-    ORDER BY table_schema, table_name, ordinal_position
+def get_database_metadata(token, account_name, engine_name, database, refresh=REFRESH_AUTO):
     """
-    
-    result = execute_firebolt_query(token, account_name, engine_name, database, query)
-    
-    # Process and structure the metadata
-    metadata = {}
-    for row in result.get('data', []):
-        schema = row[0]
-        table = row[1]
-        column = row[2]
-        data_type = row[3]
-        
-        if schema not in metadata:
-            metadata[schema] = {}
-        
-        if table not in metadata[schema]:
-            metadata[schema][table] = {}
-            
-        metadata[schema][table][column] = data_type
-    
-    return metadata
+    Get metadata for a specific database from the schema catalog snapshot.
+    The engine is only queried when the snapshot is missing or stale, and then
+    only changed tables are re-read.
+    """
+    catalog = get_catalog(database, shared_store)
+    catalog.ensure_fresh(
+        lambda query: execute_firebolt_query(token, account_name, engine_name, database, query),
+        refresh
+    )
+    metrics['catalog'] = catalog.info()
+    return catalog.get_metadata()
 
-def get_table_statistics(token, account_name, engine_name, database, schema, table):
-    """Get statistics for a specific table"""
-    query = f"""
-    SELECT COUNT(*) as row_count FROM {database}.{schema}.{table}
+def search_catalog(token, account_name, engine_name, database, schema=None, table=None, column=None,
+                   refresh=REFRESH_AUTO):
+    """Find tables by schema, table name or column name using the in-memory catalog index"""
+    catalog = get_catalog(database, shared_store)
+    catalog.ensure_fresh(
+        lambda query: execute_firebolt_query(token, account_name, engine_name, database, query),
+        refresh
+    )
+    metrics['catalog'] = catalog.info()
+    matches = catalog.find(schema=schema, table=table, column=column)
+    return {
+        'matches': matches,
+        'match_count': len(matches),
+        'catalog_version': catalog.snapshot.get('version', 0)
+    }
+
+def get_table_statistics(token, account_name, engine_name, database, tables, exact=False):
     """
+    Get row-count statistics for one or more tables from the statistics cache.
+    Stale entries are refreshed from engine metadata (approximate) in a single
+    query; exact counts are computed in batched COUNT(*) queries only when requested.
+    A table without a metadata estimate returns its stale stat or a pending
+    marker until refresh_table_stats counts it; a failed lookup carries an error.
     
-    result = execute_firebolt_query(token, account_name, engine_name, database, query)
-    
-    # Extract row count
-    row_count = 0
-    if result.get('data') and len(result['data']) > 0:
-        row_count = result['data'][0][0]
+    Args:
+        database: Database name
+        tables: List of (schema, table) pairs
+        exact: Require exact counts instead of metadata estimates
     
-    return {
-        "row_count": row_count
-    }
+    Returns:
+        Dict: Stats keyed by "schema.table", each with row_count, approximate, source and
+            refreshed_at, or row_count None with 'pending' or 'error'
+    """
+    cache = get_stats_cache(database, shared_store)
+    stats = cache.get_stats(
+        tables,
+        lambda query: execute_firebolt_query(token, account_name, engine_name, database, query),
+        exact
+    )
+    metrics['table_stats'] = cache.info()
+    return stats
+
+def refresh_table_statistics(token, account_name, engine_name, database, tables=None):
+    """
+    Batch refresh of exact row counts, intended for scheduled invocations.
+    Without an explicit table list every table in the schema catalog is refreshed.
+    """
+    run_query = lambda query: execute_firebolt_query(token, account_name, engine_name, database, query)
+    if not tables:
+        catalog = get_catalog(database, shared_store)
+        catalog.ensure_fresh(run_query, REFRESH_AUTO)
+        tables = [(entry['schema'], entry['table']) for entry in catalog.snapshot['tables'].values()]
+    cache = get_stats_cache(database, shared_store)
+    result = cache.refresh_exact(tables, run_query)
+    metrics['table_stats'] = cache.info()
+    return result
 
 def describe_table_schema(token, account_name, engine_name, database, schema, table):
     """Describe the schema of a specific table"""
@@ -326,6 +271,65 @@ def describe_table_schema(token, account_name, engine_name, database, schema, ta
     
     return columns
 
+def describe_tables(token, account_name, engine_name, database, tables):
+    """
+    Describe many tables with a single information_schema.columns query
+    instead of one DESCRIBE round trip per table. Results are merged into
+    the schema catalog.
+    
+    Args:
+        database: Database name
+        tables: List of (schema, table) pairs
+    
+    Returns:
+        Dict: Columns per "schema.table" in the describe_table_schema format, plus tables not found
+    """
+    catalog = get_catalog(database, shared_store)
+    keys = list(dict.fromkeys(table_key(schema, table) for schema, table in tables))
+    columns = catalog.describe_tables(
+        lambda query: execute_firebolt_query(token, account_name, engine_name, database, query),
+        keys
+    )
+    metrics['catalog'] = catalog.info()
+    return {
+        'tables': {
+            key: [
+                {
+                    "name": col['name'],
+                    "type": col['type'],
+                    "nullable": col['nullable'],
+                    "default": col['default']
+                }
+                for col in columns[key]
+            ]
+            for key in keys if key in columns
+        },
+        'not_found': [key for key in keys if key not in columns]
+    }
+
+def parse_table_list(body):
+    """
+    Read the requested tables from a request body: a 'tables' list of
+    "schema.table" strings or {"schema", "table"} objects (optionally a JSON
+    string), plus a single 'schema'/'table' pair.
+    
+    Returns:
+        List of (schema, table) pairs, or None if any entry is malformed
+    """
+    tables = body.get('tables') or []
+    try:
+        if isinstance(tables, str):
+            tables = json.loads(tables)
+        pairs = [(entry['schema'], entry['table']) if isinstance(entry, dict)
+                 else tuple(entry.split('.', 1)) for entry in tables]
+    except (KeyError, ValueError, AttributeError, TypeError):
+        return None
+    if body.get('schema') and body.get('table'):
+        pairs.append((body['schema'], body['table']))
+    if any(len(pair) != 2 or not all(pair) for pair in pairs):
+        return None
+    return pairs
+
 def list_databases(token, account_name, engine_name):
     """List all databases accessible by the engine"""
     query = """
@@ -395,6 +399,7 @@ def lambda_handler(event, context):
                 
                 metrics['successful_requests'] += 1
                 metrics['latency_ms'] = int((time.time() - start_time) * 1000)
+                metrics['auth_cache'] = firebolt_auth.get_auth_cache_stats()
                 
                 return result
             except Exception as query_error:
@@ -402,6 +407,7 @@ def lambda_handler(event, context):
                 logger.error(f"Error executing query: {error_msg}")
                 metrics['failed_requests'] += 1
                 metrics['latency_ms'] = int((time.time() - start_time) * 1000)
+                metrics['auth_cache'] = firebolt_auth.get_auth_cache_stats()
                 
                 return {
                     'statusCode': 500,
@@ -410,13 +416,29 @@ def lambda_handler(event, context):
                         'metrics': metrics
                     })
                 }
-        else:
-            logger.error("No query parameter found in event")
+        
+        # Operation requests - the body may arrive as a JSON string (API Gateway)
+        body = event.get('body', event)
+        if isinstance(body, str):
+            body = json.loads(body or '{}')
+        operation = body.get('operation')
+        
+        if not operation:
+            logger.error("No query or operation parameter found in event")
             metrics['failed_requests'] += 1
             return {
                 'statusCode': 400,
                 'body': json.dumps({
-                    'error': "Missing required 'query' parameter"
+                    'error': "Missing required 'query' or 'operation' parameter"
+                })
+            }
+        
+        refresh = (body.get('refresh') or REFRESH_AUTO).lower()
+        if refresh not in REFRESH_MODES:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({
+                    'error': f"Invalid refresh mode: {refresh}. Supported modes: {', '.join(REFRESH_MODES)}"
                 })
             }
         
@@ -484,7 +506,14 @@ def lambda_handler(event, context):
                         'error': 'Missing required parameter: database'
                     })
                 }
-            result = get_database_metadata(token, account_name, engine_name, database)
+            result = get_database_metadata(token, account_name, engine_name, database, refresh)
+        
+        elif operation in ('search_catalog', 'refresh_catalog'):
+            database = body.get('database') or FIREBOLT_DATABASE
+            if operation == 'refresh_catalog':
+                refresh = REFRESH_FORCE
+            result = search_catalog(token, account_name, engine_name, database,
+                                    body.get('schema'), body.get('table'), body.get('column'), refresh)
         
         elif operation == 'describe_table':
             database = body.get('database')
@@ -501,20 +530,41 @@ def lambda_handler(event, context):
             
             result = describe_table_schema(token, account_name, engine_name, database, schema, table)
         
-        elif operation == 'get_table_stats':
-            database = body.get('database')
-            schema = body.get('schema')
-            table = body.get('table')
+        elif operation == 'describe_tables':
+            database = body.get('database') or FIREBOLT_DATABASE
+            table_pairs = parse_table_list(body)
             
-            if not all([database, schema, table]):
+            if not database or not table_pairs:
                 return {
                     'statusCode': 400,
                     'body': json.dumps({
-                        'error': 'Missing required parameters: database, schema, table'
+                        'error': 'Missing required parameters: database, tables'
+                    })
+                }
+            
+            result = describe_tables(token, account_name, engine_name, database, table_pairs)
+        
+        elif operation in ('get_table_stats', 'refresh_table_stats'):
+            database = body.get('database') or FIREBOLT_DATABASE
+            table_pairs = parse_table_list(body)
+            if not database or table_pairs is None or (operation == 'get_table_stats' and not table_pairs):
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({
+                        'error': 'Missing required parameters: database and schema/table or tables'
                     })
                 }
             
-            result = get_table_statistics(token, account_name, engine_name, database, schema, table)
+            if operation == 'refresh_table_stats':
+                result = refresh_table_statistics(token, account_name, engine_name, database, table_pairs)
+            else:
+                exact = str(body.get('exact', False)).lower() == 'true'
+                result = get_table_statistics(token, account_name, engine_name, database, table_pairs, exact)
+                if not body.get('tables') and len(table_pairs) == 1:
+                    # Single-table requests keep the original flat shape (row_count at the top level)
+                    result = result[f"{table_pairs[0][0]}.{table_pairs[0][1]}"]
+                    if 'error' in result:
+                        raise Exception(f"Row count failed for {result['schema']}.{result['table']}: {result['error']}")
         
         else:
             return {
@@ -527,6 +577,7 @@ def lambda_handler(event, context):
         # Record metrics
         metrics['successful_requests'] += 1
         metrics['latency_ms'] = int((time.time() - start_time) * 1000)
+        metrics['auth_cache'] = firebolt_auth.get_auth_cache_stats()
         
         # Return successful response
         return {
@@ -545,6 +596,7 @@ def lambda_handler(event, context):
         # Record metrics
         metrics['failed_requests'] += 1
         metrics['latency_ms'] = int((time.time() - start_time) * 1000)
+        metrics['auth_cache'] = firebolt_auth.get_auth_cache_stats()
         
         logger.error(f"Error processing request: {str(e)}")
         logger.error(traceback.format_exc())
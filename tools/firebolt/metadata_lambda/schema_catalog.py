@@ -0,0 +1,402 @@
+"""
+RevOps AI Framework V2 - Firebolt Schema Catalog
+
+Persisted, incrementally refreshed snapshot of a database's tables and
+columns for the metadata lambda. The snapshot is stored in /tmp and in the
+shared tier (S3 prefix or local directory) with a version stamp, and served
+from an in-memory index so schema discovery lookups never touch the engine.
+
+A refresh lists tables with their DDL timestamp and column count in one
+query, then re-reads columns only for tables that were added or changed.
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger()
+
+CATALOG_DIR = os.environ.get('FIREBOLT_CATALOG_DIR', os.path.join(tempfile.gettempdir(), 'firebolt-catalog'))
+# Snapshots younger than this are served without checking the engine
+CATALOG_MAX_AGE_SECONDS = int(os.environ.get('FIREBOLT_CATALOG_MAX_AGE', '900'))
+# Above this share of changed tables a full column scan is cheaper than IN lists
+FULL_SCAN_CHANGE_RATIO = 0.5
+IN_LIST_CHUNK_SIZE = 500
+SHARED_KEY_PREFIX = 'catalog'
+
+REFRESH_AUTO = 'auto'
+REFRESH_FORCE = 'force'
+REFRESH_NEVER = 'never'
+REFRESH_MODES = (REFRESH_AUTO, REFRESH_FORCE, REFRESH_NEVER)
+
+def sql_literal(value: str) -> str:
+    """Quote a value as a SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+def row_values(row: Any, names: List[str]) -> Tuple:
+    """
+    Read a result row that may be returned as a list or as a column-keyed dict.
+
+    Args:
+        row: Row from the 'data' array of a Firebolt response
+        names: Column names in select-list order
+
+    Returns:
+        Tuple: Values in select-list order
+    """
+    if isinstance(row, dict):
+        return tuple(row.get(name) for name in names)
+    return tuple(row[index] if index < len(row) else None for index in range(len(names)))
+
+def table_key(schema: str, table: str) -> str:
+    return f"{schema}.{table}"
+
+class SchemaCatalog:
+    """
+    Versioned table/column snapshot for one database with an in-memory index.
+    """
+
+    def __init__(self, database: str, shared_store=None, local_dir: str = CATALOG_DIR,
+                 max_age_seconds: int = CATALOG_MAX_AGE_SECONDS):
+        """
+        Initialize the catalog.
+
+        Args:
+            database: Database the snapshot describes
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            local_dir: Directory for the /tmp copy of the snapshot
+            max_age_seconds: Age after which an 'auto' lookup triggers a refresh
+        """
+        self.database = database
+        self.shared_store = shared_store
+        self.local_path = os.path.join(local_dir, f"{database}.json")
+        self.max_age_seconds = max_age_seconds
+        self.snapshot = {'database': database, 'version': 0, 'refreshed_at': 0, 'tables': {}}
+        self.stats = {'lookups': 0, 'refreshes': 0, 'tables_reread': 0, 'describe_queries': 0, 'loaded_from': None}
+        self._lock = threading.Lock()
+        self._index_columns = {}
+        self._index_schemas = {}
+        self._loaded = False
+
+    # Persistence
+    def load(self) -> None:
+        """Load the newest snapshot available from /tmp or the shared tier."""
+        candidates = []
+        try:
+            with open(self.local_path, 'r') as f:
+                candidates.append(('local', json.load(f)))
+        except (FileNotFoundError, ValueError):
+            pass
+        if self.shared_store is not None:
+            try:
+                blob = self.shared_store.get(f"{SHARED_KEY_PREFIX}/{self.database}.json")
+                if blob:
+                    candidates.append(('shared', json.loads(blob.decode('utf-8'))))
+            except Exception as e:
+                logger.warning(f"Catalog shared tier read failed: {str(e)}")
+
+        best = max(candidates, key=lambda c: (c[1].get('version', 0), c[1].get('refreshed_at', 0)), default=None)
+        if best and (best[1].get('version', 0), best[1].get('refreshed_at', 0)) > \
+                (self.snapshot['version'], self.snapshot['refreshed_at']):
+            self.snapshot = best[1]
+            self.stats['loaded_from'] = best[0]
+            self._rebuild_index()
+        self._loaded = True
+
+    def save(self) -> None:
+        """Write the snapshot to /tmp and the shared tier."""
+        data = json.dumps(self.snapshot, separators=(',', ':'), default=str)
+        try:
+            os.makedirs(os.path.dirname(self.local_path), exist_ok=True)
+            tmp_path = f"{self.local_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self.local_path)
+        except OSError as e:
+            logger.warning(f"Catalog local write failed: {str(e)}")
+        if self.shared_store is not None:
+            try:
+                self.shared_store.put(f"{SHARED_KEY_PREFIX}/{self.database}.json", data.encode('utf-8'))
+            except Exception as e:
+                logger.warning(f"Catalog shared tier write failed: {str(e)}")
+
+    # Refresh
+    def ensure_fresh(self, run_query: Callable[[str], Dict[str, Any]], refresh: str = REFRESH_AUTO) -> bool:
+        """
+        Make sure the snapshot is usable, refreshing it when required.
+
+        Args:
+            run_query: Executes SQL against the engine and returns the raw response
+            refresh: 'auto' refreshes when stale or empty, 'force' always, 'never' only loads
+
+        Returns:
+            bool: True when the engine was queried
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            if refresh == REFRESH_NEVER:
+                return False
+            age = time.time() - self.snapshot.get('refreshed_at', 0)
+            if refresh == REFRESH_AUTO and self.snapshot['tables'] and age < self.max_age_seconds:
+                return False
+            self._refresh(run_query)
+            return True
+
+    def _refresh(self, run_query: Callable[[str], Dict[str, Any]]) -> None:
+        database = sql_literal(self.database)
+        listing_names = ['table_schema', 'table_name', 'table_type', 'last_altered', 'created', 'column_count']
+        listing = run_query(f"""
+    SELECT t.table_schema, t.table_name, t.table_type, t.last_altered, t.created, COUNT(c.column_name) AS column_count
+    FROM information_schema.tables t
+    LEFT JOIN information_schema.columns c
+      ON c.table_schema = t.table_schema AND c.table_name = t.table_name AND c.table_catalog = t.table_catalog
+    WHERE t.table_catalog = {database}
+    GROUP BY t.table_schema, t.table_name, t.table_type, t.last_altered, t.created
+    """)
+
+        current = {}
+        for row in listing.get('data', []):
+            schema, table, table_type, last_altered, created, column_count = row_values(row, listing_names)
+            current[table_key(schema, table)] = {
+                'schema': schema,
+                'table': table,
+                'table_type': table_type,
+                'ddl_timestamp': str(last_altered or created or ''),
+                'column_count': int(column_count or 0)
+            }
+
+        known = self.snapshot['tables']
+        changed = [
+            key for key, info in current.items()
+            if key not in known
+            or known[key].get('ddl_timestamp') != info['ddl_timestamp']
+            or known[key].get('column_count') != info['column_count']
+        ]
+        removed = [key for key in known if key not in current]
+
+        if changed:
+            full_scan = not known or len(changed) > len(current) * FULL_SCAN_CHANGE_RATIO
+            columns = self._read_columns(run_query, None if full_scan else changed)
+            for key in changed:
+                entry = dict(current[key])
+                entry['columns'] = columns.get(key, [])
+                known[key] = entry
+            self.stats['tables_reread'] += len(changed)
+
+        for key in removed:
+            del known[key]
+
+        self.snapshot['refreshed_at'] = time.time()
+        if changed or removed:
+            self.snapshot['version'] = self.snapshot.get('version', 0) + 1
+            self._rebuild_index()
+        self.stats['refreshes'] += 1
+        logger.info(f"Catalog {self.database} refreshed: version {self.snapshot['version']}, "
+                    f"{len(changed)} changed, {len(removed)} removed, {len(known)} tables")
+        self.save()
+
+    def _read_columns(self, run_query: Callable[[str], Dict[str, Any]],
+                      table_keys: Optional[List[str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Read column definitions, for all tables or only the given ones.
+
+        Args:
+            run_query: Executes SQL against the engine
+            table_keys: 'schema.table' keys to read, or None for the whole database
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Columns per table key, in ordinal order
+        """
+        if table_keys is None:
+            filters = ['']
+        else:
+            filters = [
+                "AND table_schema || '.' || table_name IN (" +
+                ', '.join(sql_literal(key) for key in table_keys[i:i + IN_LIST_CHUNK_SIZE]) + ")"
+                for i in range(0, len(table_keys), IN_LIST_CHUNK_SIZE)
+            ]
+
+        columns = {}
+        for table_filter in filters:
+            result = run_query(f"""
+    SELECT table_schema, table_name, column_name, data_type, is_nullable, column_default, ordinal_position
+    FROM information_schema.columns
+    WHERE table_catalog = {sql_literal(self.database)} {table_filter}
+    ORDER BY table_schema, table_name, ordinal_position
+    """)
+            self._collect_columns(result, columns)
+        return columns
+
+    @staticmethod
+    def _collect_columns(result: Dict[str, Any], columns: Dict[str, List[Dict[str, Any]]]) -> None:
+        names = ['table_schema', 'table_name', 'column_name', 'data_type', 'is_nullable', 'column_default', 'ordinal_position']
+        for row in result.get('data', []):
+            schema, table, column, data_type, is_nullable, default, ordinal = row_values(row, names)
+            columns.setdefault(table_key(schema, table), []).append({
+                'name': column,
+                'type': data_type,
+                'nullable': str(is_nullable).upper() in ('YES', 'TRUE', '1'),
+                'default': default,
+                'ordinal': ordinal
+            })
+
+    def _rebuild_index(self) -> None:
+        columns = {}
+        schemas = {}
+        for key, entry in self.snapshot['tables'].items():
+            schemas.setdefault(entry['schema'], []).append(key)
+            for col in entry.get('columns', []):
+                columns.setdefault(str(col['name']).lower(), []).append(key)
+        self._index_columns = columns
+        self._index_schemas = schemas
+
+    # Lookups
+    def get_metadata(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """
+        Nested {schema: {table: {column: data_type}}} view of the snapshot.
+
+        Returns:
+            Dict: Same structure get_database_metadata has always returned
+        """
+        self.stats['lookups'] += 1
+        metadata = {}
+        for entry in self.snapshot['tables'].values():
+            metadata.setdefault(entry['schema'], {})[entry['table']] = {
+                col['name']: col['type'] for col in entry.get('columns', [])
+            }
+        return metadata
+
+    def get_table(self, schema: str, table: str) -> Optional[Dict[str, Any]]:
+        """
+        Snapshot entry for one table.
+
+        Args:
+            schema: Schema name
+            table: Table name
+
+        Returns:
+            Optional[Dict[str, Any]]: Table entry with its columns, or None
+        """
+        self.stats['lookups'] += 1
+        return self.snapshot['tables'].get(table_key(schema, table))
+
+    def find(self, schema: Optional[str] = None, table: Optional[str] = None,
+             column: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search the index. Table and column matches are case-insensitive
+        substrings; schema must match exactly.
+
+        Args:
+            schema: Restrict to this schema
+            table: Table name fragment
+            column: Column name fragment
+
+        Returns:
+            List[Dict[str, Any]]: Matching tables with their (matching) columns
+        """
+        self.stats['lookups'] += 1
+        tables = self.snapshot['tables']
+        if schema is not None:
+            keys = list(self._index_schemas.get(schema, []))
+        else:
+            keys = list(tables.keys())
+
+        if column:
+            # Scan distinct column names rather than every table's column list
+            fragment = column.lower()
+            with_column = {key for name, matches in self._index_columns.items() if fragment in name for key in matches}
+            keys = [key for key in keys if key in with_column]
+
+        if table:
+            fragment = table.lower()
+            keys = [key for key in keys if fragment in tables[key]['table'].lower()]
+
+        matches = []
+        for key in sorted(keys):
+            entry = tables[key]
+            columns = entry.get('columns', [])
+            if column:
+                columns = [col for col in columns if column.lower() in str(col['name']).lower()]
+            matches.append({
+                'schema': entry['schema'],
+                'table': entry['table'],
+                'table_type': entry.get('table_type'),
+                'column_count': entry.get('column_count'),
+                'columns': columns
+            })
+        return matches
+
+    def update_tables(self, columns_by_table: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        Merge freshly read column definitions into the snapshot.
+
+        Args:
+            columns_by_table: Columns per 'schema.table' key
+        """
+        if not columns_by_table:
+            return
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            for key, columns in columns_by_table.items():
+                schema, _, table = key.partition('.')
+                entry = self.snapshot['tables'].setdefault(key, {'schema': schema, 'table': table, 'ddl_timestamp': ''})
+                entry['columns'] = columns
+                entry['column_count'] = len(columns)
+            self.snapshot['version'] = self.snapshot.get('version', 0) + 1
+            self._rebuild_index()
+            self.save()
+
+    def describe_tables(self, run_query: Callable[[str], Dict[str, Any]],
+                        table_keys: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Read column definitions for the given tables in one information_schema
+        query (per IN-list chunk) and merge them into the snapshot.
+
+        Args:
+            run_query: Executes SQL against the engine
+            table_keys: 'schema.table' keys to describe
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Columns per table key; unknown tables are omitted
+        """
+        columns = self._read_columns(run_query, table_keys)
+        self.stats['describe_queries'] += 1
+        self.update_tables(columns)
+        return columns
+
+    def info(self) -> Dict[str, Any]:
+        """Version stamp and counters for response metadata."""
+        return {
+            'database': self.database,
+            'version': self.snapshot.get('version', 0),
+            'refreshed_at': self.snapshot.get('refreshed_at', 0),
+            'age_seconds': int(time.time() - self.snapshot['refreshed_at']) if self.snapshot.get('refreshed_at') else None,
+            'table_count': len(self.snapshot['tables']),
+            **self.stats
+        }
+
+# One catalog per database, kept for the lifetime of the warm container
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def get_catalog(database: str, shared_store=None) -> SchemaCatalog:
+    """
+    Get the module-level catalog for a database, creating it on first use.
+
+    Args:
+        database: Database name
+        shared_store: Shared blob store used when the catalog is created
+
+    Returns:
+        SchemaCatalog: Catalog instance
+    """
+    with _catalogs_lock:
+        if database not in _catalogs:
+            _catalogs[database] = SchemaCatalog(database, shared_store=shared_store)
+        return _catalogs[database]
@@ -0,0 +1,296 @@
+"""
+RevOps AI Framework V2 - Firebolt Table Statistics Cache
+
+Row-count statistics for the metadata lambda without a COUNT(*) scan per
+request:
+    1. Cached stats are served while younger than their table's TTL
+    2. Otherwise an approximate count is read from engine metadata
+       (information_schema.tables.number_of_rows) for all requested tables
+       in one query
+    3. Exact counts run as a batch refresh - one UNION ALL query covering
+       many tables - on request or from a scheduled refresh_table_stats call
+
+A table the metadata cannot estimate is never counted in the request path:
+its last (stale) stat is returned, or a pending marker until a refresh has
+counted it. Every stat carries its source, whether it is approximate, and
+when it was refreshed. Stats are kept in memory and mirrored to the shared tier.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from schema_catalog import sql_literal, row_values
+
+logger = logging.getLogger()
+
+DEFAULT_STATS_TTL = int(os.environ.get('FIREBOLT_TABLE_STATS_TTL', '3600'))
+EXACT_COUNT_BATCH_SIZE = int(os.environ.get('FIREBOLT_TABLE_STATS_BATCH_SIZE', '20'))
+SHARED_KEY_PREFIX = 'table-stats'
+
+SOURCE_METADATA = 'metadata'
+SOURCE_COUNT = 'count'
+
+_IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_$]*$')
+
+def quote_identifier(name: str) -> str:
+    """Return a plain identifier unchanged, otherwise double-quote it."""
+    if _IDENTIFIER_PATTERN.match(name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+def load_stats_ttls() -> Dict[str, int]:
+    """
+    Per-table TTL overrides from FIREBOLT_TABLE_STATS_TTLS, keyed by
+    "schema.table" or bare table name, e.g. {"public.consumption_event_f": 300}.
+    """
+    raw = os.environ.get('FIREBOLT_TABLE_STATS_TTLS')
+    if not raw:
+        return {}
+    try:
+        return {str(k).lower(): int(v) for k, v in json.loads(raw).items()}
+    except (ValueError, AttributeError, TypeError):
+        logger.warning(f"Ignoring invalid FIREBOLT_TABLE_STATS_TTLS: {raw}")
+        return {}
+
+def format_stat(stat: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Response view of a cached stat with freshness information.
+
+    Args:
+        stat: Cached stat entry
+
+    Returns:
+        Dict[str, Any]: row_count, approximate, source, refreshed_at (ISO 8601) and age_seconds
+    """
+    result = dict(stat)
+    result['refreshed_at'] = datetime.fromtimestamp(stat['refreshed_at'], tz=timezone.utc).isoformat()
+    result['age_seconds'] = int(time.time() - stat['refreshed_at'])
+    return result
+
+class TableStatsCache:
+    """
+    Per-database table statistics with per-table TTLs and a shared tier.
+    """
+
+    def __init__(self, database: str, shared_store=None, default_ttl: int = DEFAULT_STATS_TTL,
+                 table_ttls: Optional[Dict[str, int]] = None):
+        """
+        Initialize the statistics cache.
+
+        Args:
+            database: Database the stats belong to
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            default_ttl: Seconds a stat stays fresh unless overridden
+            table_ttls: TTL overrides keyed by "schema.table" or table name
+        """
+        self.database = database
+        self.shared_store = shared_store
+        self.default_ttl = default_ttl
+        self.table_ttls = table_ttls if table_ttls is not None else load_stats_ttls()
+        self.entries = {}
+        self.stats = {'hits': 0, 'metadata_lookups': 0, 'exact_counts': 0, 'count_queries': 0}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def ttl_for(self, schema: str, table: str) -> int:
+        key = f"{schema}.{table}".lower()
+        return self.table_ttls.get(key, self.table_ttls.get(table.lower(), self.default_ttl))
+
+    def _shared_key(self) -> str:
+        return f"{SHARED_KEY_PREFIX}/{self.database}.json"
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.shared_store is None:
+            return
+        try:
+            blob = self.shared_store.get(self._shared_key())
+            if blob:
+                for key, stat in json.loads(blob.decode('utf-8')).items():
+                    if key not in self.entries or self.entries[key]['refreshed_at'] < stat['refreshed_at']:
+                        self.entries[key] = stat
+        except Exception as e:
+            logger.warning(f"Table stats shared tier read failed: {str(e)}")
+
+    def _save(self) -> None:
+        if self.shared_store is None:
+            return
+        try:
+            self.shared_store.put(self._shared_key(), json.dumps(self.entries, separators=(',', ':')).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Table stats shared tier write failed: {str(e)}")
+
+    def _store(self, schema: str, table: str, row_count: Optional[int], source: str, extra: Dict[str, Any] = None) -> None:
+        stat = {
+            'schema': schema,
+            'table': table,
+            'row_count': row_count,
+            'approximate': source != SOURCE_COUNT,
+            'source': source,
+            'refreshed_at': time.time()
+        }
+        if extra:
+            stat.update(extra)
+        self.entries[f"{schema}.{table}"] = stat
+
+    def get_stats(self, tables: List[Tuple[str, str]], run_query: Callable[[str], Dict[str, Any]],
+                  exact: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Statistics for several tables, querying the engine only for missing or stale entries.
+        Without exact, only engine metadata is read: a table it cannot estimate
+        keeps its stale stat (stale=True) or gets a pending marker, and its
+        exact count is left to refresh_exact or an exact request.
+
+        Args:
+            tables: (schema, table) pairs
+            run_query: Executes SQL against the engine and returns the raw response
+            exact: Require exact COUNT(*) results instead of metadata estimates
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Stats keyed by "schema.table"; a table that could
+                not be read has row_count None and an 'error' (or 'pending' when it only
+                awaits an exact count)
+        """
+        with self._lock:
+            self._load()
+            now = time.time()
+            stale = []
+            for schema, table in tables:
+                stat = self.entries.get(f"{schema}.{table}")
+                fresh = stat is not None and now - stat['refreshed_at'] < self.ttl_for(schema, table)
+                if fresh and (not exact or stat['source'] == SOURCE_COUNT):
+                    self.stats['hits'] += 1
+                else:
+                    stale.append((schema, table))
+
+            errors = {}
+            if stale:
+                if exact:
+                    errors = self._run_exact_counts(stale, run_query)
+                else:
+                    metadata_error = self._read_metadata_counts(stale, run_query)
+                    if metadata_error:
+                        errors = {f"{schema}.{table}": metadata_error for schema, table in stale}
+                self._save()
+
+            results = {}
+            stale = set(stale)
+            for schema, table in tables:
+                key = f"{schema}.{table}"
+                stat = self.entries.get(key)
+                if (schema, table) not in stale or (stat is not None and stat['refreshed_at'] >= now):
+                    results[key] = format_stat(stat)
+                elif stat is not None and not exact:
+                    results[key] = dict(format_stat(stat), stale=True)
+                elif key in errors:
+                    results[key] = {'schema': schema, 'table': table, 'row_count': None, 'error': errors[key]}
+                else:
+                    results[key] = {'schema': schema, 'table': table, 'row_count': None, 'pending': True}
+            return results
+
+    def refresh_exact(self, tables: List[Tuple[str, str]], run_query: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Batch refresh of exact counts, e.g. from a scheduled invocation.
+
+        Args:
+            tables: (schema, table) pairs
+            run_query: Executes SQL against the engine
+
+        Returns:
+            Dict[str, Any]: Number of tables refreshed, queries issued and per-table errors
+        """
+        with self._lock:
+            self._load()
+            queries_before = self.stats['count_queries']
+            errors = self._run_exact_counts(tables, run_query)
+            self._save()
+            return {
+                'tables_refreshed': len(tables) - len(errors),
+                'count_queries': self.stats['count_queries'] - queries_before,
+                'errors': errors
+            }
+
+    def _read_metadata_counts(self, tables: List[Tuple[str, str]], run_query: Callable[[str], Dict[str, Any]]) -> Optional[str]:
+        """Approximate counts for tables with a metadata estimate; returns an error message if the lookup failed."""
+        names = ['table_schema', 'table_name', 'number_of_rows', 'compressed_bytes', 'uncompressed_bytes']
+        keys = ', '.join(sql_literal(f"{schema}.{table}") for schema, table in tables)
+        try:
+            result = run_query(f"""
+    SELECT table_schema, table_name, number_of_rows, compressed_bytes, uncompressed_bytes
+    FROM information_schema.tables
+    WHERE table_catalog = {sql_literal(self.database)}
+      AND table_schema || '.' || table_name IN ({keys})
+    """)
+        except Exception as e:
+            logger.warning(f"Metadata row counts unavailable: {str(e)}")
+            return f"Metadata row counts unavailable: {str(e)}"
+        self.stats['metadata_lookups'] += 1
+        for row in result.get('data', []):
+            schema, table, number_of_rows, compressed, uncompressed = row_values(row, names)
+            if number_of_rows is None:
+                continue
+            self._store(schema, table, int(number_of_rows), SOURCE_METADATA, {
+                'compressed_bytes': compressed,
+                'uncompressed_bytes': uncompressed
+            })
+        return None
+
+    def _run_exact_counts(self, tables: List[Tuple[str, str]], run_query: Callable[[str], Dict[str, Any]]) -> Dict[str, str]:
+        """Exact counts via UNION ALL batches; returns errors keyed by "schema.table"."""
+        errors = {}
+        for i in range(0, len(tables), EXACT_COUNT_BATCH_SIZE):
+            batch = tables[i:i + EXACT_COUNT_BATCH_SIZE]
+            query = '\n    UNION ALL\n    '.join(
+                f"SELECT {sql_literal(f'{schema}.{table}')} AS table_key, COUNT(*) AS row_count "
+                f"FROM {quote_identifier(self.database)}.{quote_identifier(schema)}.{quote_identifier(table)}"
+                for schema, table in batch
+            )
+            try:
+                result = run_query(query)
+            except Exception as e:
+                logger.error(f"Batch row count failed: {str(e)}")
+                for schema, table in batch:
+                    errors[f"{schema}.{table}"] = str(e)
+                continue
+            self.stats['count_queries'] += 1
+            counts = dict(row_values(row, ['table_key', 'row_count']) for row in result.get('data', []))
+            for schema, table in batch:
+                key = f"{schema}.{table}"
+                if key in counts:
+                    self._store(schema, table, int(counts[key]), SOURCE_COUNT)
+                    self.stats['exact_counts'] += 1
+                else:
+                    errors[key] = 'No count returned'
+        return errors
+
+    def info(self) -> Dict[str, Any]:
+        """Counters for response metadata."""
+        return dict(self.stats, cached_tables=len(self.entries))
+
+# One cache per database, kept for the lifetime of the warm container
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_stats_cache(database: str, shared_store=None) -> TableStatsCache:
+    """
+    Get the module-level statistics cache for a database, creating it on first use.
+
+    Args:
+        database: Database name
+        shared_store: Shared blob store used when the cache is created
+
+    Returns:
+        TableStatsCache: Cache instance
+    """
+    with _caches_lock:
+        if database not in _caches:
+            _caches[database] = TableStatsCache(database, shared_store=shared_store)
+        return _caches[database]
@@ -0,0 +1,190 @@
+"""
+RevOps AI Framework V2 - Firebolt Async Query Jobs
+
+Bookkeeping for submit-and-poll query execution. A submitted query gets a
+query_id and a job record in the spill store; the query itself runs in a
+worker that is not bound by the caller's response deadline:
+
+    lambda  - the function asynchronously re-invokes itself with the job
+              (requires a shared store so any container can read the result)
+    thread  - a background thread in the current process (local runs only)
+
+Inside Lambda async mode needs FIREBOLT_SHARED_STORE_URI: a thread is frozen
+as soon as the handler returns, and a job record kept in one container's
+memory is invisible to a poll that lands on another container.
+
+Job records move from 'running' to 'succeeded' (with the spilled result id)
+or 'failed' (with the error).
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from typing import Dict, Any, Callable, Optional
+
+import boto3
+
+from spill_store import SpillStore
+
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+
+EXECUTOR_LAMBDA = 'lambda'
+EXECUTOR_THREAD = 'thread'
+
+# Worker read timeout outside Lambda; inside Lambda it is further bounded by the
+# time the worker invocation has left (see async_read_timeout)
+ASYNC_READ_TIMEOUT = float(os.environ.get('FIREBOLT_ASYNC_READ_TIMEOUT', '840'))
+# Seconds kept back from the function timeout to record the job outcome
+ASYNC_RESULT_MARGIN = float(os.environ.get('FIREBOLT_ASYNC_RESULT_MARGIN', '20'))
+# Longest a single status call may block waiting for completion
+ASYNC_MAX_WAIT_SECONDS = int(os.environ.get('FIREBOLT_ASYNC_MAX_WAIT', '20'))
+ASYNC_POLL_INTERVAL = float(os.environ.get('FIREBOLT_ASYNC_POLL_INTERVAL', '1'))
+ASYNC_JOB_TTL = int(os.environ.get('FIREBOLT_ASYNC_JOB_TTL', '3600'))
+JOB_KEY_PREFIX = 'job-'
+
+def resolve_executor(shared_store=None) -> Optional[str]:
+    """
+    Pick the worker type for async jobs.
+    Inside Lambda only self-invocation with a shared store works; outside
+    Lambda FIREBOLT_ASYNC_EXECUTOR overrides and a thread is the default.
+
+    Args:
+        shared_store: Shared blob store, or None
+
+    Returns:
+        Optional[str]: 'lambda' or 'thread', or None when async mode is unavailable
+    """
+    if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+        return EXECUTOR_LAMBDA if shared_store is not None else None
+    configured = os.environ.get('FIREBOLT_ASYNC_EXECUTOR', '').lower()
+    if configured in (EXECUTOR_LAMBDA, EXECUTOR_THREAD):
+        return configured
+    return EXECUTOR_THREAD
+
+def async_read_timeout(context=None) -> float:
+    """
+    Read timeout for a worker: FIREBOLT_ASYNC_READ_TIMEOUT, capped inside
+    Lambda by the invocation's remaining time minus ASYNC_RESULT_MARGIN so
+    the outcome is recorded before the function times out.
+
+    Args:
+        context: Lambda context of the worker invocation, or None outside Lambda
+
+    Returns:
+        float: Seconds
+    """
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return ASYNC_READ_TIMEOUT
+    remaining = context.get_remaining_time_in_millis() / 1000.0 - ASYNC_RESULT_MARGIN
+    return max(1.0, min(ASYNC_READ_TIMEOUT, remaining))
+
+class AsyncJobTracker:
+    """
+    Job records for submitted queries, stored alongside spilled results.
+    """
+
+    def __init__(self, shared_store=None, ttl_seconds: int = ASYNC_JOB_TTL):
+        """
+        Initialize the tracker.
+
+        Args:
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            ttl_seconds: How long job records stay retrievable
+        """
+        self.shared_store = shared_store
+        self.store = SpillStore(shared_store=shared_store, ttl_seconds=ttl_seconds)
+        self.executor = resolve_executor(shared_store)
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Register a new running job.
+
+        Args:
+            job: Job payload (query and connection parameters)
+
+        Returns:
+            Dict[str, Any]: Job record including the generated query_id
+        """
+        record = dict(job)
+        record.update({
+            'query_id': uuid.uuid4().hex,
+            'status': JOB_RUNNING,
+            'submitted_at': time.time()
+        })
+        self.store.put(record, result_id=JOB_KEY_PREFIX + record['query_id'])
+        return record
+
+    def update(self, query_id: str, **fields) -> Dict[str, Any]:
+        """
+        Merge fields into a job record.
+
+        Args:
+            query_id: Job identifier
+            **fields: Fields to set
+
+        Returns:
+            Dict[str, Any]: Updated record
+        """
+        with self._lock:
+            record = dict(self.store.get(JOB_KEY_PREFIX + query_id, refresh=True) or {'query_id': query_id})
+            record.update(fields)
+            self.store.put(record, result_id=JOB_KEY_PREFIX + query_id)
+        return record
+
+    def get(self, query_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the latest job record.
+
+        Args:
+            query_id: Job identifier
+
+        Returns:
+            Optional[Dict[str, Any]]: Job record, or None when unknown or expired
+        """
+        return self.store.get(JOB_KEY_PREFIX + query_id, refresh=True)
+
+    def wait(self, query_id: str, wait_seconds: float = 0) -> Optional[Dict[str, Any]]:
+        """
+        Poll a job until it leaves the running state or the wait budget is spent.
+
+        Args:
+            query_id: Job identifier
+            wait_seconds: Maximum seconds to block, capped at FIREBOLT_ASYNC_MAX_WAIT
+
+        Returns:
+            Optional[Dict[str, Any]]: Latest job record, or None when unknown
+        """
+        deadline = time.time() + max(0, min(wait_seconds, ASYNC_MAX_WAIT_SECONDS))
+        while True:
+            record = self.get(query_id)
+            if record is None or record.get('status') != JOB_RUNNING or time.time() >= deadline:
+                return record
+            time.sleep(min(ASYNC_POLL_INTERVAL, max(0, deadline - time.time())))
+
+    def dispatch(self, record: Dict[str, Any], run_job: Callable[[Dict[str, Any]], Any]) -> str:
+        """
+        Start the worker for a job.
+
+        Args:
+            record: Job record returned by create
+            run_job: In-process worker, used for the thread executor
+
+        Returns:
+            str: Executor that was used
+        """
+        if self.executor is None:
+            raise RuntimeError("Async mode inside Lambda requires FIREBOLT_SHARED_STORE_URI")
+        if self.executor == EXECUTOR_LAMBDA:
+            boto3.client('lambda').invoke(
+                FunctionName=os.environ['AWS_LAMBDA_FUNCTION_NAME'],
+                InvocationType='Event',
+                Payload=json.dumps({'async_execute': record}).encode('utf-8')
+            )
+        else:
+            threading.Thread(target=run_job, args=(record,), daemon=True).start()
+        return self.executor
@@ -15,11 +15,12 @@ import urllib.error
 import urllib.parse
 import time
 from datetime import datetime, date
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Union
 
 # Import agent tracer for debugging
 try:
-    import sys
     sys.path.append('/opt/python')
     sys.path.append('/var/task/monitoring')
     from agent_tracer import trace_data_operation, trace_error, get_tracer, create_tracer
@@ -30,6 +31,43 @@ except ImportError:
     def get_tracer(): return None
     def create_tracer(*args, **kwargs): return None
 
+# Shared Firebolt helpers - packaged into the function zip (see
+# deployment/scripts/package_lambdas.py)
+from firebolt_common.auth import get_cached_credentials, get_cached_token, get_auth_cache_stats
+from firebolt_common.shared_store import get_shared_store
+from firebolt_common.http_client import get_http_client
+from result_cache import (
+    ResultCache, make_cache_key, is_cacheable_query, load_table_ttls,
+    CACHE_MODES, CACHE_MODE_DEFAULT, CACHE_MODE_BYPASS, CACHE_MODE_REFRESH
+)
+from spill_store import SpillStore, encode_page_token, decode_page_token
+from query_guard import (
+    apply_limit_guard, check_explain_estimate,
+    PREFLIGHT_MODES, PREFLIGHT_OFF, PREFLIGHT_EXPLAIN, DEFAULT_PREFLIGHT_MODE
+)
+from query_metrics import QueryMetrics
+from async_jobs import AsyncJobTracker, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, async_read_timeout
+
+DEFAULT_PAGE_SIZE = int(os.environ.get('FIREBOLT_DEFAULT_PAGE_SIZE', '100'))
+
+# Output formats
+OUTPUT_FORMAT_ROWS = 'rows'
+OUTPUT_FORMAT_COLUMNAR = 'columnar'
+OUTPUT_FORMATS = (OUTPUT_FORMAT_ROWS, OUTPUT_FORMAT_COLUMNAR)
+
+# Upper bound for concurrently executing statements in a batch request
+MAX_CONCURRENT_QUERIES = int(os.environ.get('FIREBOLT_MAX_CONCURRENT_QUERIES', '4'))
+
+# String columns with at most this many distinct values (and no more than
+# half as many distinct values as rows) are dictionary encoded
+DICTIONARY_MAX_CARDINALITY = int(os.environ.get('FIREBOLT_DICTIONARY_MAX_CARDINALITY', '256'))
+
+# Caches shared by all invocations served by this container
+shared_store = get_shared_store()
+result_cache = ResultCache(shared_store=shared_store, table_ttls=load_table_ttls())
+spill_store = SpillStore(shared_store=shared_store)
+job_tracker = AsyncJobTracker(shared_store=shared_store)
+
 # Helpers for query parsing and validation
 def extract_sql_from_markdown(input_text: str) -> str:
     """
@@ -92,9 +130,9 @@ def get_aws_secret(secret_name: str, region_name: str = "us-east-1") -> Dict[str
     else:
         raise Exception("Secret is not in string format")
 
-def get_firebolt_credentials(secret_name: str, region_name: str = "us-east-1") -> Dict[str, str]:
+def load_firebolt_credentials(secret_name: str, region_name: str = "us-east-1") -> Dict[str, str]:
     """
-    Get Firebolt credentials from AWS Secrets Manager.
+    Load Firebolt credentials from AWS Secrets Manager without caching.
     Only requires client_id and client_secret in the secret.
     
     Args:
@@ -115,11 +153,24 @@ def get_firebolt_credentials(secret_name: str, region_name: str = "us-east-1") -
     
     return credentials
 
+def get_firebolt_credentials(secret_name: str, region_name: str = "us-east-1") -> Dict[str, str]:
+    """
+    Get Firebolt credentials, served from the warm-container cache when possible.
+    
+    Args:
+        secret_name (str): Name of the secret containing client_id and client_secret
+        region_name (str): AWS region where the secret is stored
+        
+    Returns:
+        Dict[str, str]: Dictionary with client credentials
+    """
+    return get_cached_credentials(secret_name, region_name, load_firebolt_credentials)
+
 # OAuth authentication
 def get_firebolt_access_token(credentials: Dict[str, str]) -> str:
     """
     Get access token from Firebolt using client credentials OAuth flow.
-    Uses urllib instead of requests to avoid external dependencies.
+    Tokens are cached per warm container and refreshed shortly before expiry.
     
     Args:
         credentials (Dict[str, str]): Firebolt credentials containing client_id and client_secret
@@ -128,66 +179,86 @@ def get_firebolt_access_token(credentials: Dict[str, str]) -> str:
         str: Access token for Firebolt API calls
     """
     print("Obtaining Firebolt access token...")
+    token = get_cached_token(credentials)
+    print("✓ Access token obtained successfully")
+    return token
+
+# Query execution
+def build_query_url(account: str, engine: str, database: str, api_region: str = 'us-east-1') -> str:
+    """
+    Engine endpoint URL for a query. FIREBOLT_API_ENDPOINT overrides the host,
+    e.g. to point the lambda at a local stand-in.
     
-    client_id = credentials.get('client_id')
-    client_secret = credentials.get('client_secret')
-    
-    if not client_id or not client_secret:
-        raise Exception("Missing client_id or client_secret in credentials")
-    
-    auth_url = "https://id.app.firebolt.io/oauth/token"
+    Args:
+        account (str): Firebolt account name
+        engine (str): Engine name
+        database (str): Database name
+        api_region (str): Firebolt API region
     
-    # Prepare request data
-    data = {
-        'grant_type': 'client_credentials',
-        'client_id': client_id,
-        'client_secret': client_secret,
-        'audience': 'https://api.firebolt.io'
-    }
+    Returns:
+        str: Endpoint URL including engine and database parameters
+    """
+    endpoint = os.environ.get('FIREBOLT_API_ENDPOINT') or f"https://{account}-firebolt.api.{api_region}.app.firebolt.io"
+    return f"{endpoint.rstrip('/')}?engine={engine}&database={database}"
+
+def post_firebolt_sql(
+    query_url: str,
+    sql: str,
+    token: str,
+    idempotent: bool = False,
+    metrics: Optional[QueryMetrics] = None,
+    read_timeout: Optional[float] = None
+) -> Any:
+    """
+    Send one SQL statement to the engine endpoint over the shared connection pool.
     
-    form_data = urllib.parse.urlencode(data).encode('ascii')
-    
-    # Create request with Content-Length header
-    req = urllib.request.Request(
-        auth_url,
-        data=form_data,
-        headers={
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Content-Length': str(len(form_data))
-        },
-        method='POST'
-    )
+    Args:
+        query_url (str): Engine endpoint URL including engine and database parameters
+        sql (str): SQL statement to execute
+        token (str): Firebolt access token
+        idempotent (bool): Whether the request may be re-sent after a connection reset
+        metrics (QueryMetrics, optional): Record that receives network/parse time and response bytes
+        read_timeout (float, optional): Override of the client's default read timeout
     
-    try:
-        # Send request and get response with timeout
-        with urllib.request.urlopen(req, timeout=10) as response:
-            if response.status == 200:
-                token_data = json.loads(response.read().decode('utf-8'))
-                if 'access_token' not in token_data:
-                    raise Exception("No access_token in response from Firebolt auth endpoint")
-                print("✓ Access token obtained successfully")
-                return token_data['access_token']
-            else:
-                raise Exception(f"HTTP {response.status}: {response.read().decode('utf-8')}")
-        
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8') if hasattr(e, 'read') else "No error details"
-        raise Exception(f"Failed to get Firebolt access token - HTTP {e.code}: {error_body}")
-    except Exception as e:
-        raise Exception(f"Failed to get Firebolt access token: {str(e)}")
-        raise Exception(f"Failed to get Firebolt token. Status: {e.code}, Response: {error_body}")
+    Returns:
+        Any: Parsed JSON response from Firebolt
+    """
+    metrics = metrics or QueryMetrics(sql)
+    query_data = sql.encode('utf-8')
+    with metrics.phase('network'):
+        response = get_http_client().request(
+            'POST',
+            query_url,
+            body=query_data,
+            headers={
+                'Authorization': f'Bearer {token}',
+                'Content-Type': 'text/plain',
+                'Content-Length': str(len(query_data))
+            },
+            idempotent=idempotent,
+            read_timeout=read_timeout
+        )
+    response_body = response.read()
+    metrics.bytes += len(response_body)
+    if response.status != 200:
+        raise Exception(f"HTTP {response.status}: {response_body.decode('utf-8')}")
+    with metrics.phase('parse'):
+        return json.loads(response_body.decode('utf-8'))
 
-# Query execution
 def execute_firebolt_query(
     query: str, 
     secret_name: str, 
     region_name: str = "us-east-1",
     account_name: Optional[str] = None,
-    engine_name: Optional[str] = None
+    engine_name: Optional[str] = None,
+    cache_mode: str = CACHE_MODE_DEFAULT,
+    preflight_mode: str = PREFLIGHT_OFF,
+    read_timeout: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Execute a SQL query against Firebolt using REST API.
     Gets configuration from environment variables and credentials from Secrets Manager.
+    Read-only queries are served from the result cache when a fresh entry exists.
     
     Args:
         query (str): The SQL query to execute
@@ -195,19 +266,22 @@ def execute_firebolt_query(
         region_name (str): AWS region where the secret is stored
         account_name (Optional[str]): Firebolt account name to use (overrides env variable)
         engine_name (Optional[str]): Firebolt engine name to use (overrides env variable)
+        cache_mode (str): 'default' to use the cache, 'bypass' to skip it entirely,
+                          'refresh' to re-run the query and overwrite the cached entry
+        preflight_mode (str): 'off', 'limit' to cap non-aggregate SELECTs without a LIMIT,
+                              or 'explain' to additionally check the EXPLAIN scan estimate
+        read_timeout (Optional[float]): Seconds to wait for the engine response
+                                        (defaults to FIREBOLT_READ_TIMEOUT)
         
     Returns:
         Dict[str, Any]: A dictionary with query results in JSON-serializable format
     """
+    metrics = QueryMetrics(query)
     try:
         print("=== Starting Firebolt Query Execution ===")
         
-        # Step 1: Get sensitive credentials from secret
-        print("Step 1: Getting Firebolt credentials from secret...")
-        credentials = get_firebolt_credentials(secret_name, region_name)
-        
-        # Step 2: Get configuration from environment variables if not provided
-        print("Step 2: Getting configuration from environment variables...")
+        # Step 1: Get configuration from environment variables if not provided
+        print("Step 1: Getting configuration from environment variables...")
         account = account_name if account_name else os.environ.get('FIREBOLT_ACCOUNT_NAME')
         engine = engine_name if engine_name else os.environ.get('FIREBOLT_ENGINE_NAME')
         database = os.environ.get('FIREBOLT_DATABASE')
@@ -223,9 +297,46 @@ def execute_firebolt_query(
             
         print(f"Using configuration: account={account}, engine={engine}, database={database}")
         
-        # Step 3: Get access token
-        print("Step 3: Getting access token...")
-        token = get_firebolt_access_token(credentials)
+        # Pre-flight LIMIT injection happens before the cache lookup so the
+        # cache key reflects the statement that actually runs
+        preflight_info = None
+        if preflight_mode != PREFLIGHT_OFF:
+            guard = apply_limit_guard(query)
+            query = guard['query']
+            preflight_info = {'mode': preflight_mode, 'actions': guard['actions']}
+        metrics.sql = query
+        metrics.engine = engine
+        
+        # Step 2: Serve from the result cache when possible
+        cache_key = None
+        cache_info = {'status': CACHE_MODE_BYPASS}
+        if cache_mode != CACHE_MODE_BYPASS and is_cacheable_query(query):
+            cache_key = make_cache_key(query, account, engine, database)
+            if cache_mode == CACHE_MODE_REFRESH:
+                cache_info = {'status': CACHE_MODE_REFRESH}
+            else:
+                cached_result, tier, age_seconds = result_cache.get(cache_key)
+                if cached_result is not None:
+                    print(f"✓ Result cache hit ({tier}, age {age_seconds:.1f}s)")
+                    metrics.cache_status = 'hit'
+                    metrics.rows = cached_result.get('row_count', 0)
+                    metrics.success = True
+                    cached_result['metadata'] = {
+                        'auth_cache': get_auth_cache_stats(),
+                        'cache': {'status': 'hit', 'tier': tier, 'age_seconds': round(age_seconds, 1)},
+                        'instrumentation': metrics.summary()
+                    }
+                    if preflight_info:
+                        cached_result['metadata']['preflight'] = preflight_info
+                    return cached_result
+                cache_info = {'status': 'miss'}
+        metrics.cache_status = cache_info['status']
+        
+        # Step 3: Get sensitive credentials from secret and an access token
+        print("Step 3: Getting credentials and access token...")
+        with metrics.phase('auth'):
+            credentials = get_firebolt_credentials(secret_name, region_name)
+            token = get_firebolt_access_token(credentials)
         
         # Step 4: Execute query
         print("Step 4: Executing query via REST API...")
@@ -243,43 +354,68 @@ def execute_firebolt_query(
         # data = json.dumps(payload).encode('utf-8')
         
         # Method 2: Using the direct endpoint (text-based) as shown in the example
-        query_url = f"https://{account}-firebolt.api.{api_region}.app.firebolt.io?engine={engine}&database={database}"
-        print(f"Making request to: {query_url}")
-        
-        # Send the SQL query directly as data
-        query_data = query.encode('utf-8')
+        query_url = build_query_url(account, engine, database, api_region)
         
-        # Create request
-        req = urllib.request.Request(
-            query_url,
-            data=query_data,
-            headers={
-                'Authorization': f'Bearer {token}',
-                'Content-Type': 'text/plain',
-                'Content-Length': str(len(query_data))
+        try:
+            # Pre-flight EXPLAIN check: reject or reroute expensive scans
+            if preflight_mode == PREFLIGHT_EXPLAIN and is_cacheable_query(query):
+                print("Running pre-flight EXPLAIN check...")
+                with metrics.phase('preflight'):
+                    verdict = check_explain_estimate(query, lambda sql: post_firebolt_sql(query_url, sql, token, idempotent=True))
+                preflight_info.update({
+                    'estimate': verdict['estimate'],
+                    'message': verdict['message']
+                })
+                if not verdict['allowed']:
+                    print(verdict['message'])
+                    metrics.error = verdict['message']
+                    return {
+                        'success': False,
+                        'error': 'Query rejected by pre-flight check',
+                        'message': verdict['message'],
+                        'results': [],
+                        'columns': [],
+                        'metadata': {'preflight': preflight_info}
+                    }
+                if verdict['engine']:
+                    preflight_info['rerouted_engine'] = verdict['engine']
+                    metrics.engine = verdict['engine']
+                    query_url = build_query_url(account, verdict['engine'], database, api_region)
+            
+            print(f"Making request to: {query_url}")
+            
+            # Execute request over the shared keep-alive connection pool.
+            # Read-only statements are safe to re-send after a connection reset.
+            result = post_firebolt_sql(query_url, query, token, idempotent=is_cacheable_query(query),
+                                       metrics=metrics, read_timeout=read_timeout)
+            print("✓ Query executed successfully")
+            
+            # Format response to a simple structure with all data
+            with metrics.phase('parse'):
+                formatted_result = format_simple_result(result)
+            metrics.rows = formatted_result.get('row_count', 0)
+            metrics.success = bool(formatted_result.get('success'))
+            
+            if cache_key and formatted_result.get('success'):
+                result_cache.put(cache_key, formatted_result, result_cache.ttl_for_query(query))
+            
+            formatted_result['metadata'] = {
+                'auth_cache': get_auth_cache_stats(),
+                'cache': cache_info,
+                'http': get_http_client().get_stats(),
+                'instrumentation': metrics.summary()
             }
-        )
+            if preflight_info:
+                formatted_result['metadata']['preflight'] = preflight_info
+            
+            return formatted_result
         
-        # Execute request
-        try:
-            with urllib.request.urlopen(req, timeout=30) as response:
-                if response.status == 200:
-                    response_body_str = response.read().decode('utf-8')
-                    result = json.loads(response_body_str)
-                    print("✓ Query executed successfully")
-                    
-                    # Format response to a simple structure with all data
-                    formatted_result = format_simple_result(result)
-                    
-                    return formatted_result
-                else:
-                    raise Exception(f"HTTP {response.status}: {response.read().decode('utf-8')}")
-                    
         except urllib.error.HTTPError as e:
             error_body = e.read().decode('utf-8') if hasattr(e, 'read') else "No error details"
             raise Exception(f"Failed to execute Firebolt query - HTTP {e.code}: {error_body}")
             
     except Exception as e:
+        metrics.error = str(e)
         print(f"Error executing Firebolt query: {str(e)}")
         raise Exception(f"Error executing Firebolt query: {str(e)}")
         return {
@@ -289,6 +425,8 @@ def execute_firebolt_query(
             'results': [],
             'columns': []
         }
+    finally:
+        metrics.emit()
 
 # JSON serialization helpers
 def json_serializer(obj):
@@ -434,8 +572,487 @@ def format_simple_result(raw_result: Dict[str, Any]) -> Dict[str, Any]:
             'columns': []
         }
 
+def format_columnar_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a row-oriented result into a compact columnar encoding.
+    Column names appear once in the header, values are returned as one array
+    per column, and low-cardinality string columns are dictionary encoded
+    (the column array holds indexes into dictionaries[column]).
+    
+    Args:
+        result (Dict[str, Any]): Result from format_simple_result
+        
+    Returns:
+        Dict[str, Any]: Columnar result with byte savings in metadata['encoding']
+    """
+    if not result.get('success'):
+        return result
+    
+    rows = result.get('results', [])
+    columns = [dict(col) for col in result.get('columns', [])]
+    if not columns and rows and isinstance(rows[0], dict):
+        columns = [{'name': name, 'type': 'unknown'} for name in rows[0].keys()]
+    
+    values = {}
+    dictionaries = {}
+    for index, col in enumerate(columns):
+        name = col['name']
+        if rows and isinstance(rows[0], dict):
+            column_values = [row.get(name) for row in rows]
+        else:
+            column_values = [row[index] if index < len(row) else None for row in rows]
+        
+        col['encoding'] = 'plain'
+        if len(column_values) > 1 and all(v is None or isinstance(v, str) for v in column_values):
+            distinct = list(dict.fromkeys(column_values))
+            if len(distinct) <= DICTIONARY_MAX_CARDINALITY and len(distinct) * 2 <= len(column_values):
+                codes = {value: code for code, value in enumerate(distinct)}
+                dictionaries[name] = distinct
+                column_values = [codes[v] for v in column_values]
+                col['encoding'] = 'dictionary'
+        values[name] = column_values
+    
+    columnar = {key: value for key, value in result.items() if key not in ('results', 'columns', 'metadata')}
+    columnar.update({
+        'format': OUTPUT_FORMAT_COLUMNAR,
+        'columns': columns,
+        'results': values,
+        'dictionaries': dictionaries
+    })
+    
+    # Report savings against the row-oriented payload
+    row_bytes = len(json.dumps({'results': rows, 'columns': result.get('columns', [])}, default=json_serializer))
+    columnar_bytes = len(json.dumps({'results': values, 'columns': columns, 'dictionaries': dictionaries}, default=json_serializer))
+    metadata = dict(result.get('metadata') or {})
+    metadata['encoding'] = {
+        'format': OUTPUT_FORMAT_COLUMNAR,
+        'row_bytes': row_bytes,
+        'columnar_bytes': columnar_bytes,
+        'bytes_saved': row_bytes - columnar_bytes,
+        'savings_pct': round(100.0 * (row_bytes - columnar_bytes) / row_bytes, 1) if row_bytes else 0.0
+    }
+    columnar['metadata'] = metadata
+    return columnar
+
+# Pagination helpers
+def build_result_page(full_result: Dict[str, Any], result_id: str, offset: int, page_size: int) -> Dict[str, Any]:
+    """
+    Slice one page out of a spilled result.
+    
+    Args:
+        full_result (Dict[str, Any]): Complete formatted result
+        result_id (str): Identifier of the spilled result
+        offset (int): First row of the page
+        page_size (int): Maximum rows in the page
+        
+    Returns:
+        Dict[str, Any]: Formatted result restricted to the page, with paging info
+    """
+    rows = full_result.get('results', [])
+    page_rows = rows[offset:offset + page_size]
+    next_offset = offset + len(page_rows)
+    has_more = next_offset < len(rows)
+    
+    page = {key: value for key, value in full_result.items() if key not in ('results', 'metadata')}
+    page.update({
+        'results': page_rows,
+        'row_count': len(page_rows),
+        'total_row_count': len(rows),
+        'page': {
+            'offset': offset,
+            'page_size': page_size,
+            'has_more': has_more,
+            'next_page_token': encode_page_token(result_id, next_offset) if has_more else None
+        }
+    })
+    return page
+
+def paginate_result(result: Dict[str, Any], page_size: int) -> Dict[str, Any]:
+    """
+    Spill a large result and return its first page.
+    Results that already fit in one page are returned unchanged.
+    
+    Args:
+        result (Dict[str, Any]): Formatted query result
+        page_size (int): Maximum rows per page
+        
+    Returns:
+        Dict[str, Any]: First page of the result
+    """
+    if not result.get('success') or len(result.get('results', [])) <= page_size:
+        return result
+    
+    metadata = result.get('metadata')
+    full_result = {key: value for key, value in result.items() if key != 'metadata'}
+    result_id = spill_store.put(full_result)
+    
+    page = build_result_page(full_result, result_id, 0, page_size)
+    if metadata:
+        page['metadata'] = metadata
+    return page
+
+def get_result_page(page_token: str, page_size: int) -> Dict[str, Any]:
+    """
+    Fetch a follow-up page of a previously spilled result.
+    
+    Args:
+        page_token (str): Token returned as next_page_token
+        page_size (int): Maximum rows per page
+        
+    Returns:
+        Dict[str, Any]: Requested page, or an error if the result has expired
+    """
+    try:
+        result_id, offset = decode_page_token(page_token)
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "The page_token could not be decoded"
+        }
+    
+    full_result = spill_store.get(result_id)
+    if full_result is None:
+        return {
+            "success": False,
+            "error": "Result expired",
+            "message": "The paged result is no longer available. Please re-run the query."
+        }
+    
+    return build_result_page(full_result, result_id, offset, page_size)
+
+# Async execution
+def submit_async_query(
+    query: str,
+    account_name: Optional[str] = None,
+    engine_name: Optional[str] = None,
+    cache_mode: str = CACHE_MODE_DEFAULT,
+    preflight_mode: str = PREFLIGHT_OFF
+) -> Dict[str, Any]:
+    """
+    Submit a query for background execution and return its handle immediately.
+    
+    Args:
+        query (str): SQL query to execute
+        account_name (str, optional): Firebolt account name to use (overrides env variable)
+        engine_name (str, optional): Firebolt engine name to use (overrides env variable)
+        cache_mode (str): Result cache mode
+        preflight_mode (str): Pre-flight cost guard mode
+    
+    Returns:
+        Dict[str, Any]: Handle with query_id and status 'running'
+    """
+    if job_tracker.executor is None:
+        return {
+            "success": False,
+            "error": "Async mode is not available: FIREBOLT_SHARED_STORE_URI is not configured",
+            "message": "Async queries need a shared store so any container can serve the result. Run the query without async."
+        }
+    
+    record = job_tracker.create({
+        'query': query,
+        'account_name': account_name,
+        'engine_name': engine_name,
+        'cache_mode': cache_mode,
+        'preflight_mode': preflight_mode
+    })
+    
+    try:
+        executor = job_tracker.dispatch(record, run_async_query)
+    except Exception as e:
+        job_tracker.update(record['query_id'], status=JOB_FAILED, error=str(e), completed_at=time.time())
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to submit query for async execution"
+        }
+    
+    print(f"Submitted async query {record['query_id']} via {executor} executor")
+    return {
+        'success': True,
+        'async': True,
+        'query_id': record['query_id'],
+        'status': JOB_RUNNING,
+        'message': "Query submitted. Call get_query_status with this query_id to poll for or await the result."
+    }
+
+def run_async_query(record: Dict[str, Any], context=None) -> Dict[str, Any]:
+    """
+    Execute a submitted query and record the outcome.
+    Successful results are spilled under the query_id so they can be paged.
+    
+    Args:
+        record (Dict[str, Any]): Job record created by submit_async_query
+        context: Lambda context of the worker invocation (bounds the read timeout)
+    
+    Returns:
+        Dict[str, Any]: Final job record
+    """
+    query_id = record['query_id']
+    started_at = time.time()
+    job_tracker.update(query_id, started_at=started_at)
+    
+    try:
+        secret_name = os.environ.get('FIREBOLT_CREDENTIALS_SECRET', 'firebolt-credentials')
+        region_name = os.environ.get('AWS_REGION', 'us-east-1')
+        result = execute_firebolt_query(
+            record['query'],
+            secret_name,
+            region_name,
+            record.get('account_name'),
+            record.get('engine_name'),
+            record.get('cache_mode', CACHE_MODE_DEFAULT),
+            record.get('preflight_mode', PREFLIGHT_OFF),
+            read_timeout=async_read_timeout(context)
+        )
+    except Exception as e:
+        result = {
+            'success': False,
+            'error': str(e),
+            'message': "Failed to execute query against Firebolt"
+        }
+    
+    execution_time_ms = int((time.time() - started_at) * 1000)
+    if not result.get('success'):
+        return job_tracker.update(
+            query_id,
+            status=JOB_FAILED,
+            error=result.get('error'),
+            message=result.get('message'),
+            completed_at=time.time(),
+            execution_time_ms=execution_time_ms
+        )
+    
+    full_result = {key: value for key, value in result.items() if key != 'metadata'}
+    spill_store.put(full_result, result_id=query_id)
+    return job_tracker.update(
+        query_id,
+        status=JOB_SUCCEEDED,
+        row_count=full_result.get('row_count', 0),
+        result_metadata=result.get('metadata'),
+        completed_at=time.time(),
+        execution_time_ms=execution_time_ms
+    )
+
+def get_query_status(query_id=None, wait_seconds=None, page_size=None, output_format=None):
+    """
+    Poll or await an async query submitted with query_fire(async_mode=True).
+    
+    Args:
+        query_id (str): Handle returned on submission
+        wait_seconds (int, optional): Block up to this many seconds for completion
+                                      (capped at FIREBOLT_ASYNC_MAX_WAIT)
+        page_size (int, optional): Return at most this many rows and a next_page_token
+        output_format (str, optional): 'rows' (default) or 'columnar'
+    
+    Returns:
+        dict: Job status, plus the first page of results once the query has succeeded
+    """
+    if not query_id:
+        return {
+            "success": False,
+            "error": "No query_id provided",
+            "message": "Please provide the query_id returned when the query was submitted"
+        }
+    
+    try:
+        wait_seconds = float(wait_seconds) if wait_seconds not in (None, '') else 0
+        page_size = int(page_size) if page_size not in (None, '') else None
+    except (TypeError, ValueError):
+        return {
+            "success": False,
+            "error": "Invalid wait_seconds or page_size",
+            "message": "wait_seconds and page_size must be numbers"
+        }
+    
+    output_format = (output_format or OUTPUT_FORMAT_ROWS).lower()
+    if output_format not in OUTPUT_FORMATS:
+        return {
+            "success": False,
+            "error": f"Invalid format: {output_format}",
+            "message": "Supported formats are: rows, columnar"
+        }
+    
+    record = job_tracker.wait(query_id, wait_seconds)
+    if record is None:
+        return {
+            "success": False,
+            "error": "Unknown query_id",
+            "message": "The query_id was not found or its result has expired. Please resubmit the query."
+        }
+    
+    status = record.get('status')
+    status_info = {
+        'query_id': query_id,
+        'status': status,
+        'elapsed_ms': int(((record.get('completed_at') or time.time()) - record.get('submitted_at', time.time())) * 1000)
+    }
+    
+    if status == JOB_RUNNING:
+        status_info.update({
+            'success': True,
+            'message': "Query is still running. Call get_query_status again to keep waiting."
+        })
+        return status_info
+    
+    if status == JOB_FAILED:
+        status_info.update({
+            'success': False,
+            'error': record.get('error'),
+            'message': record.get('message') or "Failed to execute query against Firebolt"
+        })
+        return status_info
+    
+    full_result = spill_store.get(query_id, refresh=True)
+    if full_result is None:
+        status_info.update({
+            'success': False,
+            'error': "Result expired",
+            'message': "The query finished but its result is no longer available. Please resubmit the query."
+        })
+        return status_info
+    
+    if page_size and len(full_result.get('results', [])) > page_size:
+        result = build_result_page(full_result, query_id, 0, page_size)
+    else:
+        result = dict(full_result)
+    result['metadata'] = dict(record.get('result_metadata') or {})
+    result['metadata']['async'] = {key: value for key, value in status_info.items() if key != 'status'}
+    result['metadata']['async']['execution_time_ms'] = record.get('execution_time_ms')
+    result['query_id'] = query_id
+    result['status'] = status
+    
+    if output_format == OUTPUT_FORMAT_COLUMNAR:
+        result = format_columnar_result(result)
+    return result
+
+# Batch execution
+def parse_batch_queries(queries: Union[str, List[Any], Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Normalize the accepted batch formats into a list of named queries.
+    Accepts a JSON string, a list of {"name": ..., "query": ...} objects or
+    plain SQL strings, or a mapping of name to SQL.
+    
+    Args:
+        queries: Batch definition as received from the caller
+    
+    Returns:
+        List[Dict[str, str]]: List of {"name": ..., "query": ...} entries
+    """
+    if isinstance(queries, str):
+        try:
+            queries = json.loads(queries)
+        except json.JSONDecodeError:
+            raise ValueError("queries must be a JSON list or object")
+    
+    if isinstance(queries, dict):
+        queries = [{'name': name, 'query': sql} for name, sql in queries.items()]
+    
+    if not isinstance(queries, list) or not queries:
+        raise ValueError("queries must be a non-empty list or object")
+    
+    named_queries = []
+    for index, entry in enumerate(queries):
+        if isinstance(entry, str):
+            entry = {'query': entry}
+        if not isinstance(entry, dict) or not entry.get('query'):
+            raise ValueError(f"Batch entry {index} has no query")
+        name = str(entry.get('name') or f"query_{index + 1}")
+        if any(existing['name'] == name for existing in named_queries):
+            raise ValueError(f"Duplicate query name in batch: {name}")
+        named_queries.append({'name': name, 'query': entry['query']})
+    
+    return named_queries
+
+def query_fire_batch(
+    queries: Union[str, List[Any], Dict[str, str]],
+    account_name: Optional[str] = None,
+    engine_name: Optional[str] = None,
+    cache: Optional[str] = None,
+    page_size: Optional[int] = None,
+    output_format: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    preflight: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Execute several independent named queries concurrently.
+    The access token is obtained once up front and shared by every worker.
+    
+    Args:
+        queries: Named queries (see parse_batch_queries)
+        account_name (str, optional): Firebolt account name to use (overrides env variable)
+        engine_name (str, optional): Firebolt engine name to use (overrides env variable)
+        cache (str, optional): Result cache mode applied to every query
+        page_size (int, optional): Page size applied to every query
+        output_format (str, optional): Output format applied to every query
+        max_concurrency (int, optional): Concurrency cap, never above FIREBOLT_MAX_CONCURRENT_QUERIES
+        preflight (str, optional): Pre-flight cost guard mode applied to every query
+    
+    Returns:
+        Dict[str, Any]: Per-query results keyed by name, with timing and error counts
+    """
+    start_time = time.time()
+    
+    try:
+        named_queries = parse_batch_queries(queries)
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Please provide queries as a list of {\"name\": ..., \"query\": ...} objects"
+        }
+    
+    try:
+        workers = int(max_concurrency) if max_concurrency not in (None, '') else MAX_CONCURRENT_QUERIES
+    except (TypeError, ValueError):
+        workers = MAX_CONCURRENT_QUERIES
+    workers = max(1, min(workers, MAX_CONCURRENT_QUERIES, len(named_queries)))
+    
+    # Warm the shared credential and token cache once so workers reuse a single token
+    try:
+        secret_name = os.environ.get('FIREBOLT_CREDENTIALS_SECRET', 'firebolt-credentials')
+        region_name = os.environ.get('AWS_REGION', 'us-east-1')
+        get_firebolt_access_token(get_firebolt_credentials(secret_name, region_name))
+    except Exception as e:
+        # Each query reports the failure individually
+        print(f"Batch token warm-up failed: {str(e)}")
+    
+    def run_named_query(entry: Dict[str, str]) -> Dict[str, Any]:
+        query_start = time.time()
+        result = query_fire(entry['query'], account_name, engine_name, cache, page_size,
+                            output_format=output_format, preflight=preflight)
+        result['execution_time_ms'] = int((time.time() - query_start) * 1000)
+        return result
+    
+    print(f"Executing batch of {len(named_queries)} queries with concurrency {workers}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [(entry['name'], executor.submit(run_named_query, entry)) for entry in named_queries]
+        results = {}
+        for name, future in futures:
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = {
+                    "success": False,
+                    "error": str(e),
+                    "message": "Failed to execute query against Firebolt"
+                }
+    
+    failed = [name for name, result in results.items() if not result.get('success')]
+    return {
+        'success': not failed,
+        'batch': True,
+        'results': results,
+        'query_count': len(named_queries),
+        'failed_count': len(failed),
+        'failed_queries': failed,
+        'max_concurrency': workers,
+        'total_time_ms': int((time.time() - start_time) * 1000)
+    }
+
 # Main Lambda handlers
-def query_fire(query=None, account_name=None, engine_name=None):
+def query_fire(query=None, account_name=None, engine_name=None, cache=None, page_size=None, page_token=None,
+               output_format=None, queries=None, max_concurrency=None, preflight=None, async_mode=None):
     """
     Execute SQL queries against Firebolt data warehouse and return structured results.
     Matches the Bedrock Agent function schema signature.
@@ -445,13 +1062,58 @@ def query_fire(query=None, account_name=None, engine_name=None):
                      or wrapped in markdown code blocks (```sql ... ```).
         account_name (str, optional): Firebolt account name to use (overrides env variable)
         engine_name (str, optional): Firebolt engine name to use (overrides env variable)
+        cache (str, optional): Result cache mode - 'bypass' skips the cache, 'refresh'
+                               re-runs the query and replaces the cached result
+        page_size (int, optional): Return at most this many rows and a next_page_token
+        page_token (str, optional): Token from a previous response to fetch the next page;
+                                    no query is executed when it is provided
+        output_format (str, optional): 'rows' (default) or 'columnar' for a compact
+                                       per-column encoding
+        queries (list, optional): Named queries to run concurrently instead of a single query
+        max_concurrency (int, optional): Concurrency cap for a batch of queries
+        preflight (str, optional): Pre-flight cost guard mode - 'off', 'limit' or 'explain'
+                                   (defaults to FIREBOLT_PREFLIGHT_MODE)
+        async_mode (bool, optional): Submit the query and return a query_id immediately;
+                                     fetch the result with get_query_status
     
     Returns:
         dict: Results from the Firebolt query in a structured format
     """
     start_time = time.time()
     
+    if queries:
+        return query_fire_batch(queries, account_name, engine_name, cache, page_size,
+                                output_format, max_concurrency, preflight)
+    
     try:
+        if page_size in ('', None):
+            page_size = None
+        else:
+            try:
+                page_size = int(page_size)
+            except (TypeError, ValueError):
+                page_size = 0
+            if page_size <= 0:
+                return {
+                    "success": False,
+                    "error": f"Invalid page_size: {page_size}",
+                    "message": "page_size must be a positive integer"
+                }
+        
+        output_format = (output_format or OUTPUT_FORMAT_ROWS).lower()
+        if output_format not in OUTPUT_FORMATS:
+            return {
+                "success": False,
+                "error": f"Invalid format: {output_format}",
+                "message": "Supported formats are: rows, columnar"
+            }
+        
+        if page_token:
+            result = get_result_page(page_token, page_size or DEFAULT_PAGE_SIZE)
+            if output_format == OUTPUT_FORMAT_COLUMNAR:
+                result = format_columnar_result(result)
+            return result
+        
         if not query:
             error_msg = "No SQL query provided"
             trace_error("ValueError", error_msg, "query_fire.input_validation")
@@ -461,6 +1123,22 @@ def query_fire(query=None, account_name=None, engine_name=None):
                 "message": "Please provide a valid SQL query to execute"
             }
         
+        cache_mode = (cache or CACHE_MODE_DEFAULT).lower()
+        if cache_mode not in CACHE_MODES:
+            return {
+                "success": False,
+                "error": f"Invalid cache mode: {cache}",
+                "message": "Supported cache modes are: bypass, refresh"
+            }
+        
+        preflight_mode = (preflight or DEFAULT_PREFLIGHT_MODE).lower()
+        if preflight_mode not in PREFLIGHT_MODES:
+            return {
+                "success": False,
+                "error": f"Invalid preflight mode: {preflight}",
+                "message": "Supported preflight modes are: off, limit, explain"
+            }
+        
         # Extract SQL from markdown if needed
         original_query = query
         query = extract_sql_from_markdown(query)
@@ -473,6 +1151,9 @@ def query_fire(query=None, account_name=None, engine_name=None):
             query_summary=query_summary
         )
         
+        if str(async_mode).lower() in ('true', '1', 'yes'):
+            return submit_async_query(query, account_name, engine_name, cache_mode, preflight_mode)
+        
         # Use environment variables or defaults for these values
         secret_name = os.environ.get('FIREBOLT_CREDENTIALS_SECRET', 'firebolt-credentials')
         region_name = os.environ.get('AWS_REGION', 'us-east-1')
@@ -486,9 +1167,17 @@ def query_fire(query=None, account_name=None, engine_name=None):
             secret_name, 
             region_name,
             account_name,
-            engine_name
+            engine_name,
+            cache_mode,
+            preflight_mode
         )
         
+        if page_size:
+            result = paginate_result(result, page_size)
+        
+        if output_format == OUTPUT_FORMAT_COLUMNAR:
+            result = format_columnar_result(result)
+        
         # Trace successful operation
         execution_time_ms = int((time.time() - start_time) * 1000)
         result_count = result.get('row_count', 0) if result.get('success') else 0
@@ -533,6 +1222,46 @@ def lambda_handler(event, context):
         
         print(f"Received event: {json.dumps(event)}")
         
+        # 0. Async worker invocation dispatched by submit_async_query
+        if 'async_execute' in event:
+            return run_async_query(event['async_execute'], context)
+        
+        # Status polling for async queries, in any of the supported formats
+        if event.get('function') == 'get_query_status' or event.get('action') == 'get_query_status':
+            if isinstance(event.get('parameters'), list):
+                params = {param.get('name'): param.get('value') for param in event['parameters']}
+            else:
+                params = (event.get('body') or {}).get('parameters', {})
+            result = get_query_status(params.get('query_id'), params.get('wait_seconds'),
+                                      params.get('page_size'), params.get('format'))
+            
+            if 'function' in event:
+                return {
+                    'messageVersion': '1.0',
+                    'response': {
+                        'actionGroup': event.get('actionGroup'),
+                        'function': event.get('function'),
+                        'functionResponse': {
+                            'responseBody': {
+                                'TEXT': {
+                                    'body': json.dumps(result)
+                                }
+                            }
+                        }
+                    }
+                }
+            return {
+                'actionGroup': event.get('actionGroup'),
+                'action': event.get('action'),
+                'actionGroupOutput': {
+                    'body': json.dumps(result)
+                }
+            }
+        
+        if 'query_id' in event and 'query' not in event:
+            return get_query_status(event.get('query_id'), event.get('wait_seconds'),
+                                    event.get('page_size'), event.get('format'))
+        
         # 1. Check if this is a new Bedrock Agent format with 'function' field
         if 'function' in event and event.get('function') in ['query_firebolt', 'query_fire'] and 'actionGroup' in event:
             # Handle new Bedrock agent format
@@ -541,9 +1270,18 @@ def lambda_handler(event, context):
                 query = params.get('query')
                 account_name = params.get('account_name')
                 engine_name = params.get('engine_name')
+                cache = params.get('cache')
+                page_size = params.get('page_size')
+                page_token = params.get('page_token')
+                output_format = params.get('format')
+                queries = params.get('queries')
+                max_concurrency = params.get('max_concurrency')
+                preflight = params.get('preflight')
+                async_mode = params.get('async')
                 
                 # Call our dedicated function and wrap for Bedrock agent compatibility  
-                result = query_fire(query, account_name, engine_name)
+                result = query_fire(query, account_name, engine_name, cache, page_size, page_token, output_format,
+                                    queries, max_concurrency, preflight, async_mode)
                 
                 # Return in new Bedrock agent format
                 return {
@@ -575,9 +1313,18 @@ def lambda_handler(event, context):
                 query = parameters.get('query')
                 account_name = parameters.get('account_name')
                 engine_name = parameters.get('engine_name')
+                cache = parameters.get('cache')
+                page_size = parameters.get('page_size')
+                page_token = parameters.get('page_token')
+                output_format = parameters.get('format')
+                queries = parameters.get('queries')
+                max_concurrency = parameters.get('max_concurrency')
+                preflight = parameters.get('preflight')
+                async_mode = parameters.get('async')
                 
                 # Call our dedicated function and wrap for Bedrock agent compatibility
-                result = query_fire(query, account_name, engine_name)
+                result = query_fire(query, account_name, engine_name, cache, page_size, page_token, output_format,
+                                    queries, max_concurrency, preflight, async_mode)
                 
                 # Return in old Bedrock agent format
                 return {
@@ -595,13 +1342,22 @@ def lambda_handler(event, context):
                 }
                 
         # 3. Check if this is a direct invocation with parameters
-        elif 'query' in event:
+        elif 'query' in event or 'page_token' in event or 'queries' in event:
             # Direct invocation
             query = event.get('query')
             account_name = event.get('account_name')
             engine_name = event.get('engine_name')
+            cache = event.get('cache')
+            page_size = event.get('page_size')
+            page_token = event.get('page_token')
+            output_format = event.get('format')
+            queries = event.get('queries')
+            max_concurrency = event.get('max_concurrency')
+            preflight = event.get('preflight')
+            async_mode = event.get('async')
             
-            return query_fire(query, account_name, engine_name)
+            return query_fire(query, account_name, engine_name, cache, page_size, page_token, output_format,
+                              queries, max_concurrency, preflight, async_mode)
                 
         # 4. Legacy parameter format for backward compatibility  
         elif 'parameters' in event and isinstance(event['parameters'], list):
@@ -610,8 +1366,17 @@ def lambda_handler(event, context):
             query = params.get('query')
             account_name = params.get('account_name')
             engine_name = params.get('engine_name')
+            cache = params.get('cache')
+            page_size = params.get('page_size')
+            page_token = params.get('page_token')
+            output_format = params.get('format')
+            queries = params.get('queries')
+            max_concurrency = params.get('max_concurrency')
+            preflight = params.get('preflight')
+            async_mode = params.get('async')
             
-            return query_fire(query, account_name, engine_name)
+            return query_fire(query, account_name, engine_name, cache, page_size, page_token, output_format,
+                              queries, max_concurrency, preflight, async_mode)
         
         # 5. No recognizable format
         return {
@@ -0,0 +1,264 @@
+"""
+RevOps AI Framework V2 - Firebolt Query Pre-flight Guard
+
+Optional pre-flight checks for agent-generated SQL before it reaches the
+engine:
+    1. LIMIT injection - non-aggregate SELECTs without a top-level LIMIT get a
+       configurable row cap appended
+    2. EXPLAIN check - the plan's estimated scan is compared against a
+       threshold and the query is rejected (or rerouted to a heavy-query
+       engine) when it is too expensive
+
+Modes (FIREBOLT_PREFLIGHT_MODE or the per-call preflight parameter):
+    off      - no checks (default)
+    limit    - LIMIT injection only
+    explain  - LIMIT injection and EXPLAIN check
+"""
+
+import os
+import re
+from typing import Dict, Any, Callable, List, Optional
+
+PREFLIGHT_OFF = 'off'
+PREFLIGHT_LIMIT = 'limit'
+PREFLIGHT_EXPLAIN = 'explain'
+PREFLIGHT_MODES = (PREFLIGHT_OFF, PREFLIGHT_LIMIT, PREFLIGHT_EXPLAIN)
+
+DEFAULT_PREFLIGHT_MODE = os.environ.get('FIREBOLT_PREFLIGHT_MODE', PREFLIGHT_OFF).lower()
+DEFAULT_ROW_CAP = int(os.environ.get('FIREBOLT_PREFLIGHT_ROW_CAP', '1000'))
+MAX_SCAN_ROWS = int(os.environ.get('FIREBOLT_PREFLIGHT_MAX_SCAN_ROWS', '0'))
+MAX_SCAN_BYTES = int(os.environ.get('FIREBOLT_PREFLIGHT_MAX_SCAN_BYTES', '0'))
+# When set, expensive queries run on this engine instead of being rejected
+HEAVY_ENGINE_NAME = os.environ.get('FIREBOLT_HEAVY_ENGINE_NAME')
+
+# Literals and comments in one scan, so '--' inside a string is not taken for a comment
+_LEXEME_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*[\s\S]*?\*/")
+_AGGREGATE_PATTERN = re.compile(r'\b(count|sum|avg|min|max|median|approx_count_distinct|array_agg|string_agg|stddev\w*|var\w*)\s*\(')
+_ROWS_PATTERN = re.compile(r'(?:estimated[_ ]?)?rows?\s*[=:]\s*([\d,]+)', re.IGNORECASE)
+_BYTES_PATTERN = re.compile(r'([\d.]+)\s*(bytes|b|kib|kb|mib|mb|gib|gb|tib|tb)\b', re.IGNORECASE)
+_BYTE_UNITS = {
+    'b': 1, 'bytes': 1,
+    'kb': 1000, 'kib': 1024,
+    'mb': 1000 ** 2, 'mib': 1024 ** 2,
+    'gb': 1000 ** 3, 'gib': 1024 ** 3,
+    'tb': 1000 ** 4, 'tib': 1024 ** 4
+}
+
+def _mask_sql(sql: str) -> str:
+    """Lower-cased SQL with comments and literals blanked out, same length."""
+    def blank(match):
+        lexeme = match.group(0)
+        if lexeme.startswith(('--', '/*')):
+            return ' ' * len(lexeme)
+        return "'" + ' ' * (len(lexeme) - 2) + "'"
+    return _LEXEME_PATTERN.sub(blank, sql).lower()
+
+def _strip_nested(masked: str) -> str:
+    """Masked SQL with everything inside parentheses blanked out."""
+    depth = 0
+    out = []
+    for char in masked:
+        if char == '(':
+            depth += 1
+            out.append(' ')
+        elif char == ')':
+            depth = max(0, depth - 1)
+            out.append(' ')
+        elif depth == 0:
+            out.append(char)
+        else:
+            out.append(' ')
+    return ''.join(out)
+
+def _top_level_text(sql: str) -> str:
+    """Masked SQL with everything inside parentheses removed."""
+    return _strip_nested(_mask_sql(sql))
+
+def _set_operation_branches(sql: str) -> List[str]:
+    """Masked SELECTs joined by a top-level UNION, INTERSECT or EXCEPT."""
+    masked = _mask_sql(sql)
+    top_level = _strip_nested(masked)
+    branches = []
+    start = 0
+    for match in re.finditer(r'\b(union|intersect|except|minus)\b(\s+(all|distinct)\b)?', top_level):
+        branches.append(masked[start:match.start()])
+        start = match.end()
+    branches.append(masked[start:])
+    return branches
+
+def _final_select_clause(masked: str) -> str:
+    """Select list of the outermost (last top-level) SELECT of masked SQL, parentheses kept."""
+    depth = 0
+    last_select = -1
+    for match in re.finditer(r'\(|\)|\bselect\b', masked):
+        token = match.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth = max(0, depth - 1)
+        elif depth == 0:
+            last_select = match.end()
+    if last_select < 0:
+        return ''
+    from_match = re.search(r'\bfrom\b', masked[last_select:])
+    return masked[last_select:last_select + from_match.start()] if from_match else masked[last_select:]
+
+def _is_aggregate_branch(masked: str) -> bool:
+    top_level = _strip_nested(masked)
+    if re.search(r'\bgroup\s+by\b', top_level):
+        return True
+    if re.search(r'\bselect\s+distinct\b', top_level):
+        return False
+    return bool(_AGGREGATE_PATTERN.search(_final_select_clause(masked)))
+
+def is_select_statement(sql: str) -> bool:
+    return bool(re.match(r'^\s*(select|with)\b', _mask_sql(sql)))
+
+def has_top_level_limit(sql: str) -> bool:
+    return bool(re.search(r'\b(limit|fetch\s+first|fetch\s+next)\b', _top_level_text(sql)))
+
+def is_aggregate_query(sql: str) -> bool:
+    """True when the outer query groups or only returns aggregates (in every branch of a UNION)."""
+    return all(_is_aggregate_branch(branch) for branch in _set_operation_branches(sql))
+
+def _top_level_offset_position(sql: str) -> int:
+    """Index of the outermost query's OFFSET keyword in sql, or -1."""
+    match = None
+    for match in re.finditer(r'\boffset\b', _top_level_text(sql)):
+        pass
+    return match.start() if match else -1
+
+def inject_limit(sql: str, row_cap: int) -> str:
+    """
+    Add a LIMIT to the statement: appended at the end, or placed before a
+    trailing top-level OFFSET (LIMIT must precede OFFSET). Trailing semicolons
+    are dropped and trailing comments are kept on their own line after it.
+
+    Args:
+        sql (str): SQL query text
+        row_cap (int): Maximum rows to return
+
+    Returns:
+        str: SQL with the LIMIT added
+    """
+    masked = _mask_sql(sql)
+    code_end = len(masked)
+    while code_end > 0 and (masked[code_end - 1].isspace() or masked[code_end - 1] == ';'):
+        code_end -= 1
+    body = sql[:code_end]
+    trailing = ''.join(char for char, mask in zip(sql[code_end:], masked[code_end:]) if mask != ';').strip()
+    trailing = f"\n{trailing}" if trailing else ''
+    
+    offset_position = _top_level_offset_position(body)
+    if offset_position >= 0:
+        # New lines on both sides, so a line comment before OFFSET cannot swallow the LIMIT
+        return f"{body[:offset_position].rstrip()}\nLIMIT {row_cap}\n{body[offset_position:]}{trailing}"
+    # A line comment inside the statement would swallow the LIMIT, so start a new line
+    return f"{body}\nLIMIT {row_cap}{trailing}"
+
+def parse_explain_estimate(raw_result: Any) -> Dict[str, Optional[int]]:
+    """
+    Extract the largest row and byte estimates from an EXPLAIN response.
+    Plan text is scanned for "rows=N" / "estimated_rows: N" and "N GiB"
+    style annotations; absent annotations yield None.
+
+    Args:
+        raw_result: Parsed JSON returned by the engine for the EXPLAIN statement
+
+    Returns:
+        Dict[str, Optional[int]]: {'estimated_rows': ..., 'estimated_bytes': ...}
+    """
+    texts = []
+
+    def collect(value):
+        if isinstance(value, str):
+            texts.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+
+    collect(raw_result.get('data', raw_result) if isinstance(raw_result, dict) else raw_result)
+    plan_text = '\n'.join(texts)
+
+    rows = [int(match.replace(',', '')) for match in _ROWS_PATTERN.findall(plan_text)]
+    byte_values = [
+        int(float(amount) * _BYTE_UNITS[unit.lower()])
+        for amount, unit in _BYTES_PATTERN.findall(plan_text)
+        if amount.replace('.', '', 1).isdigit()
+    ]
+
+    return {
+        'estimated_rows': max(rows) if rows else None,
+        'estimated_bytes': max(byte_values) if byte_values else None
+    }
+
+def apply_limit_guard(sql: str, row_cap: int = DEFAULT_ROW_CAP) -> Dict[str, Any]:
+    """
+    Inject a LIMIT into non-aggregate SELECTs that lack one.
+
+    Args:
+        sql (str): SQL query text
+        row_cap (int): LIMIT to inject
+
+    Returns:
+        Dict[str, Any]: {'query': possibly rewritten SQL, 'actions': [...]}
+    """
+    actions = []
+    if is_select_statement(sql) and not has_top_level_limit(sql) and not is_aggregate_query(sql):
+        sql = inject_limit(sql, row_cap)
+        actions.append(f"limit_injected:{row_cap}")
+    return {'query': sql, 'actions': actions}
+
+def check_explain_estimate(
+    sql: str,
+    run_explain: Callable[[str], Any],
+    max_scan_rows: int = MAX_SCAN_ROWS,
+    max_scan_bytes: int = MAX_SCAN_BYTES,
+    heavy_engine: Optional[str] = HEAVY_ENGINE_NAME
+) -> Dict[str, Any]:
+    """
+    Run EXPLAIN and decide whether the query may proceed.
+
+    Args:
+        sql (str): SQL query text
+        run_explain (Callable): Executes a statement and returns the parsed engine response
+        max_scan_rows (int): Row estimate threshold, 0 disables the check
+        max_scan_bytes (int): Byte estimate threshold, 0 disables the check
+        heavy_engine (str, optional): Engine to reroute expensive queries to
+
+    Returns:
+        Dict[str, Any]: {'allowed': bool, 'engine': reroute target or None,
+                         'estimate': {...}, 'message': str}
+    """
+    estimate = parse_explain_estimate(run_explain(f"EXPLAIN {sql.rstrip().rstrip(';')}"))
+    violations: List[str] = []
+
+    if max_scan_rows and estimate['estimated_rows'] is not None and estimate['estimated_rows'] > max_scan_rows:
+        violations.append(f"estimated scan of {estimate['estimated_rows']:,} rows exceeds the {max_scan_rows:,} row limit")
+    if max_scan_bytes and estimate['estimated_bytes'] is not None and estimate['estimated_bytes'] > max_scan_bytes:
+        violations.append(f"estimated scan of {estimate['estimated_bytes']:,} bytes exceeds the {max_scan_bytes:,} byte limit")
+
+    if not violations:
+        return {'allowed': True, 'engine': None, 'estimate': estimate, 'message': 'Within scan limits'}
+
+    if heavy_engine:
+        return {
+            'allowed': True,
+            'engine': heavy_engine,
+            'estimate': estimate,
+            'message': f"Rerouted to engine {heavy_engine}: {'; '.join(violations)}"
+        }
+
+    return {
+        'allowed': False,
+        'engine': None,
+        'estimate': estimate,
+        'message': (
+            f"Query rejected by pre-flight check: {'; '.join(violations)}. "
+            "Narrow the query with a date range or account filter, select fewer columns, "
+            "or aggregate with GROUP BY before retrying."
+        )
+    }
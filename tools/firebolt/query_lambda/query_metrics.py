@@ -0,0 +1,278 @@
+"""
+RevOps AI Framework V2 - Firebolt Query Instrumentation
+
+Per-query hot-path metrics for the query lambda. Every execution emits one
+compact CloudWatch Embedded Metric Format (EMF) JSON line carrying the SQL
+shape fingerprint, the auth / network / parse time split, rows and bytes
+returned and the cache status.
+
+The fingerprint is computed on the SQL shape (literals replaced by "?"), so
+the same agent-generated query with different dates or account names lands
+in one bucket. It is logged as a property rather than a metric dimension to
+keep CloudWatch metric cardinality bounded.
+
+Run this module locally against exported Lambda logs to get p50/p95/p99 per
+fingerprint:
+
+    python query_metrics.py exported-logs.txt --top 20
+    aws logs tail /aws/lambda/revops-firebolt-query --since 1d | python query_metrics.py
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, List, Optional
+
+from result_cache import normalize_sql
+
+METRICS_ENABLED = os.environ.get('FIREBOLT_QUERY_METRICS', 'true').lower() not in ('false', '0', 'no', 'off')
+METRICS_NAMESPACE = os.environ.get('FIREBOLT_METRICS_NAMESPACE', 'RevOpsAI/FireboltQuery')
+SHAPE_SAMPLE_CHARS = 300
+
+PHASES = ('auth', 'preflight', 'network', 'parse')
+
+# (record field, EMF unit)
+_METRIC_FIELDS = [
+    ('TotalMs', 'Milliseconds'),
+    ('AuthMs', 'Milliseconds'),
+    ('NetworkMs', 'Milliseconds'),
+    ('ParseMs', 'Milliseconds'),
+    ('Rows', 'Count'),
+    ('Bytes', 'Bytes')
+]
+
+_STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_PATTERN = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])')
+_IN_LIST_PATTERN = re.compile(r'\bin\((?:\?,)*\?\)')
+
+def sql_shape(sql: str) -> str:
+    """
+    Normalized SQL with string and numeric literals replaced by "?".
+
+    Args:
+        sql (str): SQL query text
+
+    Returns:
+        str: SQL shape shared by queries that only differ in their literals
+    """
+    shape = _STRING_LITERAL_PATTERN.sub('?', normalize_sql(sql))
+    shape = _NUMBER_PATTERN.sub('?', shape)
+    return _IN_LIST_PATTERN.sub('in(?)', shape)
+
+def shape_fingerprint(sql: str) -> str:
+    """
+    Short stable hash of the SQL shape.
+
+    Args:
+        sql (str): SQL query text
+
+    Returns:
+        str: 16-character hex fingerprint
+    """
+    return hashlib.sha256(sql_shape(sql).encode('utf-8')).hexdigest()[:16]
+
+class QueryMetrics:
+    """
+    Timing and size record for a single query execution.
+    """
+
+    def __init__(self, sql: str = ''):
+        self.start_time = time.time()
+        self.sql = sql
+        self.phases_ms = {phase: 0.0 for phase in PHASES}
+        self.rows = 0
+        self.bytes = 0
+        self.cache_status = None
+        self.engine = None
+        self.success = False
+        self.error = None
+        self._emitted = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """Accumulate the wall time spent inside the block under the given phase."""
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases_ms[name] = self.phases_ms.get(name, 0.0) + (time.perf_counter() - phase_start) * 1000
+
+    def total_ms(self) -> float:
+        return (time.time() - self.start_time) * 1000
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Timing split for response metadata.
+
+        Returns:
+            Dict[str, Any]: Fingerprint and per-phase milliseconds
+        """
+        timings = {f"{phase}_ms": round(ms, 1) for phase, ms in self.phases_ms.items() if ms}
+        timings['total_ms'] = round(self.total_ms(), 1)
+        return {'fingerprint': shape_fingerprint(self.sql), 'timings': timings}
+
+    def to_record(self) -> Dict[str, Any]:
+        """
+        Build the EMF log record.
+
+        Returns:
+            Dict[str, Any]: EMF-formatted record
+        """
+        record = {
+            '_aws': {
+                'Timestamp': int(self.start_time * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['CacheStatus']],
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, unit in _METRIC_FIELDS]
+                }]
+            },
+            'CacheStatus': self.cache_status or 'none',
+            'Fingerprint': shape_fingerprint(self.sql),
+            'SqlShape': sql_shape(self.sql)[:SHAPE_SAMPLE_CHARS],
+            'Success': self.success,
+            'TotalMs': round(self.total_ms(), 1),
+            'AuthMs': round(self.phases_ms['auth'], 1),
+            'NetworkMs': round(self.phases_ms['network'], 1),
+            'ParseMs': round(self.phases_ms['parse'], 1),
+            'Rows': self.rows,
+            'Bytes': self.bytes
+        }
+        if self.phases_ms['preflight']:
+            record['PreflightMs'] = round(self.phases_ms['preflight'], 1)
+        if self.engine:
+            record['Engine'] = self.engine
+        if self.error:
+            record['Error'] = self.error[:200]
+        return record
+
+    def emit(self) -> None:
+        """Write the record to stdout as a single JSON line (once)."""
+        if self._emitted or not METRICS_ENABLED:
+            return
+        self._emitted = True
+        try:
+            print(json.dumps(self.to_record(), separators=(',', ':'), default=str), flush=True)
+        except Exception as e:
+            # Instrumentation must never fail the query
+            print(f"Error emitting query metrics: {str(e)}")
+
+# Local aggregation
+def parse_metric_lines(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Extract query metric records from raw log lines.
+    Lines may carry a CloudWatch prefix (timestamp, request id); anything
+    that is not a query metric record is ignored.
+
+    Args:
+        lines: Log lines
+
+    Returns:
+        List[Dict[str, Any]]: Parsed metric records
+    """
+    records = []
+    for line in lines:
+        start = line.find('{"_aws"')
+        if start < 0:
+            continue
+        try:
+            record = json.loads(line[start:].strip())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict) and 'Fingerprint' in record:
+            records.append(record)
+    return records
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Linear-interpolated percentile.
+
+    Args:
+        values: Sample values
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Optional[float]: Percentile value or None for an empty sample
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def aggregate_metrics(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Summarize metric records per fingerprint, most total time first.
+
+    Args:
+        records: Records as produced by parse_metric_lines
+
+    Returns:
+        List[Dict[str, Any]]: One summary per fingerprint with latency
+                              percentiles, cache hit rate and payload sizes
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(record['Fingerprint'], []).append(record)
+
+    summaries = []
+    for fingerprint, group in groups.items():
+        total = [r.get('TotalMs', 0) for r in group]
+        network = [r.get('NetworkMs', 0) for r in group if r.get('CacheStatus') != 'hit']
+        hits = sum(1 for r in group if r.get('CacheStatus') == 'hit')
+        summaries.append({
+            'fingerprint': fingerprint,
+            'count': len(group),
+            'errors': sum(1 for r in group if not r.get('Success')),
+            'cache_hit_rate': round(hits / len(group), 3),
+            'total_ms_sum': round(sum(total), 1),
+            'p50_ms': round(percentile(total, 50), 1),
+            'p95_ms': round(percentile(total, 95), 1),
+            'p99_ms': round(percentile(total, 99), 1),
+            'network_p95_ms': round(percentile(network, 95), 1) if network else None,
+            'avg_rows': round(sum(r.get('Rows', 0) for r in group) / len(group), 1),
+            'avg_bytes': round(sum(r.get('Bytes', 0) for r in group) / len(group), 1),
+            'sql_shape': group[-1].get('SqlShape', '')
+        })
+
+    summaries.sort(key=lambda s: s['total_ms_sum'], reverse=True)
+    return summaries
+
+def main():
+    """Aggregate query metric log lines into per-fingerprint percentiles"""
+    parser = argparse.ArgumentParser(description='Firebolt query latency percentiles per SQL fingerprint')
+    parser.add_argument('files', nargs='*', help='Log files to read (defaults to stdin)')
+    parser.add_argument('--top', type=int, default=20, help='Number of fingerprints to show')
+    parser.add_argument('--json', action='store_true', help='Print the full summary as JSON')
+
+    args = parser.parse_args()
+
+    records = []
+    if args.files:
+        for path in args.files:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                records.extend(parse_metric_lines(f))
+    else:
+        records = parse_metric_lines(sys.stdin)
+
+    summaries = aggregate_metrics(records)[:args.top]
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return
+
+    print(f"{len(records)} query records, {len(summaries)} fingerprints shown")
+    print(f"{'fingerprint':<17} {'count':>6} {'hit%':>5} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'rows':>9}  shape")
+    for s in summaries:
+        print(f"{s['fingerprint']:<17} {s['count']:>6} {s['cache_hit_rate'] * 100:>5.0f} {s['errors']:>4} "
+              f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['avg_rows']:>9.0f}  {s['sql_shape'][:80]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+RevOps AI Framework V2 - Firebolt Query Result Cache
+
+Two-tier result cache in front of query_fire:
+    1. In-memory LRU bounded by serialized bytes (per warm container)
+    2. Shared tier (S3 prefix or local directory) so all containers benefit
+
+Entries are keyed on a normalized SQL fingerprint plus account, engine and
+database. TTLs are configurable per table; a query uses the shortest TTL of
+the tables it references.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+# Cache modes accepted from callers
+CACHE_MODE_DEFAULT = 'default'
+CACHE_MODE_BYPASS = 'bypass'
+CACHE_MODE_REFRESH = 'refresh'
+CACHE_MODES = (CACHE_MODE_DEFAULT, CACHE_MODE_BYPASS, CACHE_MODE_REFRESH)
+
+DEFAULT_TTL_SECONDS = int(os.environ.get('FIREBOLT_RESULT_CACHE_TTL', '300'))
+MAX_MEMORY_BYTES = int(os.environ.get('FIREBOLT_RESULT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+SHARED_KEY_PREFIX = 'query-results'
+
+_COMMENT_PATTERN = re.compile(r'--[^\n]*|/\*[\s\S]*?\*/')
+_LEXEME_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*[\s\S]*?\*/")
+_PUNCTUATION_PATTERN = re.compile(r'\s*([(),=<>])\s*')
+_TABLE_PATTERN = re.compile(r'\b(?:from|join)\s+([a-z_][\w."]*)', re.IGNORECASE)
+_READ_ONLY_PATTERN = re.compile(r'^\s*(select|with|show|describe|explain)\b', re.IGNORECASE)
+
+def normalize_sql(sql: str) -> str:
+    """
+    Normalize SQL so semantically identical queries share a fingerprint.
+    Strips comments, collapses whitespace and lower-cases everything outside
+    string literals and quoted identifiers, which are kept byte-for-byte
+    ('Acme , Inc' and 'Acme, Inc' are different queries).
+
+    Args:
+        sql (str): SQL query text
+
+    Returns:
+        str: Normalized SQL
+    """
+    sql = sql or ''
+    normalized = []
+    outside = []
+
+    def flush_outside():
+        text = re.sub(r'\s+', ' ', ''.join(outside)).lower()
+        normalized.append(_PUNCTUATION_PATTERN.sub(r'\1', text))
+        outside.clear()
+
+    position = 0
+    for match in _LEXEME_PATTERN.finditer(sql):
+        outside.append(sql[position:match.start()])
+        lexeme = match.group(0)
+        if lexeme.startswith(('--', '/*')):
+            outside.append(' ')
+        else:
+            # String literal or quoted identifier - keep as-is
+            flush_outside()
+            normalized.append(lexeme)
+        position = match.end()
+    outside.append(sql[position:])
+    flush_outside()
+    return ''.join(normalized).strip().rstrip(';').strip()
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Short stable hash of the normalized SQL text.
+
+    Args:
+        sql (str): SQL query text
+
+    Returns:
+        str: 16-character hex fingerprint
+    """
+    return hashlib.sha256(normalize_sql(sql).encode('utf-8')).hexdigest()[:16]
+
+def make_cache_key(sql: str, account: str, engine: str, database: str) -> str:
+    """
+    Cache key combining the SQL fingerprint with the connection target.
+
+    Args:
+        sql (str): SQL query text
+        account (str): Firebolt account name
+        engine (str): Firebolt engine name
+        database (str): Firebolt database name
+
+    Returns:
+        str: Hex cache key
+    """
+    material = f"{account}|{engine}|{database}|{normalize_sql(sql)}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def is_cacheable_query(sql: str) -> bool:
+    """Only read-only statements are cached."""
+    return bool(_READ_ONLY_PATTERN.match(_COMMENT_PATTERN.sub(' ', sql or '')))
+
+def extract_tables(sql: str) -> List[str]:
+    """
+    Best-effort list of table names referenced in FROM/JOIN clauses.
+
+    Args:
+        sql (str): SQL query text
+
+    Returns:
+        List[str]: Unqualified, lower-cased table names
+    """
+    tables = []
+    for match in _TABLE_PATTERN.finditer(_COMMENT_PATTERN.sub(' ', sql or '')):
+        name = match.group(1).replace('"', '').split('.')[-1].lower()
+        if name and name not in tables:
+            tables.append(name)
+    return tables
+
+def load_table_ttls() -> Dict[str, int]:
+    """
+    Per-table TTL overrides from FIREBOLT_RESULT_CACHE_TABLE_TTLS,
+    e.g. {"opportunity_d": 900, "consumption_event_f": 60}.
+    """
+    raw = os.environ.get('FIREBOLT_RESULT_CACHE_TABLE_TTLS')
+    if not raw:
+        return {}
+    try:
+        return {str(k).lower(): int(v) for k, v in json.loads(raw).items()}
+    except (ValueError, AttributeError, TypeError):
+        print(f"Ignoring invalid FIREBOLT_RESULT_CACHE_TABLE_TTLS: {raw}")
+        return {}
+
+class ResultCache:
+    """
+    Byte-bounded in-memory LRU with an optional shared tier.
+    Values are stored as serialized JSON so cached results are never mutated
+    by callers and their size is known exactly.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = MAX_MEMORY_BYTES,
+        shared_store=None,
+        default_ttl: int = DEFAULT_TTL_SECONDS,
+        table_ttls: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            max_bytes: Upper bound for the in-memory tier
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            default_ttl: TTL in seconds for tables without an override
+            table_ttls: Per-table TTL overrides in seconds
+        """
+        self.max_bytes = max_bytes
+        self.shared_store = shared_store
+        self.default_ttl = default_ttl
+        self.table_ttls = table_ttls if table_ttls is not None else {}
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+
+    def ttl_for_query(self, sql: str) -> int:
+        """Shortest TTL among the tables referenced by the query."""
+        ttls = [self.table_ttls[t] for t in extract_tables(sql) if t in self.table_ttls]
+        return min(ttls) if ttls else self.default_ttl
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], float]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            Tuple of (result or None, tier name or None, age in seconds)
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, stored_at, expires_at = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return json.loads(payload), 'memory', now - stored_at
+                self._remove(key)
+
+        if self.shared_store is not None:
+            try:
+                blob = self.shared_store.get(f"{SHARED_KEY_PREFIX}/{key}.json")
+            except Exception as e:
+                print(f"Shared result cache read failed: {str(e)}")
+                blob = None
+            if blob:
+                envelope = json.loads(blob.decode('utf-8'))
+                if now < envelope.get('expires_at', 0):
+                    payload = json.dumps(envelope['result']).encode('utf-8')
+                    with self._lock:
+                        self._insert(key, payload, envelope['stored_at'], envelope['expires_at'])
+                    self.stats['shared_hits'] += 1
+                    return envelope['result'], 'shared', now - envelope['stored_at']
+
+        self.stats['misses'] += 1
+        return None, None, 0.0
+
+    def put(self, key: str, result: Dict[str, Any], ttl: int) -> None:
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: Cache key from make_cache_key
+            result: JSON-serializable query result
+            ttl: Time to live in seconds; non-positive values skip caching
+        """
+        if ttl <= 0:
+            return
+
+        stored_at = time.time()
+        expires_at = stored_at + ttl
+        payload = json.dumps(result, default=str).encode('utf-8')
+
+        with self._lock:
+            self._insert(key, payload, stored_at, expires_at)
+
+        if self.shared_store is not None:
+            envelope = {
+                'stored_at': stored_at,
+                'expires_at': expires_at,
+                'result': json.loads(payload)
+            }
+            try:
+                self.shared_store.put(f"{SHARED_KEY_PREFIX}/{key}.json", json.dumps(envelope).encode('utf-8'))
+            except Exception as e:
+                print(f"Shared result cache write failed: {str(e)}")
+
+    def invalidate(self, key: str) -> None:
+        """Remove a key from both tiers."""
+        with self._lock:
+            self._remove(key)
+        if self.shared_store is not None:
+            try:
+                self.shared_store.delete(f"{SHARED_KEY_PREFIX}/{key}.json")
+            except Exception as e:
+                print(f"Shared result cache delete failed: {str(e)}")
+
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def _insert(self, key: str, payload: bytes, stored_at: float, expires_at: float) -> None:
+        # Results larger than the whole budget are only kept in the shared tier
+        if len(payload) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (payload, stored_at, expires_at)
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats['evictions'] += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
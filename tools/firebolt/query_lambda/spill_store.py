@@ -0,0 +1,141 @@
+"""
+RevOps AI Framework V2 - Firebolt Query Spill Store
+
+Short-lived store for full query results that are too large to return in a
+single Bedrock action-group response. Results are kept in memory for the warm
+container and mirrored to the shared store so a follow-up page request that
+lands on a different container can still be served.
+"""
+
+import os
+import json
+import time
+import uuid
+import base64
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+SPILL_TTL_SECONDS = int(os.environ.get('FIREBOLT_SPILL_TTL', '900'))
+SPILL_KEY_PREFIX = 'spill'
+
+def encode_page_token(result_id: str, offset: int) -> str:
+    """
+    Encode an opaque page token.
+
+    Args:
+        result_id (str): Spilled result identifier
+        offset (int): Row offset of the page the token points at
+
+    Returns:
+        str: URL-safe page token
+    """
+    raw = json.dumps({'r': result_id, 'o': offset}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_page_token(page_token: str) -> Tuple[str, int]:
+    """
+    Decode a page token produced by encode_page_token.
+
+    Args:
+        page_token (str): Page token
+
+    Returns:
+        Tuple[str, int]: Result identifier and row offset
+    """
+    try:
+        padded = page_token + '=' * (-len(page_token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        return str(data['r']), int(data['o'])
+    except Exception:
+        raise ValueError("Invalid page_token")
+
+class SpillStore:
+    """
+    TTL-bounded store of full query results keyed by a generated result id.
+    """
+
+    def __init__(self, shared_store=None, ttl_seconds: int = SPILL_TTL_SECONDS):
+        """
+        Initialize the spill store.
+
+        Args:
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            ttl_seconds: How long spilled results stay retrievable
+        """
+        self.shared_store = shared_store
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def put(self, result: Dict[str, Any], result_id: Optional[str] = None) -> str:
+        """
+        Spill a result and return its identifier.
+
+        Args:
+            result: JSON-serializable result
+            result_id: Optional identifier; generated when omitted
+
+        Returns:
+            str: Result identifier
+        """
+        result_id = result_id or uuid.uuid4().hex
+        expires_at = time.time() + self.ttl_seconds
+
+        with self._lock:
+            self._purge_expired()
+            self._entries[result_id] = (result, expires_at)
+
+        if self.shared_store is not None:
+            envelope = {'expires_at': expires_at, 'result': result}
+            try:
+                self.shared_store.put(f"{SPILL_KEY_PREFIX}/{result_id}.json", json.dumps(envelope, default=str).encode('utf-8'))
+            except Exception as e:
+                print(f"Spill store write failed: {str(e)}")
+
+        return result_id
+
+    def get(self, result_id: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Load a spilled result.
+
+        Args:
+            result_id: Identifier returned by put
+            refresh: Prefer the shared store over the in-memory copy, for
+                     entries another container may have overwritten
+
+        Returns:
+            The spilled result, or None when unknown or expired
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is not None and not (refresh and self.shared_store is not None):
+                if now < entry[1]:
+                    return entry[0]
+                del self._entries[result_id]
+
+        if self.shared_store is not None:
+            try:
+                blob = self.shared_store.get(f"{SPILL_KEY_PREFIX}/{result_id}.json")
+            except Exception as e:
+                print(f"Spill store read failed: {str(e)}")
+                blob = None
+            if blob:
+                envelope = json.loads(blob.decode('utf-8'))
+                if now < envelope.get('expires_at', 0):
+                    with self._lock:
+                        self._entries[result_id] = (envelope['result'], envelope['expires_at'])
+                    return envelope['result']
+
+        # Shared store unavailable or missing the entry - fall back to memory
+        if refresh and entry is not None and now < entry[1]:
+            return entry[0]
+
+        return None
+
+    def _purge_expired(self) -> None:
+        now = time.time()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
@@ -0,0 +1,66 @@
+"""
+Regression tests for pre-flight LIMIT injection.
+
+    python -m pytest tools/firebolt/tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'query_lambda'))
+
+from query_guard import apply_limit_guard, has_top_level_limit, inject_limit, is_aggregate_query
+
+def guarded(sql):
+    return apply_limit_guard(sql, 100)['query']
+
+def test_limit_is_appended():
+    assert guarded("SELECT a FROM t") == "SELECT a FROM t\nLIMIT 100"
+
+def test_limit_goes_before_offset():
+    assert guarded("SELECT a FROM t ORDER BY a OFFSET 10") == "SELECT a FROM t ORDER BY a\nLIMIT 100\nOFFSET 10"
+    assert guarded("SELECT a FROM (SELECT a FROM t OFFSET 5) s") == "SELECT a FROM (SELECT a FROM t OFFSET 5) s\nLIMIT 100"
+    assert guarded("SELECT a FROM t WHERE o = 'offset 3'") == "SELECT a FROM t WHERE o = 'offset 3'\nLIMIT 100"
+
+def test_trailing_semicolon_is_dropped():
+    assert guarded("SELECT a FROM t ;\n") == "SELECT a FROM t\nLIMIT 100"
+    assert guarded("SELECT a FROM t OFFSET 10;") == "SELECT a FROM t\nLIMIT 100\nOFFSET 10"
+
+def test_trailing_comment_stays_after_limit():
+    assert guarded("SELECT a FROM t -- note") == "SELECT a FROM t\nLIMIT 100\n-- note"
+    assert guarded("SELECT a FROM t; -- note") == "SELECT a FROM t\nLIMIT 100\n-- note"
+    assert guarded("SELECT a FROM t /* note */ ;") == "SELECT a FROM t\nLIMIT 100\n/* note */"
+    assert guarded("SELECT a FROM t -- no limit") == "SELECT a FROM t\nLIMIT 100\n-- no limit"
+
+def test_limit_inside_string_literal_is_ignored():
+    assert not has_top_level_limit("SELECT a FROM t WHERE b = 'limit 5'")
+    assert guarded("SELECT a FROM t WHERE b = 'limit 5'") == "SELECT a FROM t WHERE b = 'limit 5'\nLIMIT 100"
+    # '--' inside a literal does not start a comment that would hide the real LIMIT
+    assert guarded("SELECT a FROM t WHERE b = 'x -- y' LIMIT 5") == "SELECT a FROM t WHERE b = 'x -- y' LIMIT 5"
+
+def test_subquery_limit_does_not_count():
+    assert not has_top_level_limit("SELECT a FROM (SELECT a FROM t LIMIT 5) s")
+    assert guarded("SELECT a FROM (SELECT a FROM t LIMIT 5) s") == "SELECT a FROM (SELECT a FROM t LIMIT 5) s\nLIMIT 100"
+    assert guarded("SELECT a FROM t LIMIT 5") == "SELECT a FROM t LIMIT 5"
+    assert guarded("SELECT a FROM t FETCH FIRST 5 ROWS ONLY") == "SELECT a FROM t FETCH FIRST 5 ROWS ONLY"
+
+def test_union_is_limited_as_a_whole():
+    assert guarded("SELECT a FROM t UNION ALL SELECT a FROM u") == "SELECT a FROM t UNION ALL SELECT a FROM u\nLIMIT 100"
+    assert guarded("SELECT a FROM t UNION ALL SELECT a FROM u LIMIT 5") == "SELECT a FROM t UNION ALL SELECT a FROM u LIMIT 5"
+    # One non-aggregate branch can return any number of rows
+    assert not is_aggregate_query("SELECT a FROM t UNION ALL SELECT count(*) FROM u")
+    assert not is_aggregate_query("SELECT a FROM t UNION SELECT b FROM u GROUP BY b")
+    assert is_aggregate_query("SELECT count(*) FROM t UNION ALL SELECT count(*) FROM u")
+
+def test_aggregates_are_not_limited():
+    assert guarded("SELECT count(*) FROM t") == "SELECT count(*) FROM t"
+    assert guarded("SELECT a, sum(b) FROM t GROUP BY a") == "SELECT a, sum(b) FROM t GROUP BY a"
+    assert guarded("SELECT DISTINCT a FROM t") == "SELECT DISTINCT a FROM t\nLIMIT 100"
+    assert guarded("SELECT a FROM t WHERE x IN (SELECT max(y) FROM u)") == \
+        "SELECT a FROM t WHERE x IN (SELECT max(y) FROM u)\nLIMIT 100"
+    assert guarded("WITH c AS (SELECT count(*) AS n FROM t) SELECT n FROM c") == \
+        "WITH c AS (SELECT count(*) AS n FROM t) SELECT n FROM c\nLIMIT 100"
+
+def test_non_select_statements_are_untouched():
+    assert guarded("SHOW TABLES") == "SHOW TABLES"
+    assert inject_limit("SELECT 1", 10) == "SELECT 1\nLIMIT 10"
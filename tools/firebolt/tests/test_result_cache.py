@@ -0,0 +1,27 @@
+"""
+Regression tests for result cache SQL normalization.
+
+    python -m pytest tools/firebolt/tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'query_lambda'))
+
+from result_cache import make_cache_key, normalize_sql
+
+def test_formatting_outside_literals_is_normalized():
+    assert normalize_sql("SELECT  a , b\nFROM t -- note\nWHERE x = 1 ;") == normalize_sql("select a,b from t where x=1")
+
+def test_string_literals_are_kept_verbatim():
+    assert normalize_sql("WHERE name = 'Acme , Inc'") == "where name='Acme , Inc'"
+    assert make_cache_key("SELECT * FROM t WHERE name = 'Acme , Inc'", 'acct', 'eng', 'db') != \
+        make_cache_key("SELECT * FROM t WHERE name = 'Acme, Inc'", 'acct', 'eng', 'db')
+    assert make_cache_key("SELECT * FROM t WHERE v = 'a = b'", 'acct', 'eng', 'db') != \
+        make_cache_key("SELECT * FROM t WHERE v = 'a=b'", 'acct', 'eng', 'db')
+    assert normalize_sql("SELECT 'it''s  -- not a comment'") == "select 'it''s  -- not a comment'"
+
+def test_quoted_identifiers_are_kept_verbatim():
+    assert normalize_sql('SELECT "Account Name" FROM t') == 'select "Account Name" from t'
+    assert normalize_sql('SELECT "a , b" FROM t') != normalize_sql('SELECT "a,b" FROM t')
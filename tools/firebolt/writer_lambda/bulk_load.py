@@ -0,0 +1,275 @@
+"""
+RevOps AI Framework V2 - S3-Staged Bulk Load
+
+Bulk-load mode for large writes such as backfills. Instead of sending rows
+through INSERT statements, records are serialized to gzip-compressed CSV (or
+Parquet when pyarrow is available), staged under a per-load prefix, and
+loaded with a single COPY INTO statement that reads every staged file.
+
+Staging location (FIREBOLT_STAGING_URI):
+    s3://bucket/prefix   - production; the engine reads the files from S3
+    file:///tmp/path     - local filesystem stand-in for offline tests of
+                           staging and SQL generation (use dry_run, the
+                           engine cannot read a local path)
+
+The engine reads S3 with FIREBOLT_STAGING_ROLE_ARN when set, otherwise with
+the engine's own access. Staged files are removed after a successful load.
+"""
+
+import io
+import os
+import csv
+import gzip
+import json
+import time
+import uuid
+from datetime import datetime, date
+from typing import Dict, Any, Callable, List, Optional
+
+from firebolt_common.shared_store import get_shared_store, S3Store, LocalFileStore
+
+# Optional dependency: Parquet staging needs pyarrow
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+STAGING_URI = os.environ.get('FIREBOLT_STAGING_URI', '')
+STAGING_ROLE_ARN = os.environ.get('FIREBOLT_STAGING_ROLE_ARN', '')
+STAGING_ROWS_PER_FILE = int(os.environ.get('FIREBOLT_STAGING_ROWS_PER_FILE', '250000'))
+STAGING_PREFIX = 'staging'
+
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+FILE_EXTENSIONS = {FORMAT_CSV: '.csv.gz', FORMAT_PARQUET: '.parquet'}
+
+def csv_value(value: Any) -> str:
+    """
+    Text form of a value in a staged CSV file. NULL is written as an empty
+    field; JSON values are serialized the same way as in INSERT statements.
+    
+    Args:
+        value (Any): Record value
+    
+    Returns:
+        str: CSV field text
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+def serialize_csv_gzip(records: List[Dict[str, Any]], columns: List[str]) -> bytes:
+    """
+    Serialize records to gzip-compressed CSV with a header row.
+    
+    Args:
+        records (List[Dict[str, Any]]): Records to serialize
+        columns (List[str]): Column order
+    
+    Returns:
+        bytes: Compressed CSV file
+    """
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=6) as compressed:
+        text = io.TextIOWrapper(compressed, encoding='utf-8', newline='')
+        writer = csv.writer(text, lineterminator='\n')
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow([csv_value(record.get(col)) for col in columns])
+        text.flush()
+        text.detach()
+    return buffer.getvalue()
+
+def serialize_parquet(records: List[Dict[str, Any]], columns: List[str]) -> bytes:
+    """
+    Serialize records to a Parquet file (requires pyarrow). Nested values
+    are stored as JSON text.
+    
+    Args:
+        records (List[Dict[str, Any]]): Records to serialize
+        columns (List[str]): Column order
+    
+    Returns:
+        bytes: Parquet file
+    """
+    if not PARQUET_AVAILABLE:
+        raise ValueError("Parquet staging requires pyarrow; use format csv")
+    data = {
+        col: [json.dumps(record.get(col)) if isinstance(record.get(col), (dict, list)) else record.get(col)
+              for record in records]
+        for col in columns
+    }
+    buffer = io.BytesIO()
+    pyarrow.parquet.write_table(pyarrow.table(data), buffer, compression='snappy')
+    return buffer.getvalue()
+
+def staging_location(store, key: str) -> str:
+    """
+    URL the engine uses to read a staged key.
+    
+    Args:
+        store: S3Store or LocalFileStore
+        key (str): Key within the store
+    
+    Returns:
+        str: s3:// or file:// URL
+    """
+    if isinstance(store, S3Store):
+        return f"s3://{store.bucket}/{store._key(key)}"
+    if isinstance(store, LocalFileStore):
+        return 'file://' + os.path.join(os.path.abspath(store.root), key)
+    raise ValueError("Unsupported staging store")
+
+def generate_copy_sql(
+    table_name: str,
+    columns: List[str],
+    location: str,
+    file_format: str = FORMAT_CSV,
+    role_arn: Optional[str] = None
+) -> str:
+    """
+    Generate a COPY INTO statement that loads every staged file under a location.
+    
+    Args:
+        table_name (str): Target table
+        columns (List[str]): Target columns, in staged file order
+        location (str): Staging directory URL (ending in '/')
+        file_format (str): 'csv' or 'parquet'
+        role_arn (Optional[str]): IAM role the engine assumes to read the files
+    
+    Returns:
+        str: COPY statement
+    """
+    if file_format == FORMAT_PARQUET:
+        column_map = ", ".join(columns)
+        options = ["TYPE = PARQUET", f"PATTERN = '*{FILE_EXTENSIONS[FORMAT_PARQUET]}'"]
+    else:
+        # CSV fields are mapped by position; the header row is skipped
+        column_map = ", ".join(f"{col} ${index}" for index, col in enumerate(columns, start=1))
+        options = ["TYPE = CSV", "HEADER = TRUE", f"PATTERN = '*{FILE_EXTENSIONS[FORMAT_CSV]}'"]
+    if role_arn:
+        options.append(f"CREDENTIALS = (AWS_ROLE_ARN = '{role_arn}')")
+    
+    return f"""
+    COPY INTO {table_name} ({column_map})
+    FROM '{location}'
+    WITH {' '.join(options)}
+    """
+
+def bulk_load(
+    table_name: str,
+    records: List[Dict[str, Any]],
+    columns: List[str],
+    execute: Callable[[str], Dict[str, Any]],
+    file_format: str = FORMAT_CSV,
+    staging_uri: Optional[str] = None,
+    rows_per_file: int = STAGING_ROWS_PER_FILE,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Stage records as files and load them with one COPY statement.
+    
+    Args:
+        table_name (str): Target table
+        records (List[Dict[str, Any]]): Records to load
+        columns (List[str]): Column list (union of record keys)
+        execute (Callable[[str], Dict[str, Any]]): Runs SQL and returns an execute_firebolt_query-style result
+        file_format (str): 'csv' (gzip) or 'parquet'
+        staging_uri (Optional[str]): Staging location; defaults to FIREBOLT_STAGING_URI
+        rows_per_file (int): Rows per staged file
+        dry_run (bool): Stage the files and build the SQL without running it (files are kept)
+    
+    Returns:
+        Dict[str, Any]: Load result with staged files, bytes, the COPY statement and timings
+    """
+    file_format = (file_format or FORMAT_CSV).lower()
+    if file_format not in FILE_EXTENSIONS:
+        return {
+            "success": False,
+            "error": f"Unsupported staging format: {file_format}",
+            "message": "Supported formats are: csv, parquet"
+        }
+    
+    store = get_shared_store(staging_uri or STAGING_URI)
+    if store is None:
+        return {
+            "success": False,
+            "error": "No staging location configured",
+            "message": "Set FIREBOLT_STAGING_URI (s3://bucket/prefix) or pass staging_uri"
+        }
+    
+    load_id = f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    load_prefix = f"{STAGING_PREFIX}/{table_name}/{load_id}/"
+    serialize = serialize_parquet if file_format == FORMAT_PARQUET else serialize_csv_gzip
+    
+    start = time.time()
+    staged_keys = []
+    staged_bytes = 0
+    try:
+        rows_per_file = max(1, int(rows_per_file))
+        for part, offset in enumerate(range(0, len(records), rows_per_file)):
+            data = serialize(records[offset:offset + rows_per_file], columns)
+            key = f"{load_prefix}part-{part:05d}{FILE_EXTENSIONS[file_format]}"
+            store.put(key, data)
+            staged_keys.append(key)
+            staged_bytes += len(data)
+    except Exception as e:
+        for key in staged_keys:
+            store.delete(key)
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to stage records for bulk load"
+        }
+    stage_ms = int((time.time() - start) * 1000)
+    
+    location = staging_location(store, load_prefix)
+    sql = generate_copy_sql(table_name, columns, location, file_format, STAGING_ROLE_ARN or None)
+    result = {
+        "success": True,
+        "operation": "bulk_load",
+        "table": table_name,
+        "rows_staged": len(records),
+        "files": len(staged_keys),
+        "staged_bytes": staged_bytes,
+        "location": location,
+        "format": file_format,
+        "copy_sql": sql.strip(),
+        "metadata": {
+            "stage_ms": stage_ms
+        }
+    }
+    
+    if dry_run:
+        result["message"] = f"Staged {len(records)} rows in {len(staged_keys)} files (dry run, COPY not executed)"
+        result["dry_run"] = True
+        return result
+    
+    start = time.time()
+    load_result = execute(sql)
+    result["metadata"]["load_ms"] = int((time.time() - start) * 1000)
+    
+    if not load_result.get('success'):
+        # Files stay staged so the COPY can be retried without re-serializing
+        result.update({
+            "success": False,
+            "error": load_result.get('error'),
+            "message": f"COPY failed; staged files kept at {location}: {load_result.get('message')}"
+        })
+        return result
+    
+    for key in staged_keys:
+        try:
+            store.delete(key)
+        except Exception as e:
+            print(f"Failed to remove staged file {key}: {str(e)}")
+    result["message"] = f"Loaded {len(records)} rows from {len(staged_keys)} staged files"
+    return result
@@ -0,0 +1,202 @@
+"""
+RevOps AI Framework V2 - Writer Idempotency Index
+
+Recent-write index that lets the writer lambda skip writes it has already
+applied. Bedrock action retries and SQS redrives deliver the same write more
+than once; with an idempotency key the second delivery returns the original
+result instead of running the statement again. A batch that partly failed
+is not recorded as applied, but each of its committed chunks is, so the
+retry runs only the chunks that failed.
+
+Writes are deduplicated on a key supplied by the caller (idempotency_key).
+Without one, a write always runs: an update, delete or insight written twice
+on purpose must not be mistaken for a retry. Opt-in auto mode also derives a
+content-hash key for plain inserts only, remembered for a short retry window.
+Applied keys live in an in-memory LRU and, when FIREBOLT_SHARED_STORE_URI is
+configured, in the shared store so a retry landing on another container is
+also caught.
+
+    FIREBOLT_IDEMPOTENCY            explicit (default), auto (also derive keys for
+                                    inserts without one), off
+    FIREBOLT_IDEMPOTENCY_TTL        seconds a caller key is remembered (default 86400)
+    FIREBOLT_IDEMPOTENCY_AUTO_TTL   seconds a derived insert key is remembered (default 120)
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+IDEMPOTENCY_MODE = os.environ.get('FIREBOLT_IDEMPOTENCY', 'explicit').lower()
+IDEMPOTENCY_TTL = int(os.environ.get('FIREBOLT_IDEMPOTENCY_TTL', '86400'))
+IDEMPOTENCY_AUTO_TTL = int(os.environ.get('FIREBOLT_IDEMPOTENCY_AUTO_TTL', '120'))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get('FIREBOLT_IDEMPOTENCY_MAX_KEYS', '5000'))
+SHARED_KEY_PREFIX = 'idempotency/'
+
+MODE_AUTO = 'auto'
+MODE_EXPLICIT = 'explicit'
+MODE_OFF = 'off'
+
+# Derived keys are marked so they get the short auto TTL
+AUTO_KEY_PREFIX = 'auto:'
+# Only new rows are content-deduplicated; repeating an update or delete is a real write
+AUTO_OPERATIONS = ('insert', 'bulk_load')
+
+def derive_idempotency_key(operation: str, table_name: str, payload: Any) -> str:
+    """
+    Content-hash key for a write: identical operation, table and payload
+    always produce the same key.
+    
+    Args:
+        operation (str): Write operation (insert, upsert, update, ...)
+        table_name (str): Target table
+        payload (Any): Record(s) plus any clause that changes the statement
+    
+    Returns:
+        str: Derived key
+    """
+    canonical = json.dumps([operation.lower(), table_name, payload], sort_keys=True, separators=(',', ':'), default=str)
+    return 'sha256:' + hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def resolve_idempotency_key(
+    idempotency_key: Optional[str],
+    operation: str,
+    table_name: str,
+    payload: Any
+) -> Optional[str]:
+    """
+    Key to use for a write under the configured mode.
+    
+    Args:
+        idempotency_key (Optional[str]): Caller-supplied key
+        operation (str): Write operation
+        table_name (str): Target table
+        payload (Any): Record(s) used to derive a key for inserts in auto mode
+    
+    Returns:
+        Optional[str]: Key, or None when the write is not deduplicated
+    """
+    if IDEMPOTENCY_MODE == MODE_OFF:
+        return None
+    if idempotency_key:
+        return str(idempotency_key)
+    if IDEMPOTENCY_MODE == MODE_AUTO and operation.lower() in AUTO_OPERATIONS:
+        return AUTO_KEY_PREFIX + derive_idempotency_key(operation, table_name, payload)
+    return None
+
+class IdempotencyIndex:
+    """
+    Applied-write results by idempotency key: in-memory LRU plus optional shared store.
+    """
+    
+    def __init__(self, shared_store=None, ttl_seconds: int = IDEMPOTENCY_TTL,
+                 auto_ttl_seconds: int = IDEMPOTENCY_AUTO_TTL, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        """
+        Initialize the index.
+        
+        Args:
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            ttl_seconds (int): Seconds a caller-supplied key is remembered
+            auto_ttl_seconds (int): Seconds a derived (auto mode) key is remembered
+            max_keys (int): In-memory entries kept before the oldest are evicted
+        """
+        self.shared_store = shared_store
+        self.ttl_seconds = ttl_seconds
+        self.auto_ttl_seconds = auto_ttl_seconds
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'recorded': 0}
+    
+    def _shared_key(self, key: str) -> str:
+        return SHARED_KEY_PREFIX + hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json'
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Result recorded for an already-applied key.
+        
+        Args:
+            key (str): Idempotency key
+        
+        Returns:
+            Optional[Dict[str, Any]]: Original result, or None if the key has not been applied
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry['applied_at'] < entry.get('ttl_seconds', self.ttl_seconds):
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry['result']
+                del self._entries[key]
+        
+        if self.shared_store is not None:
+            try:
+                blob = self.shared_store.get(self._shared_key(key))
+                if blob:
+                    entry = json.loads(blob.decode('utf-8'))
+                    if entry.get('key') == key and \
+                            now - entry['applied_at'] < entry.get('ttl_seconds', self.ttl_seconds):
+                        self._remember(key, entry)
+                        with self._lock:
+                            self.stats['shared_hits'] += 1
+                        return entry['result']
+            except Exception as e:
+                print(f"Idempotency shared store read failed: {str(e)}")
+        
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+    
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Record the result of an applied write.
+        
+        Args:
+            key (str): Idempotency key
+            result (Dict[str, Any]): Result to return to later duplicates
+        """
+        ttl_seconds = self.auto_ttl_seconds if key.startswith(AUTO_KEY_PREFIX) else self.ttl_seconds
+        entry = {'key': key, 'applied_at': time.time(), 'ttl_seconds': ttl_seconds, 'result': result}
+        self._remember(key, entry)
+        with self._lock:
+            self.stats['recorded'] += 1
+        if self.shared_store is not None:
+            try:
+                self.shared_store.put(self._shared_key(key), json.dumps(entry, default=str).encode('utf-8'))
+            except Exception as e:
+                print(f"Idempotency shared store write failed: {str(e)}")
+    
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, keys=len(self._entries))
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_idempotency_index(shared_store=None) -> IdempotencyIndex:
+    """
+    Get the module-level idempotency index, creating it on first use.
+    
+    Args:
+        shared_store: Shared blob store used when the index is created
+    
+    Returns:
+        IdempotencyIndex: Index instance
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = IdempotencyIndex(shared_store)
+        return _index
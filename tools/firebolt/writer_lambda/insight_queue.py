@@ -0,0 +1,392 @@
+"""
+RevOps AI Framework V2 - Write-Behind Insight Queue
+
+Write-behind mode for write_insight. Validated insights are acknowledged
+immediately and parked in a queue; a flusher drains the queue in batches
+and writes each batch with one multi-row INSERT.
+
+Queue backends (FIREBOLT_INSIGHT_QUEUE):
+    https://...  - Amazon SQS queue URL; this container flushes what it
+                   enqueued, and an SQS event source mapping on the writer
+                   lambda drains anything left behind
+    local        - in-process queue for local runs and tests; batches flush
+                   from a timer thread and at the start of each invocation
+
+Inside Lambda only SQS is accepted: an acknowledged insight must survive the
+container being reclaimed, so write-behind is refused without a durable queue.
+
+A batch is flushed when FIREBOLT_WRITE_BEHIND_BATCH_SIZE insights are pending
+or the oldest pending insight has waited FIREBOLT_WRITE_BEHIND_WINDOW seconds.
+Each flush prints one CloudWatch EMF line with batch size and latencies.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import boto3
+
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('FIREBOLT_WRITE_BEHIND_BATCH_SIZE', '100'))
+WRITE_BEHIND_WINDOW_SECONDS = float(os.environ.get('FIREBOLT_WRITE_BEHIND_WINDOW', '5'))
+METRICS_NAMESPACE = os.environ.get('FIREBOLT_METRICS_NAMESPACE', 'RevOpsAI/FireboltWriter')
+
+# Recent flushes kept for percentile reporting
+METRICS_WINDOW = 200
+
+# SQS batch API limit
+SQS_BATCH_LIMIT = 10
+
+class LocalInsightQueue:
+    """
+    In-process queue with SQS-like receive/delete semantics, used as the
+    local backend and as a stand-in for SQS in tests.
+    """
+    
+    def __init__(self):
+        self._messages = deque()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+    
+    def send(self, bodies: List[str]) -> None:
+        with self._lock:
+            self._messages.extend(bodies)
+    
+    def receive(self, max_messages: int) -> List[Tuple[str, str]]:
+        """
+        Take up to max_messages messages; they stay in flight until deleted or released.
+        
+        Returns:
+            List[Tuple[str, str]]: (receipt handle, body) pairs
+        """
+        received = []
+        with self._lock:
+            while self._messages and len(received) < max_messages:
+                handle = uuid.uuid4().hex
+                body = self._messages.popleft()
+                self._in_flight[handle] = body
+                received.append((handle, body))
+        return received
+    
+    def delete(self, handles: List[str]) -> None:
+        with self._lock:
+            for handle in handles:
+                self._in_flight.pop(handle, None)
+    
+    def release(self, handles: List[str]) -> None:
+        """Return in-flight messages to the front of the queue for a retry."""
+        with self._lock:
+            for handle in reversed(handles):
+                body = self._in_flight.pop(handle, None)
+                if body is not None:
+                    self._messages.appendleft(body)
+    
+    def approximate_size(self) -> int:
+        with self._lock:
+            return len(self._messages)
+
+class SQSInsightQueue:
+    """
+    Amazon SQS backend.
+    """
+    
+    def __init__(self, queue_url: str, client=None):
+        self.queue_url = queue_url
+        self.client = client or boto3.client('sqs')
+    
+    def send(self, bodies: List[str]) -> None:
+        for i in range(0, len(bodies), SQS_BATCH_LIMIT):
+            entries = [{'Id': str(index), 'MessageBody': body} for index, body in enumerate(bodies[i:i + SQS_BATCH_LIMIT])]
+            response = self.client.send_message_batch(QueueUrl=self.queue_url, Entries=entries)
+            if response.get('Failed'):
+                raise Exception(f"SQS rejected {len(response['Failed'])} insight messages: {response['Failed'][0].get('Message')}")
+    
+    def receive(self, max_messages: int) -> List[Tuple[str, str]]:
+        received = []
+        while len(received) < max_messages:
+            response = self.client.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=min(SQS_BATCH_LIMIT, max_messages - len(received)),
+                WaitTimeSeconds=0
+            )
+            messages = response.get('Messages', [])
+            if not messages:
+                break
+            received.extend((message['ReceiptHandle'], message['Body']) for message in messages)
+        return received
+    
+    def delete(self, handles: List[str]) -> None:
+        for i in range(0, len(handles), SQS_BATCH_LIMIT):
+            self.client.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[{'Id': str(index), 'ReceiptHandle': handle} for index, handle in enumerate(handles[i:i + SQS_BATCH_LIMIT])]
+            )
+    
+    def release(self, handles: List[str]) -> None:
+        for i in range(0, len(handles), SQS_BATCH_LIMIT):
+            self.client.change_message_visibility_batch(
+                QueueUrl=self.queue_url,
+                Entries=[{'Id': str(index), 'ReceiptHandle': handle, 'VisibilityTimeout': 0}
+                         for index, handle in enumerate(handles[i:i + SQS_BATCH_LIMIT])]
+            )
+    
+    def approximate_size(self) -> Optional[int]:
+        return None
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class WriteBehindBuffer:
+    """
+    Queues prepared insight records and flushes them in batches by size or time window.
+    """
+    
+    def __init__(
+        self,
+        queue,
+        write_batch: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        window_seconds: float = WRITE_BEHIND_WINDOW_SECONDS
+    ):
+        """
+        Initialize the buffer.
+        
+        Args:
+            queue: LocalInsightQueue or SQSInsightQueue
+            write_batch: Writes a list of records; returns a result dict with 'success'
+            batch_size (int): Pending insights that trigger an immediate flush
+            window_seconds (float): Longest an insight waits before a timed flush
+        """
+        self.queue = queue
+        self.write_batch = write_batch
+        self.batch_size = max(1, batch_size)
+        self.window_seconds = window_seconds
+        self._pending = 0
+        self._oldest_pending = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'flushes': 0, 'records_flushed': 0, 'failed_flushes': 0}
+        self._batch_sizes = deque(maxlen=METRICS_WINDOW)
+        self._flush_ms = deque(maxlen=METRICS_WINDOW)
+        self._queue_delay_ms = deque(maxlen=METRICS_WINDOW)
+    
+    def enqueue(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Queue prepared records; flushes inline when a full batch is pending,
+        otherwise makes sure a timed flush is scheduled.
+        
+        Args:
+            records (List[Dict[str, Any]]): Validated insight records
+        """
+        now = time.time()
+        self.queue.send([json.dumps({'record': record, 'enqueued_at': now}, default=str) for record in records])
+        with self._lock:
+            self.stats['enqueued'] += len(records)
+            self._pending += len(records)
+            if self._oldest_pending is None:
+                self._oldest_pending = now
+            full = self._pending >= self.batch_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+    
+    def flush_if_due(self) -> Optional[Dict[str, Any]]:
+        """
+        Flush when the oldest pending insight is past the window. Called at the
+        start of each invocation, since timers do not run while a Lambda
+        container is frozen between invocations.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Flush summary, or None if nothing was due
+        """
+        with self._lock:
+            due = self._oldest_pending is not None and time.time() - self._oldest_pending >= self.window_seconds
+        return self.flush() if due else None
+    
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Write-behind timed flush failed: {str(e)}")
+    
+    def flush(self, max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Drain the queue in batches of batch_size. A failed batch is released
+        back to the queue and stops the drain, so it is retried on the next flush.
+        
+        Args:
+            max_batches (Optional[int]): Stop after this many batches
+        
+        Returns:
+            Dict[str, Any]: Batches and records written, plus the last error if any
+        """
+        summary = {'batches': 0, 'records_written': 0}
+        with self._flush_lock:
+            with self._lock:
+                self._pending = 0
+                self._oldest_pending = None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            
+            while max_batches is None or summary['batches'] < max_batches:
+                messages = self.queue.receive(self.batch_size)
+                if not messages:
+                    break
+                result = self.write_messages(messages)
+                summary['batches'] += 1
+                if not result.get('success'):
+                    summary['error'] = result.get('error')
+                    # Released messages become due again after another window
+                    with self._lock:
+                        self._pending += len(messages)
+                        if self._oldest_pending is None:
+                            self._oldest_pending = time.time()
+                    break
+                summary['records_written'] += len(messages)
+        return summary
+    
+    def write_messages(self, messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Write one batch of queued messages and delete or release them.
+        
+        Args:
+            messages (List[Tuple[str, str]]): (receipt handle, body) pairs
+        
+        Returns:
+            Dict[str, Any]: Result of the batch write
+        """
+        handles = [handle for handle, _ in messages]
+        envelopes = [json.loads(body) for _, body in messages]
+        
+        start = time.time()
+        try:
+            result = self.write_batch([envelope['record'] for envelope in envelopes])
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        flush_ms = (time.time() - start) * 1000
+        
+        if result.get('success'):
+            self.queue.delete(handles)
+        else:
+            self.queue.release(handles)
+        self.record_flush(len(messages), flush_ms, [envelope.get('enqueued_at') for envelope in envelopes], result.get('success', False))
+        return result
+    
+    def record_flush(self, batch_size: int, flush_ms: float, enqueued_at: List[Optional[float]], success: bool) -> None:
+        """Update counters and print an EMF line for one flush."""
+        now = time.time()
+        queue_delay_ms = max([(now - ts) * 1000 for ts in enqueued_at if ts] or [0])
+        with self._lock:
+            self.stats['flushes'] += 1
+            if success:
+                self.stats['records_flushed'] += batch_size
+                self._batch_sizes.append(batch_size)
+                self._flush_ms.append(flush_ms)
+                self._queue_delay_ms.append(queue_delay_ms)
+            else:
+                self.stats['failed_flushes'] += 1
+        
+        try:
+            print(json.dumps({
+                '_aws': {
+                    'Timestamp': int(now * 1000),
+                    'CloudWatchMetrics': [{
+                        'Namespace': METRICS_NAMESPACE,
+                        'Dimensions': [['Operation']],
+                        'Metrics': [
+                            {'Name': 'BatchSize', 'Unit': 'Count'},
+                            {'Name': 'FlushMs', 'Unit': 'Milliseconds'},
+                            {'Name': 'QueueDelayMs', 'Unit': 'Milliseconds'}
+                        ]
+                    }]
+                },
+                'Operation': 'write_behind_flush',
+                'Success': success,
+                'BatchSize': batch_size,
+                'FlushMs': round(flush_ms, 1),
+                'QueueDelayMs': round(queue_delay_ms, 1)
+            }, separators=(',', ':')), flush=True)
+        except Exception as e:
+            print(f"Error emitting write-behind metrics: {str(e)}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Counters and recent flush distribution for response metadata.
+        
+        Returns:
+            Dict[str, Any]: Enqueue/flush counters, pending count and batch size/latency percentiles
+        """
+        with self._lock:
+            batch_sizes = list(self._batch_sizes)
+            flush_ms = list(self._flush_ms)
+            queue_delay_ms = list(self._queue_delay_ms)
+            stats = dict(self.stats, pending=self._pending)
+        stats.update({
+            'queue_depth': self.queue.approximate_size(),
+            'batch_size_avg': round(sum(batch_sizes) / len(batch_sizes), 1) if batch_sizes else None,
+            'batch_size_max': max(batch_sizes) if batch_sizes else None,
+            'flush_ms_p50': percentile(flush_ms, 50),
+            'flush_ms_p95': percentile(flush_ms, 95),
+            'queue_delay_ms_p95': percentile(queue_delay_ms, 95)
+        })
+        for key in ('flush_ms_p50', 'flush_ms_p95', 'queue_delay_ms_p95'):
+            if stats[key] is not None:
+                stats[key] = round(stats[key], 1)
+        return stats
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+def create_insight_queue(queue_setting: str):
+    """
+    Build the queue backend for a FIREBOLT_INSIGHT_QUEUE value.
+    
+    Args:
+        queue_setting (str): An SQS queue URL, or 'local' outside Lambda
+    
+    Returns:
+        LocalInsightQueue or SQSInsightQueue
+    
+    Raises:
+        ValueError: Inside Lambda without an SQS queue URL
+    """
+    if queue_setting.startswith('https://'):
+        return SQSInsightQueue(queue_setting)
+    if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+        raise ValueError("Write-behind mode requires FIREBOLT_INSIGHT_QUEUE to be an SQS queue URL; "
+                         "an in-process queue loses acknowledged insights when the container is reclaimed")
+    return LocalInsightQueue()
+
+def get_write_behind_buffer(write_batch: Callable[[List[Dict[str, Any]]], Dict[str, Any]]) -> WriteBehindBuffer:
+    """
+    Get the module-level write-behind buffer, creating it on first use.
+    
+    Args:
+        write_batch: Writes a list of records (used when the buffer is created)
+    
+    Returns:
+        WriteBehindBuffer: Buffer instance
+    """
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBehindBuffer(create_insight_queue(os.environ.get('FIREBOLT_INSIGHT_QUEUE', 'local')), write_batch)
+        return _buffer
+
+def peek_write_behind_buffer() -> Optional[WriteBehindBuffer]:
+    """Return the buffer if it has been created in this container."""
+    return _buffer
@@ -17,8 +17,31 @@ import uuid
 import urllib.request
 import urllib.error
 import urllib.parse
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-from typing import Dict, Any, List, Optional, Union, Set
+from typing import Dict, Any, Callable, List, Optional, Union, Set
+
+# Shared Firebolt helpers - packaged into the function zip (see
+# deployment/scripts/package_lambdas.py)
+from firebolt_common.auth import get_cached_credentials, get_cached_token, get_auth_cache_stats
+from firebolt_common.http_client import get_http_client
+from firebolt_common.shared_store import get_shared_store
+from insight_queue import get_write_behind_buffer, peek_write_behind_buffer
+from idempotency import get_idempotency_index, resolve_idempotency_key, derive_idempotency_key
+from bulk_load import bulk_load, STAGING_ROWS_PER_FILE
+
+# Batch write limits: rows and SQL bytes per INSERT statement, statements in flight
+BATCH_MAX_ROWS = int(os.environ.get('FIREBOLT_BATCH_MAX_ROWS', '1000'))
+BATCH_MAX_BYTES = int(os.environ.get('FIREBOLT_BATCH_MAX_BYTES', str(1024 * 1024)))
+BATCH_CONCURRENCY = int(os.environ.get('FIREBOLT_BATCH_CONCURRENCY', '4'))
+
+# Default write_insight mode: 'sync' writes before returning, 'write_behind' queues and acknowledges
+INSIGHT_WRITE_MODE = os.environ.get('FIREBOLT_INSIGHT_WRITE_MODE', 'sync').lower()
+INSIGHTS_TABLE = "revops_ai_insights"
+
+# Shared tier for the idempotency index (None when not configured)
+shared_store = get_shared_store()
 
 # Authentication and credential management
 # Helper functions for data type handling
@@ -78,9 +101,9 @@ def get_aws_secret(secret_name: str, region_name: str = "us-east-1") -> Dict[str
     else:
         raise Exception("Secret is not in string format")
 
-def get_firebolt_credentials(secret_name: str, region_name: str = "us-east-1") -> Dict[str, str]:
+def load_firebolt_credentials(secret_name: str, region_name: str = "us-east-1") -> Dict[str, str]:
     """
-    Get Firebolt credentials from AWS Secrets Manager.
+    Load Firebolt credentials from AWS Secrets Manager without caching.
     Only requires client_id and client_secret in the secret.
     
     Args:
@@ -101,11 +124,24 @@ def get_firebolt_credentials(secret_name: str, region_name: str = "us-east-1") -
     
     return credentials
 
+def get_firebolt_credentials(secret_name: str, region_name: str = "us-east-1") -> Dict[str, str]:
+    """
+    Get Firebolt credentials, served from the warm-container cache when possible.
+    
+    Args:
+        secret_name (str): Name of the secret containing client_id and client_secret
+        region_name (str): AWS region where the secret is stored
+        
+    Returns:
+        Dict[str, str]: Dictionary with client credentials
+    """
+    return get_cached_credentials(secret_name, region_name, load_firebolt_credentials)
+
 # OAuth authentication
 def get_firebolt_access_token(credentials: Dict[str, str]) -> str:
     """
     Get access token from Firebolt using client credentials OAuth flow.
-    Uses urllib instead of requests to avoid external dependencies.
+    Tokens are cached per warm container and refreshed shortly before expiry.
     
     Args:
         credentials (Dict[str, str]): Firebolt credentials containing client_id and client_secret
@@ -113,49 +149,8 @@ def get_firebolt_access_token(credentials: Dict[str, str]) -> str:
     Returns:
         str: Access token for Firebolt API calls
     """
-    client_id = credentials.get('client_id')
-    client_secret = credentials.get('client_secret')
-    
-    if not client_id or not client_secret:
-        raise Exception("Missing client_id or client_secret in credentials")
-    
-    auth_url = "https://id.app.firebolt.io/oauth/token"
-    
-    # Prepare request data
-    data = {
-        'grant_type': 'client_credentials',
-        'client_id': client_id,
-        'client_secret': client_secret,
-        'audience': 'https://api.firebolt.io'
-    }
-    
-    data = urllib.parse.urlencode(data).encode('ascii')
-    
-    # Create request
-    req = urllib.request.Request(
-        auth_url,
-        data=data,
-        headers={
-            'Content-Type': 'application/x-www-form-urlencoded'
-        },
-        method='POST'
-    )
-    
-    try:
-        # Send request and get response
-        with urllib.request.urlopen(req) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
-            
-        # Extract token
-        token = response_data.get('access_token')
-        if not token:
-            raise Exception("No access token in response")
-            
-        return token
-        
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        raise Exception(f"Failed to get Firebolt token. Status: {e.code}, Response: {error_body}")
+    return get_cached_token(credentials)
+
 # SQL Generation for write operations
 def generate_insert_sql(table_name: str, data: Dict[str, Any]) -> str:
     """
@@ -186,6 +181,175 @@ def generate_insert_sql(table_name: str, data: Dict[str, Any]) -> str:
     
     return f"INSERT INTO {table_name} ({columns_str}) VALUES ({values_str})"
 
+def chunk_value_rows(
+    records: List[Dict[str, Any]],
+    columns: List[str],
+    overhead_bytes: int,
+    max_rows: int = BATCH_MAX_ROWS,
+    max_bytes: int = BATCH_MAX_BYTES
+) -> List[Dict[str, Any]]:
+    """
+    Format records as SQL value tuples and group them into chunks.
+    Columns missing from a record are written as NULL. A chunk is closed when
+    it reaches max_rows or when the next row would push the statement past
+    max_bytes; a single oversized row still gets its own chunk.
+    
+    Args:
+        records (List[Dict[str, Any]]): Records to format
+        columns (List[str]): Column order for the value tuples
+        overhead_bytes (int): Size of the statement text around the value list
+        max_rows (int): Maximum rows per chunk
+        max_bytes (int): Maximum statement size in UTF-8 bytes
+    
+    Returns:
+        List[Dict[str, Any]]: Chunks with 'values' (joined tuples), 'start_row', 'end_row' (exclusive) and 'bytes'
+    """
+    chunks = []
+    rows = []
+    size = overhead_bytes
+    start_row = 0
+    for index, record in enumerate(records):
+        row = "(" + ", ".join(format_value_for_sql(record.get(col)) for col in columns) + ")"
+        row_bytes = len(row.encode('utf-8')) + 2  # ", " separator
+        if rows and (len(rows) >= max_rows or size + row_bytes > max_bytes):
+            chunks.append({'values': ", ".join(rows), 'start_row': start_row, 'end_row': index, 'bytes': size})
+            rows = []
+            size = overhead_bytes
+            start_row = index
+        rows.append(row)
+        size += row_bytes
+    chunks.append({'values': ", ".join(rows), 'start_row': start_row, 'end_row': len(records), 'bytes': size})
+    return chunks
+
+def batch_columns(records: List[Dict[str, Any]]) -> List[str]:
+    """
+    Column list for a batch: the union of all record keys in first-seen order.
+    
+    Args:
+        records (List[Dict[str, Any]]): Batch records
+    
+    Returns:
+        List[str]: Column names
+    """
+    if not records:
+        raise ValueError("No data provided for batch write")
+    if not all(isinstance(record, dict) and record for record in records):
+        raise ValueError("Every batch record must be a non-empty object")
+    return list(dict.fromkeys(key for record in records for key in record))
+
+def generate_batch_insert_sql(
+    table_name: str,
+    records: List[Dict[str, Any]],
+    max_rows: int = BATCH_MAX_ROWS,
+    max_bytes: int = BATCH_MAX_BYTES
+) -> List[Dict[str, Any]]:
+    """
+    Generate chunked multi-row INSERT statements for a list of records.
+    Chunks are sized by row count and statement bytes (see chunk_value_rows).
+    
+    Args:
+        table_name (str): Target table name
+        records (List[Dict[str, Any]]): Records to insert
+        max_rows (int): Maximum rows per statement
+        max_bytes (int): Maximum statement size in UTF-8 bytes
+    
+    Returns:
+        List[Dict[str, Any]]: Chunks with 'sql', 'start_row', 'end_row' (exclusive) and 'bytes'
+    """
+    columns = batch_columns(records)
+    prefix = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES "
+    
+    chunks = chunk_value_rows(records, columns, len(prefix.encode('utf-8')), max_rows, max_bytes)
+    for chunk in chunks:
+        chunk['sql'] = prefix + chunk.pop('values')
+    return chunks
+
+def column_runs(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Split a batch into runs of consecutive records with the same column set.
+    
+    Args:
+        records (List[Dict[str, Any]]): Batch records
+    
+    Returns:
+        List[Dict[str, Any]]: Runs with 'columns', 'records' and 'start_row'
+    """
+    runs = []
+    for index, record in enumerate(records):
+        if runs and set(record) == set(runs[-1]['columns']):
+            runs[-1]['records'].append(record)
+        else:
+            runs.append({'columns': list(record), 'records': [record], 'start_row': index})
+    return runs
+
+def generate_bulk_upsert_sql(
+    table_name: str,
+    records: List[Dict[str, Any]],
+    key_columns: List[str],
+    max_rows: int = BATCH_MAX_ROWS,
+    max_bytes: int = BATCH_MAX_BYTES
+) -> List[Dict[str, Any]]:
+    """
+    Generate set-based MERGE statements that upsert many records at once,
+    using a multi-row VALUES source per chunk.
+    Key columns are validated once for the whole batch. Records must not
+    repeat a key: MERGE rejects duplicate source rows, and with concurrent
+    chunks the winner would be arbitrary. Like generate_upsert_sql, only the
+    columns a record provides are updated: consecutive records with the same
+    column set share statements, and each change of column set starts a new
+    MERGE, so keep records with the same columns together.
+    
+    Args:
+        table_name (str): Target table name
+        records (List[Dict[str, Any]]): Records to insert or update
+        key_columns (List[str]): Columns that identify unique records
+        max_rows (int): Maximum rows per statement
+        max_bytes (int): Maximum statement size in UTF-8 bytes
+    
+    Returns:
+        List[Dict[str, Any]]: Chunks with 'sql', 'start_row', 'end_row' (exclusive) and 'bytes'
+    """
+    columns = batch_columns(records)
+    
+    if not key_columns or not all(col in columns for col in key_columns):
+        raise ValueError("Missing key columns for UPSERT")
+    
+    seen = {}
+    for index, record in enumerate(records):
+        key = tuple(record.get(col) for col in key_columns)
+        if any(value is None for value in key):
+            raise ValueError(f"Record {index} has NULL or missing key columns for UPSERT")
+        key = json.dumps(key, default=str)
+        if key in seen:
+            raise ValueError(f"Records {seen[key]} and {index} have the same key values")
+        seen[key] = index
+    
+    key_condition = " AND ".join([f"t.{col} = s.{col}" for col in key_columns])
+    chunks = []
+    for run in column_runs(records):
+        columns = run['columns']
+        columns_str = ", ".join(columns)
+        update_set = ", ".join([f"t.{col} = s.{col}" for col in columns if col not in key_columns])
+        matched_clause = f"""
+    WHEN MATCHED THEN
+        UPDATE SET {update_set}""" if update_set else ""
+        
+        head = f"""
+    MERGE INTO {table_name} t
+    USING (SELECT {columns_str} FROM (VALUES """
+        tail = f""") as s({columns_str})) as s
+    ON {key_condition}{matched_clause}
+    WHEN NOT MATCHED THEN
+        INSERT ({columns_str}) VALUES ({', '.join([f's.{col}' for col in columns])})
+    """
+        
+        for chunk in chunk_value_rows(run['records'], columns, len((head + tail).encode('utf-8')), max_rows, max_bytes):
+            chunk['sql'] = head + chunk.pop('values') + tail
+            chunk['start_row'] += run['start_row']
+            chunk['end_row'] += run['start_row']
+            chunks.append(chunk)
+    return chunks
+
 def generate_update_sql(table_name: str, data: Dict[str, Any], where_clause: str) -> str:
     """
     Generate SQL UPDATE statement from data.
@@ -321,25 +485,27 @@ def execute_firebolt_query(
         # Send the SQL query directly as data, like in the query Lambda
         data = query.encode('utf-8')
         
-        # Create request with text/plain content type as in query Lambda
-        req = urllib.request.Request(
+        # Execute query over the shared keep-alive connection pool.
+        # Writes are never re-sent automatically after a connection reset.
+        with get_http_client().request(
+            'POST',
             query_url,
-            data=data,
+            body=data,
             headers={
                 'Content-Type': 'text/plain',
                 'Authorization': f'Bearer {token}'
             }
-        )
-        
-        # Execute query
-        with urllib.request.urlopen(req) as response:
+        ) as response:
             raw_result = json.loads(response.read().decode('utf-8'))
             
         # For write operations, a simple success/rows affected response is usually sufficient
         return {
             'success': True,
             'message': f"Query executed successfully against {firebolt_engine}",
-            'raw_response': raw_result
+            'raw_response': raw_result,
+            'metadata': {
+                'auth_cache': get_auth_cache_stats()
+            }
         }
         
     except urllib.error.HTTPError as e:
@@ -479,31 +645,25 @@ def generate_insight_id() -> str:
     random_suffix = uuid.uuid4().hex[:8]
     return f"insight_{timestamp}_{random_suffix}"
 
-def write_insight(query_type: str, insight_data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+def prepare_insight(query_type: str, insight_data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Specialized function for writing insights to the revops_ai_insights table.
-    Performs validation and proper formatting of insight data.
-    Converts JSON fields to properly formatted TEXT strings for Firebolt.
+    Validate an insight and fill in generated fields (insight_id, created_at,
+    status, status-change timestamps). JSON fields are converted to TEXT strings.
     
     Args:
         query_type (str): Operation type (insert, update, delete)
-        insight_data (Dict[str, Any]): Insight data to write
-        **kwargs: Additional arguments for the operation
-        
+        insight_data (Dict[str, Any]): Insight data to prepare
+    
     Returns:
-        Dict[str, Any]: Operation result
+        Dict[str, Any]: {"valid": True, "data": prepared insight} or {"valid": False, "error": message}
     """
-    # Make a copy of the input data to avoid modifying the original
-    insight_data = insight_data.copy()
-    
     # Validate the insight data
     validation = validate_insight_data(insight_data)
     if not validation["valid"]:
-        return {
-            "success": False, 
-            "error": "Invalid insight data",
-            "message": validation["error"]
-        }
+        return validation
+    
+    # Make a copy of the input data to avoid modifying the original
+    insight_data = insight_data.copy()
     
     # For INSERT, generate an insight_id if not provided
     if query_type.lower() == 'insert' and 'insight_id' not in insight_data:
@@ -532,8 +692,110 @@ def write_insight(query_type: str, insight_data: Dict[str, Any], **kwargs) -> Di
         elif insight_data['status'] == 'resolved' and 'resolved_at' not in insight_data:
             insight_data['resolved_at'] = datetime.utcnow().isoformat()
     
-    # Use the general write function
-    table_name = "revops_ai_insights"
+    return {"valid": True, "data": insight_data}
+
+def write_insight(query_type: str, insight_data: Union[Dict[str, Any], List[Dict[str, Any]]], **kwargs) -> Dict[str, Any]:
+    """
+    Specialized function for writing insights to the revops_ai_insights table.
+    Performs validation and proper formatting of insight data.
+    Converts JSON fields to properly formatted TEXT strings for Firebolt.
+    A list of insights with query_type insert or upsert (keyed on insight_id
+    unless key_columns is given) is written as a batch; the whole batch is
+    rejected if any insight fails validation. With write_mode write_behind
+    (or FIREBOLT_INSIGHT_WRITE_MODE), inserts are queued and acknowledged
+    immediately - see queue_insights.
+    
+    Repeated deliveries of a write with the same idempotency_key return the
+    original result without touching the engine; without a key the write
+    always runs.
+    
+    Args:
+        query_type (str): Operation type (insert, update, delete)
+        insight_data (Union[Dict[str, Any], List[Dict[str, Any]]]): Insight data to write
+        **kwargs: Additional arguments for the operation
+    
+    Returns:
+        Dict[str, Any]: Operation result
+    """
+    # Agent parameters arrive as strings; accept a JSON array for batch writes
+    if isinstance(insight_data, str) and insight_data.lstrip().startswith('['):
+        try:
+            insight_data = json.loads(insight_data)
+        except json.JSONDecodeError:
+            pass
+    
+    # Insight operations are never content-deduplicated (see AUTO_OPERATIONS)
+    key = resolve_idempotency_key(
+        kwargs.pop('idempotency_key', None),
+        f"insight_{query_type}",
+        INSIGHTS_TABLE,
+        {'data': insight_data, 'where_clause': kwargs.get('where_clause'), 'key_columns': kwargs.get('key_columns')}
+    )
+    return run_idempotent(key, lambda: apply_insight_write(query_type, insight_data, idempotency_key=key, **kwargs))
+
+def apply_insight_write(query_type: str, insight_data: Union[Dict[str, Any], List[Dict[str, Any]]], **kwargs) -> Dict[str, Any]:
+    """
+    Validate, prepare and write insights; see write_insight.
+    
+    Args:
+        query_type (str): Operation type (insert, update, delete)
+        insight_data (Union[Dict[str, Any], List[Dict[str, Any]]]): Insight data to write
+        **kwargs: Additional arguments for the operation
+    
+    Returns:
+        Dict[str, Any]: Operation result
+    """
+    table_name = INSIGHTS_TABLE
+    
+    write_mode = (kwargs.pop('write_mode', None) or INSIGHT_WRITE_MODE).lower()
+    if write_mode == 'write_behind' and query_type.lower() == 'insert':
+        return queue_insights(insight_data if isinstance(insight_data, list) else [insight_data])
+    
+    if isinstance(insight_data, list):
+        if query_type.lower() not in ('insert', 'upsert', 'bulk_load'):
+            return {
+                "success": False,
+                "error": f"Batch writes are not supported for operation: {query_type}",
+                "message": "Provide a list of insights only with query_type insert, upsert or bulk_load"
+            }
+        # Bulk-loaded insights are new rows and get the same defaults as inserts
+        prepare_type = 'insert' if query_type.lower() == 'bulk_load' else query_type
+        records = []
+        for index, item in enumerate(insight_data):
+            prepared = prepare_insight(prepare_type, item)
+            if not prepared["valid"]:
+                return {
+                    "success": False,
+                    "error": "Invalid insight data",
+                    "message": f"Record {index}: {prepared['error']}"
+                }
+            records.append(prepared["data"])
+        if query_type.lower() == 'bulk_load':
+            result = bulk_load_records(table_name, records, kwargs.get('account_name'),
+                                       kwargs.get('engine_name'), kwargs.get('load_options'))
+            result["insight_ids"] = [record['insight_id'] for record in records]
+            return result
+        result = write_batch_to_firebolt(
+            table_name,
+            records,
+            account_name=kwargs.get('account_name'),
+            engine_name=kwargs.get('engine_name'),
+            max_rows=kwargs.get('batch_size'),
+            concurrency=kwargs.get('concurrency'),
+            key_columns=(kwargs.get('key_columns') or ['insight_id']) if query_type.lower() == 'upsert' else None,
+            idempotency_key=kwargs.get('idempotency_key')
+        )
+        result["insight_ids"] = [record.get('insight_id') for record in records]
+        return result
+    
+    prepared = prepare_insight(query_type, insight_data)
+    if not prepared["valid"]:
+        return {
+            "success": False, 
+            "error": "Invalid insight data",
+            "message": prepared["error"]
+        }
+    insight_data = prepared["data"]
     
     # Handle delete operation
     if query_type.lower() == 'delete':
@@ -548,34 +810,272 @@ def write_insight(query_type: str, insight_data: Dict[str, Any], **kwargs) -> Di
         result = execute_firebolt_query(sql, kwargs.get('account_name'), kwargs.get('engine_name'))
         return result
     
-    return write_to_firebolt(query_type, table_name, insight_data, **kwargs)
+    # Use the general write function
+    return apply_write(query_type, table_name, insight_data, **kwargs)
+
+def write_insight_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Batch-insert prepared insights; used by the write-behind flusher.
+    A batch whose insight IDs were already written (an SQS redelivery) is skipped.
+    """
+    key = derive_idempotency_key('insight_flush', INSIGHTS_TABLE, sorted(str(record.get('insight_id')) for record in records))
+    return run_idempotent(key, lambda: write_batch_to_firebolt(INSIGHTS_TABLE, records, idempotency_key=key))
+
+def queue_insights(insights: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Write-behind insert: validate and prepare insights, queue them for a
+    batched write and acknowledge immediately with the generated insight IDs.
+    Queued insights are written with the default account and engine.
+    
+    Args:
+        insights (List[Dict[str, Any]]): Insight data to queue
+    
+    Returns:
+        Dict[str, Any]: Acknowledgement with insight_id(s) and write-behind metrics
+    """
+    records = []
+    for index, item in enumerate(insights):
+        prepared = prepare_insight('insert', item)
+        if not prepared["valid"]:
+            return {
+                "success": False,
+                "error": "Invalid insight data",
+                "message": f"Record {index}: {prepared['error']}" if len(insights) > 1 else prepared["error"]
+            }
+        records.append(prepared["data"])
+    
+    try:
+        buffer = get_write_behind_buffer(write_insight_records)
+        buffer.enqueue(records)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to queue insights for writing; retry with write_mode sync"
+        }
+    
+    insight_ids = [record['insight_id'] for record in records]
+    result = {
+        "success": True,
+        "message": f"{len(records)} insight(s) queued for batched write",
+        "operation": "insert",
+        "write_mode": "write_behind",
+        "table": INSIGHTS_TABLE,
+        "insight_ids": insight_ids,
+        "metadata": {
+            "write_behind": buffer.get_stats()
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if len(insight_ids) == 1:
+        result["insight_id"] = insight_ids[0]
+    return result
+
+def flush_insight_queue() -> Dict[str, Any]:
+    """
+    Drain the write-behind queue now (scheduled or manual flush).
+    
+    Returns:
+        Dict[str, Any]: Flush summary and write-behind metrics
+    """
+    try:
+        buffer = get_write_behind_buffer(write_insight_records)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Write-behind queue is not configured"
+        }
+    summary = buffer.flush()
+    result = {
+        "success": 'error' not in summary,
+        "message": f"Flushed {summary['records_written']} insights in {summary['batches']} batches",
+        "operation": "flush_insights",
+        "metadata": {
+            "write_behind": buffer.get_stats()
+        }
+    }
+    if 'error' in summary:
+        result["error"] = summary['error']
+    return result
+
+def process_insight_queue_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write a batch of queued insights delivered by an SQS event source mapping.
+    The batch is written with one multi-row INSERT; on failure every message
+    is reported back so SQS redelivers it.
+    
+    Args:
+        event (Dict[str, Any]): SQS event with Records
+    
+    Returns:
+        Dict[str, Any]: Partial batch response (batchItemFailures)
+    """
+    messages = event['Records']
+    buffer = get_write_behind_buffer(write_insight_records)
+    envelopes = [json.loads(message['body']) for message in messages]
+    
+    start = time.time()
+    try:
+        result = write_insight_records([envelope['record'] for envelope in envelopes])
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    buffer.record_flush(len(messages), (time.time() - start) * 1000,
+                        [envelope.get('enqueued_at') for envelope in envelopes], result.get('success', False))
+    
+    if result.get('success'):
+        return {'batchItemFailures': []}
+    print(f"Write-behind batch of {len(messages)} insights failed: {result.get('error')}")
+    return {'batchItemFailures': [{'itemIdentifier': message['messageId']} for message in messages]}
+
+def run_idempotent(key: Optional[str], write: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Run a write unless its idempotency key has already been applied.
+    Only successful results are recorded, so failed writes can be retried;
+    batch writes also record each committed chunk under the key (see
+    write_batch_to_firebolt), so a retry re-runs only the failed chunks.
+    
+    Args:
+        key (Optional[str]): Idempotency key, or None to always run the write
+        write (Callable[[], Dict[str, Any]]): Performs the write and returns its result
+    
+    Returns:
+        Dict[str, Any]: Result of the write, or the original result with idempotent_replay set
+    """
+    if key is None:
+        return write()
+    
+    index = get_idempotency_index(shared_store)
+    original = index.get(key)
+    if original is not None:
+        print(f"Skipping already-applied write with idempotency key: {key}")
+        return dict(original, idempotent_replay=True)
+    
+    result = write()
+    result["idempotency_key"] = key
+    # Dry runs change nothing, so a later real run must not be replayed from them
+    if result.get("success") and not result.get("dry_run"):
+        index.put(key, result)
+    return result
 
 # Main function for Firebolt write operations
 def write_to_firebolt(
     query_type: str,
     table_name: str,
-    data: Dict[str, Any],
+    data: Union[Dict[str, Any], List[Dict[str, Any]]],
     where_clause: Optional[str] = None,
     key_columns: Optional[List[str]] = None,
     account_name: Optional[str] = None,
-    engine_name: Optional[str] = None
+    engine_name: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    idempotency_key: Optional[str] = None,
+    load_options: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Write data to Firebolt based on operation type.
     Matches the Bedrock Agent function schema signature.
+    A write whose idempotency_key was already applied returns the original
+    result without re-executing (in FIREBOLT_IDEMPOTENCY=auto mode, inserts
+    without a key are also deduplicated on their content for a short window).
     
     Args:
         query_type (str): Type of operation (insert, update, upsert)
         table_name (str): Target table for the operation
-        data (Dict[str, Any]): Data to write
+        data (Union[Dict[str, Any], List[Dict[str, Any]]]): Data to write
         where_clause (Optional[str]): WHERE clause for updates
         key_columns (Optional[List[str]]): Key columns for upsert operations
         account_name (Optional[str]): Firebolt account name to use (overrides env variable)
         engine_name (Optional[str]): Firebolt engine name to use (overrides env variable)
+        batch_size (Optional[int]): Rows per INSERT statement for batch writes
+        concurrency (Optional[int]): Statements in flight for batch writes
+        idempotency_key (Optional[str]): Client dedup key
+        load_options (Optional[Dict[str, Any]]): Staging options for query_type bulk_load (format, rows_per_file, dry_run)
     
     Returns:
         Dict[str, Any]: Operation result
     """
+    key = resolve_idempotency_key(
+        idempotency_key,
+        query_type or '',
+        table_name,
+        {'data': data, 'where_clause': where_clause, 'key_columns': key_columns}
+    )
+    return run_idempotent(key, lambda: apply_write(
+        query_type, table_name, data, where_clause, key_columns,
+        account_name, engine_name, batch_size, concurrency, load_options,
+        idempotency_key=key
+    ))
+
+def apply_write(
+    query_type: str,
+    table_name: str,
+    data: Union[Dict[str, Any], List[Dict[str, Any]]],
+    where_clause: Optional[str] = None,
+    key_columns: Optional[List[str]] = None,
+    account_name: Optional[str] = None,
+    engine_name: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    load_options: Optional[Dict[str, Any]] = None,
+    idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate and execute the statement(s) for a write. The write itself is
+    not checked against the idempotency index; idempotency_key only lets a
+    batch skip chunks an earlier delivery already committed.
+    
+    Args:
+        query_type (str): Type of operation (insert, update, upsert)
+        table_name (str): Target table for the operation
+        data (Union[Dict[str, Any], List[Dict[str, Any]]]): Data to write; a list of records
+            (or a JSON array string) with query_type insert or upsert is written as a batch,
+            and with query_type bulk_load is staged and loaded with COPY
+        where_clause (Optional[str]): WHERE clause for updates
+        key_columns (Optional[List[str]]): Key columns for upsert operations
+        account_name (Optional[str]): Firebolt account name to use (overrides env variable)
+        engine_name (Optional[str]): Firebolt engine name to use (overrides env variable)
+        batch_size (Optional[int]): Rows per INSERT statement for batch writes
+        concurrency (Optional[int]): Statements in flight for batch writes
+        load_options (Optional[Dict[str, Any]]): Staging options for query_type bulk_load
+        idempotency_key (Optional[str]): Key of the write, used to record batch chunks
+    
+    Returns:
+        Dict[str, Any]: Operation result
+    """
+    # Agent parameters arrive as strings; accept a JSON array for batch writes
+    if isinstance(data, str) and data.lstrip().startswith('['):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError:
+            pass
+    
+    if isinstance(data, list):
+        if query_type.lower() == 'bulk_load':
+            return bulk_load_records(table_name, data, account_name, engine_name, load_options)
+        if query_type.lower() not in ('insert', 'upsert'):
+            return {
+                "success": False,
+                "error": f"Batch writes are not supported for operation: {query_type}",
+                "message": "Provide a list of records only with query_type insert, upsert or bulk_load"
+            }
+        if query_type.lower() == 'upsert' and not key_columns:
+            return {
+                "success": False,
+                "error": "Key columns are required for UPSERT operations",
+                "message": "Please provide key_columns parameter"
+            }
+        return write_batch_to_firebolt(
+            table_name,
+            data,
+            account_name=account_name,
+            engine_name=engine_name,
+            max_rows=batch_size,
+            concurrency=concurrency,
+            key_columns=key_columns if query_type.lower() == 'upsert' else None,
+            idempotency_key=idempotency_key
+        )
+    
     try:
         # Validate parameters
         if not table_name:
@@ -652,6 +1152,174 @@ def write_to_firebolt(
             "message": "Failed to execute write operation"
         }
 
+def write_batch_to_firebolt(
+    table_name: str,
+    records: List[Dict[str, Any]],
+    account_name: Optional[str] = None,
+    engine_name: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    key_columns: Optional[List[str]] = None,
+    idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Insert a list of records with chunked multi-row INSERT statements, or
+    upsert them with set-based MERGE statements when key_columns is given,
+    running up to `concurrency` statements at a time.
+    Chunks are independent: a failed chunk does not roll back the others,
+    and its row range is reported so the caller can retry just those rows.
+    With an idempotency_key each committed chunk is recorded under
+    "<key>#rows:<start>-<end>" as soon as it succeeds; a redelivery of the
+    same batch skips those chunks and runs only the ones that failed.
+    
+    Args:
+        table_name (str): Target table
+        records (List[Dict[str, Any]]): Records to insert
+        account_name (Optional[str]): Firebolt account name to use (overrides env variable)
+        engine_name (Optional[str]): Firebolt engine name to use (overrides env variable)
+        max_rows (Optional[int]): Rows per statement (default FIREBOLT_BATCH_MAX_ROWS)
+        max_bytes (Optional[int]): Statement size limit (default FIREBOLT_BATCH_MAX_BYTES)
+        concurrency (Optional[int]): Statements in flight (default FIREBOLT_BATCH_CONCURRENCY)
+        key_columns (Optional[List[str]]): Key columns; switches the batch to MERGE upserts
+        idempotency_key (Optional[str]): Key of the batch write, used to record committed chunks
+    
+    Returns:
+        Dict[str, Any]: Overall result with rows_written, failed_rows and per-chunk results
+    """
+    try:
+        if not table_name:
+            return {
+                "success": False,
+                "error": "Table name is required",
+                "message": "Please provide a valid table name"
+            }
+        
+        operation = "batch_upsert" if key_columns else "batch_insert"
+        limits = {
+            'max_rows': max(1, int(max_rows or BATCH_MAX_ROWS)),
+            'max_bytes': max(1, int(max_bytes or BATCH_MAX_BYTES))
+        }
+        if key_columns:
+            chunks = generate_bulk_upsert_sql(table_name, records, key_columns, **limits)
+        else:
+            chunks = generate_batch_insert_sql(table_name, records, **limits)
+    except (ValueError, TypeError) as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": f"Failed to build {'MERGE' if key_columns else 'INSERT'} statements for the batch"
+        }
+    
+    workers = max(1, min(int(concurrency or BATCH_CONCURRENCY), len(chunks)))
+    print(f"Batch {operation[6:]}: {len(records)} rows to table: {table_name} in {len(chunks)} chunks, concurrency {workers}")
+    
+    applied_index = get_idempotency_index(shared_store) if idempotency_key else None
+    
+    def run_chunk(index: int, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        chunk_key = f"{idempotency_key}#rows:{chunk['start_row']}-{chunk['end_row']}"
+        if applied_index is not None:
+            applied = applied_index.get(chunk_key)
+            if applied is not None:
+                return dict(applied, chunk=index, elapsed_ms=0, idempotent_replay=True)
+        
+        start = time.time()
+        result = execute_firebolt_query(chunk['sql'], account_name=account_name, engine_name=engine_name)
+        chunk_result = {
+            "chunk": index,
+            "start_row": chunk['start_row'],
+            "end_row": chunk['end_row'],
+            "rows": chunk['end_row'] - chunk['start_row'],
+            "bytes": chunk['bytes'],
+            "success": result.get('success', False),
+            "elapsed_ms": int((time.time() - start) * 1000)
+        }
+        if not chunk_result['success']:
+            chunk_result['error'] = result.get('error')
+            chunk_result['message'] = result.get('message')
+        elif applied_index is not None:
+            applied_index.put(chunk_key, chunk_result)
+        return chunk_result
+    
+    start = time.time()
+    if workers == 1:
+        chunk_results = [run_chunk(index, chunk) for index, chunk in enumerate(chunks)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(run_chunk, range(len(chunks)), chunks))
+    
+    rows_written = sum(chunk['rows'] for chunk in chunk_results if chunk['success'])
+    failed_chunks = [chunk for chunk in chunk_results if not chunk['success']]
+    
+    result = {
+        "success": not failed_chunks,
+        "message": (f"{'Upserted' if key_columns else 'Inserted'} {rows_written} rows in {len(chunks)} statements" if not failed_chunks
+                    else f"{len(failed_chunks)} of {len(chunks)} chunks failed; {rows_written} of {len(records)} rows written"),
+        "operation": operation,
+        "table": table_name,
+        "rows_written": rows_written,
+        "failed_rows": [[chunk['start_row'], chunk['end_row']] for chunk in failed_chunks],
+        "chunks": chunk_results,
+        "metadata": {
+            "chunk_count": len(chunks),
+            "concurrency": workers,
+            "replayed_chunks": sum(1 for chunk in chunk_results if chunk.get('idempotent_replay')),
+            "elapsed_ms": int((time.time() - start) * 1000),
+            "auth_cache": get_auth_cache_stats()
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if failed_chunks:
+        result["error"] = failed_chunks[0].get('error')
+    
+    return result
+
+def bulk_load_records(
+    table_name: str,
+    records: List[Dict[str, Any]],
+    account_name: Optional[str] = None,
+    engine_name: Optional[str] = None,
+    load_options: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Load a large list of records through S3 staging and a single COPY
+    statement instead of INSERTs (see bulk_load.py).
+    
+    Args:
+        table_name (str): Target table
+        records (List[Dict[str, Any]]): Records to load
+        account_name (Optional[str]): Firebolt account name to use (overrides env variable)
+        engine_name (Optional[str]): Firebolt engine name to use (overrides env variable)
+        load_options (Optional[Dict[str, Any]]): 'format' (csv or parquet), 'rows_per_file', 'dry_run'
+    
+    Returns:
+        Dict[str, Any]: Load result
+    """
+    load_options = load_options or {}
+    if isinstance(load_options, str):
+        load_options = json.loads(load_options)
+    try:
+        columns = batch_columns(records)
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to prepare records for bulk load"
+        }
+    
+    print(f"Bulk load: {len(records)} rows to table: {table_name}")
+    result = bulk_load(
+        table_name,
+        records,
+        columns,
+        lambda sql: execute_firebolt_query(sql, account_name=account_name, engine_name=engine_name),
+        file_format=load_options.get('format', 'csv'),
+        rows_per_file=load_options.get('rows_per_file') or STAGING_ROWS_PER_FILE,
+        dry_run=str(load_options.get('dry_run', False)).lower() == 'true'
+    )
+    result["timestamp"] = datetime.utcnow().isoformat()
+    return result
+
 def generate_delete_sql(table_name: str, where_clause: str) -> str:
     """
     Generate SQL DELETE statement.
@@ -675,6 +1343,19 @@ def lambda_handler(event, context):
     try:
         print(f"WRITER LAMBDA: Received event: {json.dumps(event)}")
         
+        # Queued insights past their write-behind window go out first; timers
+        # do not fire while the container is frozen between invocations
+        buffer = peek_write_behind_buffer()
+        if buffer is not None:
+            buffer.flush_if_due()
+        
+        # Write-behind batches delivered by an SQS event source mapping
+        if event.get('Records') and event['Records'][0].get('eventSource') == 'aws:sqs':
+            return process_insight_queue_event(event)
+        
+        if event.get('operation') == 'flush_insights':
+            return flush_insight_queue()
+        
         # Direct SQL query execution - assume this is the primary purpose
         if 'query' in event:
             query = event.get('query')
@@ -694,12 +1375,13 @@ def lambda_handler(event, context):
             
             # Execute the query directly
             try:
-                # Direct execution with SQL query
-                result = execute_firebolt_query(
+                # Raw SQL is only deduplicated with an explicit idempotency_key
+                key = resolve_idempotency_key(event.get('idempotency_key'), 'sql', '', query) if event.get('idempotency_key') else None
+                result = run_idempotent(key, lambda: execute_firebolt_query(
                     query,
                     account_name=account_name,
                     engine_name=engine_name
-                )
+                ))
                 print("Query executed successfully")
                 return {
                     'success': True,
@@ -713,13 +1395,6 @@ def lambda_handler(event, context):
                     'error': str(query_error),
                     'message': "Error executing direct SQL query."
                 }
-        else:
-            print("No query parameter found in event")
-            return {
-                'success': False,
-                'error': "Missing required parameter", 
-                'message': "Please provide a 'query' parameter with your SQL statement"
-            }
 
         # 1. Check if this is a Bedrock Agent invocation
         if 'actionGroup' in event and event.get('actionGroup') == 'firebolt_writer':
@@ -736,6 +1411,11 @@ def lambda_handler(event, context):
                 key_columns = parameters.get('key_columns')
                 account_name = parameters.get('account_name')
                 engine_name = parameters.get('engine_name')
+                batch_size = parameters.get('batch_size')
+                concurrency = parameters.get('concurrency')
+                write_mode = parameters.get('write_mode')
+                idempotency_key = parameters.get('idempotency_key')
+                load_options = parameters.get('load_options')
                 
                 return write_insight(
                     query_type,
@@ -743,7 +1423,12 @@ def lambda_handler(event, context):
                     where_clause=where_clause,
                     key_columns=key_columns,
                     account_name=account_name,
-                    engine_name=engine_name
+                    engine_name=engine_name,
+                    batch_size=batch_size,
+                    concurrency=concurrency,
+                    write_mode=write_mode,
+                    idempotency_key=idempotency_key,
+                    load_options=load_options
                 )
             
             # Standard Firebolt write operations
@@ -755,6 +1440,11 @@ def lambda_handler(event, context):
                 key_columns = parameters.get('key_columns')
                 account_name = parameters.get('account_name')
                 engine_name = parameters.get('engine_name')
+                batch_size = parameters.get('batch_size')
+                concurrency = parameters.get('concurrency')
+                write_mode = parameters.get('write_mode')
+                idempotency_key = parameters.get('idempotency_key')
+                load_options = parameters.get('load_options')
                 
                 # Special handling for revops_ai_insights table
                 if table_name == 'revops_ai_insights':
@@ -764,7 +1454,12 @@ def lambda_handler(event, context):
                         where_clause=where_clause,
                         key_columns=key_columns,
                         account_name=account_name,
-                        engine_name=engine_name
+                        engine_name=engine_name,
+                        batch_size=batch_size,
+                        concurrency=concurrency,
+                        write_mode=write_mode,
+                        idempotency_key=idempotency_key,
+                        load_options=load_options
                     )
                 
                 # General write operations
@@ -775,7 +1470,11 @@ def lambda_handler(event, context):
                     where_clause, 
                     key_columns, 
                     account_name, 
-                    engine_name
+                    engine_name,
+                    batch_size,
+                    concurrency,
+                    idempotency_key,
+                    load_options
                 )
                 
             else:
@@ -793,6 +1492,11 @@ def lambda_handler(event, context):
             key_columns = event.get('key_columns')
             account_name = event.get('account_name')
             engine_name = event.get('engine_name')
+            batch_size = event.get('batch_size')
+            concurrency = event.get('concurrency')
+            write_mode = event.get('write_mode')
+            idempotency_key = event.get('idempotency_key')
+            load_options = event.get('load_options')
             
             return write_insight(
                 query_type, 
@@ -800,7 +1504,12 @@ def lambda_handler(event, context):
                 where_clause=where_clause,
                 key_columns=key_columns,
                 account_name=account_name,
-                engine_name=engine_name
+                engine_name=engine_name,
+                batch_size=batch_size,
+                concurrency=concurrency,
+                write_mode=write_mode,
+                idempotency_key=idempotency_key,
+                load_options=load_options
             )
                 
         # 3. Check if this is a direct invocation with parameters
@@ -814,6 +1523,11 @@ def lambda_handler(event, context):
             key_columns = event.get('key_columns')
             account_name = event.get('account_name')
             engine_name = event.get('engine_name')
+            batch_size = event.get('batch_size')
+            concurrency = event.get('concurrency')
+            write_mode = event.get('write_mode')
+            idempotency_key = event.get('idempotency_key')
+            load_options = event.get('load_options')
             
             print(f"Using parameters: operation={query_type}, table={table_name}")
             print(f"Data: {json.dumps(data, default=str)}")
@@ -826,7 +1540,12 @@ def lambda_handler(event, context):
                     where_clause=where_clause,
                     key_columns=key_columns,
                     account_name=account_name,
-                    engine_name=engine_name
+                    engine_name=engine_name,
+                    batch_size=batch_size,
+                    concurrency=concurrency,
+                    write_mode=write_mode,
+                    idempotency_key=idempotency_key,
+                    load_options=load_options
                 )
             
             return write_to_firebolt(
@@ -836,7 +1555,11 @@ def lambda_handler(event, context):
                 where_clause, 
                 key_columns, 
                 account_name, 
-                engine_name
+                engine_name,
+                batch_size,
+                concurrency,
+                idempotency_key,
+                load_options
             )
             
         # 4. Legacy parameter format for backward compatibility
@@ -850,6 +1573,11 @@ def lambda_handler(event, context):
             key_columns = params.get('key_columns')
             account_name = params.get('account_name')
             engine_name = params.get('engine_name')
+            batch_size = params.get('batch_size')
+            concurrency = params.get('concurrency')
+            write_mode = params.get('write_mode')
+            idempotency_key = params.get('idempotency_key')
+            load_options = params.get('load_options')
             
             # Special handling for insights table
             if table_name == 'revops_ai_insights':
@@ -859,7 +1587,12 @@ def lambda_handler(event, context):
                     where_clause=where_clause,
                     key_columns=key_columns,
                     account_name=account_name,
-                    engine_name=engine_name
+                    engine_name=engine_name,
+                    batch_size=batch_size,
+                    concurrency=concurrency,
+                    write_mode=write_mode,
+                    idempotency_key=idempotency_key,
+                    load_options=load_options
                 )
             
             return write_to_firebolt(
@@ -869,7 +1602,11 @@ def lambda_handler(event, context):
                 where_clause, 
                 key_columns, 
                 account_name, 
-                engine_name
+                engine_name,
+                batch_size,
+                concurrency,
+                idempotency_key,
+                load_options
             )
         
         # 5. No recognizable format
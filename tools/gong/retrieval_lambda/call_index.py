@@ -0,0 +1,438 @@
+"""
+RevOps AI Framework V2 - Gong Company Call Index
+
+Local index of Gong calls keyed by normalized company tokens, so company
+searches are a dictionary lookup instead of a scan over a year of calls.
+Tokens are taken from:
+    - the call title ("Acme <> Firebolt - Renewal" -> acme, firebolt, renewal)
+    - CRM context account names (Salesforce/HubSpot Account objects)
+    - email domains of external participants (jane@eu.acme.com -> acme)
+
+The index is refreshed incrementally: each refresh only pulls calls started
+since the last watermark (minus a small overlap), and a window cut short by
+the page cap or time budget is resumed from its cursor next time. The index
+is persisted as gzip JSON in /tmp for the warm container and mirrored to the
+shared tier (GONG_SHARED_STORE_URI) so new containers start from an existing
+index.
+
+    GONG_INDEX_PATH              /tmp file (default /tmp/gong_call_index.json.gz)
+    GONG_INDEX_LOOKBACK_DAYS     history covered by the first build (default 365)
+    GONG_INDEX_REFRESH_SECONDS   minimum seconds between refreshes (default 900)
+    GONG_INTERNAL_DOMAINS        comma-separated own email domains to skip
+"""
+
+import os
+import re
+import json
+import gzip
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set
+
+INDEX_PATH = os.environ.get('GONG_INDEX_PATH', '/tmp/gong_call_index.json.gz')
+INDEX_LOOKBACK_DAYS = int(os.environ.get('GONG_INDEX_LOOKBACK_DAYS', '365'))
+INDEX_REFRESH_SECONDS = int(os.environ.get('GONG_INDEX_REFRESH_SECONDS', '900'))
+INDEX_OVERLAP_SECONDS = 3600
+INTERNAL_DOMAINS = {d.strip().lower() for d in os.environ.get('GONG_INTERNAL_DOMAINS', '').split(',') if d.strip()}
+SHARED_KEY = 'call-index/index.json.gz'
+INDEX_VERSION = 1
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Words that say nothing about which company a call is with
+STOPWORDS = {
+    'a', 'an', 'and', 'the', 'of', 'for', 'with', 'to', 'on', 'in', 'at', 'by', 'x', 'vs',
+    'inc', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company', 'gmbh', 'ag', 'sa', 'plc', 'bv',
+    'com', 'io', 'net', 'org', 'ai',
+    'call', 'meeting', 'sync', 'demo', 'intro', 'introduction', 'discussion', 'followup', 'follow', 'up',
+    'weekly', 'catch', 'zoom', 'teams', 're', 'fw'
+}
+GENERIC_EMAIL_DOMAINS = {
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'live.com',
+    'icloud.com', 'me.com', 'aol.com', 'protonmail.com'
+}
+# Second-level labels used under country TLDs (acme.co.uk -> acme)
+SECOND_LEVEL_LABELS = {'co', 'com', 'org', 'net', 'ac', 'gov'}
+
+_TOKEN_SPLIT = re.compile(r'[^0-9a-z]+')
+
+def company_tokens(text: Optional[str]) -> Set[str]:
+    """
+    Normalized company tokens in a piece of text.
+    
+    Args:
+        text (Optional[str]): Title, account name or company query
+    
+    Returns:
+        Set[str]: Lower-case tokens without stopwords or bare numbers
+    """
+    if not text:
+        return set()
+    return {t for t in _TOKEN_SPLIT.split(str(text).lower()) if len(t) > 1 and not t.isdigit() and t not in STOPWORDS}
+
+def domain_token(domain: Optional[str]) -> Optional[str]:
+    """
+    Company token of an email domain: the registrable label (mail.acme.co.uk -> acme).
+    
+    Args:
+        domain (Optional[str]): Email domain
+    
+    Returns:
+        Optional[str]: Token, or None for generic mail providers and internal domains
+    """
+    domain = (domain or '').strip().lower()
+    if not domain or domain in GENERIC_EMAIL_DOMAINS or domain in INTERNAL_DOMAINS:
+        return None
+    labels = [label for label in domain.split('.') if label]
+    if len(labels) < 2:
+        return None
+    labels = labels[:-1]
+    if len(labels) > 1 and labels[-1] in SECOND_LEVEL_LABELS:
+        labels = labels[:-1]
+    return labels[-1]
+
+def query_tokens(company_name: str) -> Set[str]:
+    """
+    Tokens a company search must match. A bare domain (acme.com) is reduced
+    to its company label.
+    
+    Args:
+        company_name (str): Company name or domain
+    
+    Returns:
+        Set[str]: Tokens to look up
+    """
+    name = company_name.strip().lower()
+    if '.' in name and ' ' not in name and '@' not in name:
+        token = domain_token(name)
+        if token:
+            return {token}
+    if '@' in name:
+        token = domain_token(name.rsplit('@', 1)[1])
+        if token:
+            return {token}
+    return company_tokens(name)
+
+def account_names(call: Dict[str, Any]) -> List[str]:
+    """
+    CRM account names attached to a call's context.
+    
+    Args:
+        call (Dict[str, Any]): Cleaned call record
+    
+    Returns:
+        List[str]: Account names
+    """
+    names = []
+    for context in call.get('context') or []:
+        if not isinstance(context, dict):
+            continue
+        for obj in context.get('objects') or []:
+            if not isinstance(obj, dict) or str(obj.get('objectType', '')).lower() != 'account':
+                continue
+            for field in obj.get('fields') or []:
+                if isinstance(field, dict) and str(field.get('name', '')).lower() == 'name' and field.get('value'):
+                    names.append(str(field['value']))
+    return names
+
+def participant_domains(call: Dict[str, Any]) -> List[str]:
+    """
+    Email domains of the external participants of a call.
+    
+    Args:
+        call (Dict[str, Any]): Cleaned call record
+    
+    Returns:
+        List[str]: Distinct domains
+    """
+    domains = []
+    for party in call.get('parties') or []:
+        if not isinstance(party, dict) or str(party.get('affiliation', '')).lower() == 'internal':
+            continue
+        email = party.get('emailAddress') or ''
+        if '@' in email:
+            domain = email.rsplit('@', 1)[1].lower()
+            if domain not in domains:
+                domains.append(domain)
+    return domains
+
+def call_tokens(call: Dict[str, Any]) -> Set[str]:
+    """
+    Company tokens of a call: its title, CRM account names and the company
+    labels of its external participants' email domains.
+    
+    Args:
+        call (Dict[str, Any]): Cleaned call record
+    
+    Returns:
+        Set[str]: Tokens a company search is matched against
+    """
+    tokens = company_tokens(call.get('title'))
+    for name in account_names(call):
+        tokens |= company_tokens(name)
+    for domain in participant_domains(call):
+        token = domain_token(domain)
+        if token:
+            tokens.add(token)
+    return tokens
+
+class CallIndex:
+    """
+    Company token -> call id postings with incremental refresh and a shared tier.
+    """
+    
+    def __init__(self, path: str = INDEX_PATH, shared_store=None,
+                 lookback_days: int = INDEX_LOOKBACK_DAYS, refresh_seconds: int = INDEX_REFRESH_SECONDS):
+        """
+        Initialize the index.
+        
+        Args:
+            path (str): Local file the index is persisted to
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            lookback_days (int): History covered by the first build
+            refresh_seconds (int): Minimum seconds between refreshes
+        """
+        self.path = path
+        self.shared_store = shared_store
+        self.lookback_days = lookback_days
+        self.refresh_seconds = refresh_seconds
+        self.calls = {}
+        self.postings = {}
+        self.watermark = None
+        self.covered_from = None
+        self.pending = None
+        self.refreshed_at = 0.0
+        self.stats = {'lookups': 0, 'refreshes': 0, 'calls_fetched': 0}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loaded_progress = None
+    
+    def _serialize(self) -> bytes:
+        state = {
+            'version': INDEX_VERSION,
+            'watermark': self.watermark,
+            'covered_from': self.covered_from,
+            'pending': self.pending,
+            'refreshed_at': self.refreshed_at,
+            'calls': self.calls
+        }
+        return gzip.compress(json.dumps(state, separators=(',', ':')).encode('utf-8'))
+    
+    def _restore(self, blob: Optional[bytes]) -> bool:
+        if not blob:
+            return False
+        state = json.loads(gzip.decompress(blob).decode('utf-8'))
+        if state.get('version') != INDEX_VERSION:
+            return False
+        # Keep whichever copy reaches further
+        if self._loaded_progress is not None and \
+                (state.get('watermark') or '', len(state.get('calls', {}))) <= self._loaded_progress:
+            return False
+        self.calls = state.get('calls', {})
+        self.watermark = state.get('watermark')
+        self.covered_from = state.get('covered_from')
+        self.pending = state.get('pending')
+        self.refreshed_at = state.get('refreshed_at', 0.0)
+        self._loaded_progress = (self.watermark or '', len(self.calls))
+        # Postings are rebuilt rather than stored: they are derived from the call entries
+        self.postings = {}
+        for call_id, entry in self.calls.items():
+            self._post(call_id, entry['tokens'])
+        return True
+    
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, 'rb') as f:
+                self._restore(f.read())
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Call index file unreadable, rebuilding: {str(e)}")
+        if self.shared_store is not None:
+            try:
+                self._restore(self.shared_store.get(SHARED_KEY))
+            except Exception as e:
+                print(f"Call index shared tier read failed: {str(e)}")
+    
+    def _save(self) -> None:
+        blob = self._serialize()
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Call index file write failed: {str(e)}")
+        if self.shared_store is not None:
+            try:
+                self.shared_store.put(SHARED_KEY, blob)
+            except Exception as e:
+                print(f"Call index shared tier write failed: {str(e)}")
+    
+    def _post(self, call_id: str, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(call_id)
+    
+    def add_call(self, call: Dict[str, Any]) -> None:
+        """
+        Index one call, replacing any earlier entry for it.
+        
+        Args:
+            call (Dict[str, Any]): Cleaned call record
+        """
+        call_id = call.get('id')
+        if not call_id:
+            return
+        call_id = str(call_id)
+        tokens = call_tokens(call)
+        
+        previous = self.calls.get(call_id)
+        if previous:
+            for token in previous['tokens']:
+                self.postings.get(token, set()).discard(call_id)
+        self.calls[call_id] = {
+            'title': call.get('title'),
+            'started': call.get('started'),
+            'accounts': account_names(call),
+            'domains': participant_domains(call),
+            'tokens': sorted(tokens)
+        }
+        self._post(call_id, tokens)
+    
+    def needs_refresh(self) -> bool:
+        if self.watermark is None or self.pending is not None:
+            return True
+        return time.time() - self.refreshed_at >= self.refresh_seconds
+    
+    def refresh(self, fetch_pages: Callable[[Dict[str, Any]], Iterable[Dict[str, Any]]], force: bool = False) -> Dict[str, Any]:
+        """
+        Pull calls started since the watermark and add them to the index.
+        
+        A window that is not read completely (page cap or time budget) is kept
+        as pending together with its cursor, and the next refresh resumes it;
+        the watermark only advances once a window has been read to the end.
+        
+        Args:
+            fetch_pages (Callable): Yields cleaned call pages (see iter_call_pages) for
+                {'from_date', 'to_date', 'cursor'} params
+            force (bool): Refresh even if the last refresh is recent
+        
+        Returns:
+            Dict[str, Any]: Refresh summary (window, calls fetched, whether it completed, index size)
+        """
+        with self._lock:
+            self._load()
+            if not force and not self.needs_refresh():
+                return {'refreshed': False, 'calls': len(self.calls), 'watermark': self.watermark}
+            
+            if self.pending is None:
+                now = datetime.utcnow()
+                if self.watermark:
+                    from_date = datetime.strptime(self.watermark, DATE_FORMAT) - timedelta(seconds=INDEX_OVERLAP_SECONDS)
+                else:
+                    from_date = now - timedelta(days=self.lookback_days)
+                    self.covered_from = from_date.strftime(DATE_FORMAT)
+                self.pending = {
+                    'from_date': from_date.strftime(DATE_FORMAT),
+                    'to_date': now.strftime(DATE_FORMAT),
+                    'cursor': None
+                }
+            window = dict(self.pending)
+            
+            fetched = 0
+            stop_reason = None
+            try:
+                for page in fetch_pages(dict(window)):
+                    if not page.get('success'):
+                        raise Exception(page.get('error', 'Failed to retrieve calls from Gong'))
+                    for call in page['results']:
+                        self.add_call(call)
+                        fetched += 1
+                    self.pending['cursor'] = page.get('cursor')
+                    stop_reason = page.get('stop_reason')
+            finally:
+                if stop_reason == 'exhausted':
+                    self.watermark = window['to_date']
+                    self.pending = None
+                self.refreshed_at = time.time()
+                self.stats['refreshes'] += 1
+                self.stats['calls_fetched'] += fetched
+                self._save()
+            
+            return {
+                'refreshed': True,
+                'from_date': window['from_date'],
+                'to_date': window['to_date'],
+                'calls_fetched': fetched,
+                'complete': self.pending is None,
+                'calls': len(self.calls)
+            }
+    
+    def lookup(self, company_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Indexed calls matching every token of a company name, most recent first.
+        
+        Args:
+            company_name (str): Company name or domain
+            limit (Optional[int]): Maximum entries to return
+        
+        Returns:
+            List[Dict[str, Any]]: Index entries with their call id
+        """
+        tokens = query_tokens(company_name)
+        with self._lock:
+            self._load()
+            self.stats['lookups'] += 1
+            if not tokens:
+                return []
+            postings = [self.postings.get(token, set()) for token in tokens]
+            call_ids = set.intersection(*postings) if postings else set()
+            entries = [dict(self.calls[call_id], id=call_id) for call_id in call_ids]
+        entries.sort(key=lambda entry: entry.get('started') or '', reverse=True)
+        return entries[:limit] if limit is not None else entries
+    
+    def is_built(self) -> bool:
+        """
+        Whether the index holds a completely read history. Until its first
+        window has been read to the end it only has the oldest calls of it.
+        
+        Returns:
+            bool: True once the index has a watermark and no pending window
+        """
+        with self._lock:
+            self._load()
+            return self.watermark is not None and self.pending is None
+    
+    def info(self) -> Dict[str, Any]:
+        """Index size, coverage and counters for response metadata."""
+        return dict(
+            self.stats,
+            calls=len(self.calls),
+            tokens=len(self.postings),
+            covered_from=self.covered_from,
+            watermark=self.watermark,
+            building=self.watermark is None or self.pending is not None
+        )
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_call_index(shared_store=None) -> CallIndex:
+    """
+    Get the module-level call index, creating it on first use.
+    
+    Args:
+        shared_store: Shared blob store used when the index is created
+    
+    Returns:
+        CallIndex: Index instance
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CallIndex(shared_store=shared_store)
+        return _index
@@ -0,0 +1,222 @@
+"""
+RevOps AI Framework V2 - Gong Call Statistics Engine
+
+Vectorized statistics over many Gong calls for quarterly rollups by rep or
+account. Calls are loaded once into NumPy column arrays (start time,
+duration, participant count, talk ratio and the grouping keys), and every
+aggregate is computed from those arrays with grouped reductions
+(np.bincount over integer group codes), so the cost per call is a few array
+operations instead of a pass over call dicts per metric.
+
+    rollup   per group: call count, total/mean duration, percentiles of
+             duration, participants and talk ratio
+    trends   per time bucket (day, week, month), optionally per group
+
+Talk ratio is the share of talk time spoken by internal speakers; calls
+without talk-time data are left out of talk-ratio aggregates only.
+"""
+
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from call_index import account_names, participant_domains
+from call_store import parse_timestamp, talk_ratio
+
+# Optional dependency: the statistics engine needs numpy
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_PERCENTILES = [50, 90]
+GROUP_KEYS = ('user', 'account', 'direction')
+BUCKETS = ('day', 'week', 'month')
+METRICS = ('duration', 'participants', 'talk_ratio')
+SECONDS_PER_DAY = 86400
+
+def columns_from_calls(calls: Iterable[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Statistics input columns from cleaned extensive call records (the live
+    API path; the call store returns the same columns from SQL).
+    
+    Args:
+        calls (Iterable[Dict[str, Any]]): Cleaned calls with parties and interaction
+    
+    Returns:
+        Dict[str, List[Any]]: One list per column
+    """
+    columns = {name: [] for name in ('started_epoch', 'duration', 'participants', 'talk_ratio', 'user', 'account', 'direction')}
+    for call in calls:
+        parties = call.get('parties') or []
+        accounts = account_names(call) or participant_domains(call)
+        columns['started_epoch'].append(parse_timestamp(call.get('started')))
+        columns['duration'].append(call.get('duration'))
+        columns['participants'].append(len(parties))
+        columns['talk_ratio'].append(talk_ratio(call))
+        columns['user'].append(call.get('primaryUserId'))
+        columns['account'].append(accounts[0] if accounts else None)
+        columns['direction'].append(call.get('direction'))
+    return columns
+
+class CallColumns:
+    """
+    Call records as NumPy column arrays. Missing numbers are NaN and missing
+    keys are 'unknown'.
+    """
+    
+    def __init__(self, columns: Dict[str, List[Any]]):
+        """
+        Build the arrays; calls without a start time are dropped.
+        
+        Args:
+            columns (Dict[str, List[Any]]): Lists from columns_from_calls or CallStore.stats_columns
+        """
+        started = np.array([np.nan if v is None else v for v in columns['started_epoch']], dtype=np.float64)
+        keep = ~np.isnan(started)
+        self.started = started[keep].astype(np.int64)
+        self.values = {
+            metric: np.array([np.nan if v is None else v for v in columns[metric]], dtype=np.float64)[keep]
+            for metric in METRICS
+        }
+        self.keys = {
+            key: np.array(['unknown' if v in (None, '') else str(v) for v in columns[key]], dtype=object)[keep]
+            for key in GROUP_KEYS
+        }
+    
+    def __len__(self) -> int:
+        return len(self.started)
+    
+    def group_codes(self, group_by: Optional[str]) -> Tuple[List[str], 'np.ndarray']:
+        """Group labels and a group code per call (a single 'all' group without group_by)."""
+        if not group_by:
+            return ['all'], np.zeros(len(self), dtype=np.int64)
+        labels, codes = np.unique(self.keys[group_by].astype(str), return_inverse=True)
+        return labels.tolist(), codes.astype(np.int64)
+    
+    def bucket_codes(self, bucket: str) -> Tuple[List[str], 'np.ndarray']:
+        """Bucket labels (start date of each bucket) and a bucket code per call."""
+        days = self.started // SECONDS_PER_DAY
+        if bucket == 'day':
+            starts = days.astype('datetime64[D]')
+        elif bucket == 'week':
+            # 1970-01-01 was a Thursday; shift so weeks start on Monday
+            starts = (days - (days + 3) % 7).astype('datetime64[D]')
+        else:
+            starts = days.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]')
+        labels, codes = np.unique(starts, return_inverse=True)
+        return [str(label) for label in labels], codes.astype(np.int64)
+
+def _number(value: Any, digits: int = 2) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+def grouped_stats(codes: 'np.ndarray', n_groups: int, values: 'np.ndarray',
+                  percentiles: List[float]) -> Dict[str, 'np.ndarray']:
+    """
+    Count, sum, mean and percentiles of values per group code, ignoring NaN.
+    Percentiles use linear interpolation (numpy's default) and are computed
+    for all groups at once from one sort by (group, value).
+    
+    Args:
+        codes (np.ndarray): Group code per call
+        n_groups (int): Number of groups
+        values (np.ndarray): Metric values per call
+        percentiles (List[float]): Percentiles to compute (0-100)
+    
+    Returns:
+        Dict[str, np.ndarray]: count, sum, mean and p<N> arrays indexed by group code
+    """
+    valid = ~np.isnan(values)
+    group_codes = codes[valid]
+    group_values = values[valid]
+    counts = np.bincount(group_codes, minlength=n_groups)
+    sums = np.bincount(group_codes, weights=group_values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    
+    result = {'count': counts, 'sum': sums, 'mean': means}
+    order = np.lexsort((group_values, group_codes))
+    sorted_values = group_values[order]
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    for percentile in percentiles:
+        position = (np.maximum(counts, 1) - 1) * (percentile / 100.0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        if len(sorted_values):
+            low_values = sorted_values[np.minimum(offsets + lower, len(sorted_values) - 1)]
+            high_values = sorted_values[np.minimum(offsets + upper, len(sorted_values) - 1)]
+            values_at = low_values + (high_values - low_values) * fraction
+        else:
+            values_at = np.full(n_groups, np.nan)
+        result[f"p{percentile:g}"] = np.where(counts > 0, values_at, np.nan)
+    return result
+
+def rollup(columns: 'CallColumns', group_by: Optional[str] = None,
+           percentiles: Optional[List[float]] = None) -> Dict[str, Any]:
+    """
+    Aggregates per group: calls, total and mean duration, and percentiles of
+    duration, participant count and talk ratio.
+    
+    Args:
+        columns (CallColumns): Call columns
+        group_by (Optional[str]): user, account or direction; None for one overall group
+        percentiles (Optional[List[float]]): Percentiles to report (default 50, 90)
+    
+    Returns:
+        Dict[str, Any]: Groups sorted by call count, largest first
+    """
+    percentiles = percentiles or DEFAULT_PERCENTILES
+    labels, codes = columns.group_codes(group_by)
+    calls = np.bincount(codes, minlength=len(labels))
+    stats = {metric: grouped_stats(codes, len(labels), columns.values[metric], percentiles) for metric in METRICS}
+    
+    groups = []
+    for index in np.argsort(-calls, kind='stable'):
+        group = {'key': labels[index], 'calls': int(calls[index])}
+        group['total_duration'] = _number(stats['duration']['sum'][index], 0)
+        for metric in METRICS:
+            summary = {'mean': _number(stats[metric]['mean'][index], 3 if metric == 'talk_ratio' else 2)}
+            for percentile in percentiles:
+                summary[f"p{percentile:g}"] = _number(stats[metric][f"p{percentile:g}"][index], 3 if metric == 'talk_ratio' else 2)
+            group[metric] = summary
+        groups.append(group)
+    return {'group_by': group_by, 'calls': len(columns), 'groups': groups}
+
+def trends(columns: 'CallColumns', bucket: str = 'week', group_by: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Call count, total and mean duration and mean talk ratio per time bucket,
+    optionally as one series per group.
+    
+    Args:
+        columns (CallColumns): Call columns
+        bucket (str): day, week (starting Monday) or month
+        group_by (Optional[str]): user, account or direction
+    
+    Returns:
+        Dict[str, Any]: Series of buckets (per group when group_by is given)
+    """
+    bucket_labels, bucket_codes = columns.bucket_codes(bucket)
+    group_labels, group_codes = columns.group_codes(group_by)
+    n_buckets = len(bucket_labels)
+    cells = group_codes * n_buckets + bucket_codes
+    n_cells = len(group_labels) * n_buckets
+    
+    calls = np.bincount(cells, minlength=n_cells)
+    duration = grouped_stats(cells, n_cells, columns.values['duration'], [])
+    ratio = grouped_stats(cells, n_cells, columns.values['talk_ratio'], [])
+    
+    series = []
+    for group_index, label in enumerate(group_labels):
+        points = []
+        for bucket_index in np.nonzero(calls[group_index * n_buckets:(group_index + 1) * n_buckets])[0]:
+            cell = group_index * n_buckets + bucket_index
+            points.append({
+                'bucket': bucket_labels[bucket_index],
+                'calls': int(calls[cell]),
+                'total_duration': _number(duration['sum'][cell], 0),
+                'mean_duration': _number(duration['mean'][cell]),
+                'mean_talk_ratio': _number(ratio['mean'][cell], 3)
+            })
+        series.append({'key': label, 'points': points})
+    return {'bucket': bucket, 'group_by': group_by, 'calls': len(columns), 'series': series}
@@ -0,0 +1,527 @@
+"""
+RevOps AI Framework V2 - Gong Local Call Store
+
+SQLite copy of Gong calls, participants, CRM accounts, topics and company
+tokens (derived with the call index rules), kept up to date by an incremental
+sync job so analytics over months of calls do not go live to the Gong API on
+every request.
+
+Sync is checkpointed in the sync_state table:
+    covered_from   start of the synced history
+    watermark      end of the last fully synced window
+    pending        window being synced (with its Gong cursor) when a run was
+                   cut short by the page cap or time budget; the next run
+                   resumes it
+Each run only fetches calls started since the watermark (minus a small
+overlap); rows are upserted, so overlap and retries are harmless.
+
+get_gong_data answers from the store when [from, to] lies inside
+[covered_from, watermark + GONG_SYNC_MAX_LAG_SECONDS]. The database lives in
+/tmp and is mirrored gzip-compressed to the shared tier after every sync, so
+a new container starts from the latest synced copy.
+
+    GONG_CALL_STORE_PATH        SQLite file (default /tmp/gong_calls.db)
+    GONG_SYNC_LOOKBACK_DAYS     history covered by the first sync (default 365)
+    GONG_SYNC_MAX_LAG_SECONDS   how far past the watermark a range still counts
+                                as covered (default 900)
+"""
+
+import os
+import json
+import gzip
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+from call_index import account_names, call_tokens, query_tokens
+
+STORE_PATH = os.environ.get('GONG_CALL_STORE_PATH', '/tmp/gong_calls.db')
+SYNC_LOOKBACK_DAYS = int(os.environ.get('GONG_SYNC_LOOKBACK_DAYS', '365'))
+SYNC_MAX_LAG_SECONDS = int(os.environ.get('GONG_SYNC_MAX_LAG_SECONDS', '900'))
+SYNC_OVERLAP_SECONDS = 3600
+SHARED_DB_KEY = 'call-store/gong_calls.db.gz'
+SHARED_STATE_KEY = 'call-store/state.json'
+SCHEMA_VERSION = 3
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    started TEXT,
+    started_epoch INTEGER,
+    duration INTEGER,
+    primary_user_id TEXT,
+    direction TEXT,
+    scope TEXT,
+    system TEXT,
+    media TEXT,
+    url TEXT,
+    talk_ratio REAL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS calls_started ON calls (started_epoch);
+CREATE TABLE IF NOT EXISTS participants (
+    call_id TEXT,
+    speaker_id TEXT,
+    user_id TEXT,
+    name TEXT,
+    email TEXT,
+    email_domain TEXT,
+    affiliation TEXT,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS participants_call ON participants (call_id);
+CREATE INDEX IF NOT EXISTS participants_domain ON participants (email_domain);
+CREATE TABLE IF NOT EXISTS accounts (
+    call_id TEXT,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS accounts_call ON accounts (call_id);
+CREATE TABLE IF NOT EXISTS topics (
+    call_id TEXT,
+    name TEXT,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS topics_call ON topics (call_id);
+CREATE TABLE IF NOT EXISTS company_tokens (
+    call_id TEXT,
+    token TEXT
+);
+CREATE INDEX IF NOT EXISTS company_tokens_token ON company_tokens (token);
+CREATE INDEX IF NOT EXISTS company_tokens_call ON company_tokens (call_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def parse_timestamp(value: Optional[str], end_of_day: bool = False) -> Optional[int]:
+    """
+    Epoch seconds for an ISO 8601 timestamp or a YYYY-MM-DD date.
+    
+    Args:
+        value (Optional[str]): Timestamp or date
+        end_of_day (bool): For a bare date, use its last second instead of midnight
+    
+    Returns:
+        Optional[int]: Epoch seconds (UTC), or None if the value cannot be parsed
+    """
+    if not value:
+        return None
+    text = str(value).strip()
+    try:
+        if len(text) == 10:
+            parsed = datetime.strptime(text, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            if end_of_day:
+                parsed += timedelta(days=1, seconds=-1)
+        else:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp())
+    except ValueError:
+        return None
+
+def talk_ratio(call: Dict[str, Any]) -> Optional[float]:
+    """
+    Share of a call's talk time spoken by internal speakers (those with a Gong
+    userId), from the interaction speakers of an extensive call.
+    
+    Args:
+        call (Dict[str, Any]): Cleaned extensive call record
+    
+    Returns:
+        Optional[float]: Ratio between 0 and 1, or None without talk-time data
+    """
+    interaction = call.get('interaction')
+    speakers = interaction.get('speakers') if isinstance(interaction, dict) else None
+    if not speakers:
+        return None
+    total = sum(float(s.get('talkTime') or 0) for s in speakers if isinstance(s, dict))
+    if total <= 0:
+        return None
+    internal = sum(float(s.get('talkTime') or 0) for s in speakers if isinstance(s, dict) and s.get('userId'))
+    return internal / total
+
+class CallStore:
+    """
+    SQLite call store with a checkpointed incremental sync.
+    """
+    
+    def __init__(self, path: str = STORE_PATH, shared_store=None,
+                 lookback_days: int = SYNC_LOOKBACK_DAYS, max_lag_seconds: int = SYNC_MAX_LAG_SECONDS):
+        """
+        Initialize the store, restoring the database from the shared tier when
+        there is no local copy or the shared copy is further along.
+        
+        Args:
+            path (str): SQLite database file
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            lookback_days (int): History covered by the first sync
+            max_lag_seconds (int): How far past the watermark a range still counts as covered
+        """
+        self.path = path
+        self.shared_store = shared_store
+        self.lookback_days = lookback_days
+        self.max_lag_seconds = max_lag_seconds
+        self._lock = threading.Lock()
+        self._restore_shared()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        if self._get_state('schema_version') not in (None, str(SCHEMA_VERSION)):
+            print("Call store schema changed, starting a fresh sync")
+            self.conn.executescript(
+                "DROP TABLE calls; DROP TABLE participants; DROP TABLE accounts; DROP TABLE topics; "
+                "DROP TABLE company_tokens; DROP TABLE sync_state;"
+            )
+            self.conn.executescript(SCHEMA)
+        self._set_state('schema_version', str(SCHEMA_VERSION))
+        self.conn.commit()
+    
+    def _restore_shared(self) -> None:
+        if self.shared_store is None:
+            return
+        try:
+            blob = self.shared_store.get(SHARED_STATE_KEY)
+            if not blob:
+                return
+            shared_watermark = json.loads(blob.decode('utf-8')).get('watermark') or ''
+            if os.path.exists(self.path) and shared_watermark <= (self._local_watermark() or ''):
+                return
+            data = self.shared_store.get(SHARED_DB_KEY)
+            if data:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(gzip.decompress(data))
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Call store shared tier read failed: {str(e)}")
+    
+    def _local_watermark(self) -> Optional[str]:
+        try:
+            conn = sqlite3.connect(self.path)
+            try:
+                row = conn.execute("SELECT value FROM sync_state WHERE key = 'watermark'").fetchone()
+                return row[0] if row else None
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+    
+    def _publish_shared(self) -> None:
+        if self.shared_store is None:
+            return
+        try:
+            # sqlite3 backup gives a consistent copy while the connection stays open
+            snapshot = f"{self.path}.snapshot"
+            target = sqlite3.connect(snapshot)
+            self.conn.backup(target)
+            target.close()
+            with open(snapshot, 'rb') as f:
+                data = gzip.compress(f.read(), compresslevel=6)
+            os.remove(snapshot)
+            self.shared_store.put(SHARED_DB_KEY, data)
+            self.shared_store.put(SHARED_STATE_KEY, json.dumps(self.status()).encode('utf-8'))
+        except Exception as e:
+            print(f"Call store shared tier write failed: {str(e)}")
+    
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_state(self, key: str, value: Optional[str]) -> None:
+        if value is None:
+            self.conn.execute("DELETE FROM sync_state WHERE key = ?", (key,))
+        else:
+            self.conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+    
+    def upsert_call(self, call: Dict[str, Any]) -> None:
+        """
+        Insert or replace one call with its participants, accounts, topics and company tokens.
+        
+        Args:
+            call (Dict[str, Any]): Cleaned extensive call record
+        """
+        call_id = str(call.get('id'))
+        summary = {k: v for k, v in call.items() if k not in ('parties', 'context', 'content', 'interaction')}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO calls (id, title, started, started_epoch, duration, primary_user_id, direction, "
+            "scope, system, media, url, talk_ratio, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (call_id, call.get('title'), call.get('started'), parse_timestamp(call.get('started')),
+             call.get('duration'), call.get('primaryUserId'), call.get('direction'), call.get('scope'),
+             call.get('system'), call.get('media'), call.get('url'), talk_ratio(call),
+             json.dumps(summary, separators=(',', ':')))
+        )
+        for table in ('participants', 'accounts', 'topics', 'company_tokens'):
+            self.conn.execute(f"DELETE FROM {table} WHERE call_id = ?", (call_id,))
+        self.conn.executemany(
+            "INSERT INTO participants (call_id, speaker_id, user_id, name, email, email_domain, affiliation, title) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (call_id, party.get('speakerId'), party.get('userId'), party.get('name'), party.get('emailAddress'),
+                 party['emailAddress'].rsplit('@', 1)[1].lower() if '@' in (party.get('emailAddress') or '') else None,
+                 party.get('affiliation'), party.get('title'))
+                for party in call.get('parties') or [] if isinstance(party, dict)
+            ]
+        )
+        self.conn.executemany(
+            "INSERT INTO accounts (call_id, name) VALUES (?, ?)",
+            [(call_id, name) for name in account_names(call)]
+        )
+        self.conn.executemany(
+            "INSERT INTO company_tokens (call_id, token) VALUES (?, ?)",
+            [(call_id, token) for token in sorted(call_tokens(call))]
+        )
+        topics = ((call.get('content') or {}).get('topics') or []) if isinstance(call.get('content'), dict) else []
+        self.conn.executemany(
+            "INSERT INTO topics (call_id, name, duration) VALUES (?, ?, ?)",
+            [(call_id, topic.get('name'), topic.get('duration')) for topic in topics if isinstance(topic, dict)]
+        )
+    
+    def sync(self, fetch_pages: Callable[[Dict[str, Any]], Iterable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Fetch calls started since the watermark (or resume a pending window) and store them.
+        
+        Args:
+            fetch_pages (Callable): Yields cleaned extensive call pages (see iter_call_pages)
+                for {'from_date', 'to_date', 'cursor'} params
+        
+        Returns:
+            Dict[str, Any]: Sync summary (window, calls stored, whether it completed) and store status
+        """
+        with self._lock:
+            start = time.time()
+            pending = json.loads(self._get_state('pending') or 'null')
+            if pending is None:
+                now = datetime.utcnow()
+                watermark = self._get_state('watermark')
+                if watermark:
+                    from_date = datetime.strptime(watermark, DATE_FORMAT) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+                else:
+                    from_date = now - timedelta(days=self.lookback_days)
+                    self._set_state('covered_from', from_date.strftime(DATE_FORMAT))
+                pending = {'from_date': from_date.strftime(DATE_FORMAT), 'to_date': now.strftime(DATE_FORMAT), 'cursor': None}
+            window = dict(pending)
+            
+            stored = 0
+            stop_reason = None
+            try:
+                for page in fetch_pages(dict(window)):
+                    if not page.get('success'):
+                        raise Exception(page.get('error', 'Failed to retrieve calls from Gong'))
+                    for call in page['results']:
+                        self.upsert_call(call)
+                        stored += 1
+                    pending['cursor'] = page.get('cursor')
+                    stop_reason = page.get('stop_reason')
+                    # Checkpoint after every page so a failure resumes from here
+                    self._set_state('pending', json.dumps(pending))
+                    self.conn.commit()
+            finally:
+                if stop_reason == 'exhausted':
+                    self._set_state('watermark', window['to_date'])
+                    self._set_state('pending', None)
+                else:
+                    self._set_state('pending', json.dumps(pending))
+                self._set_state('synced_at', datetime.utcnow().strftime(DATE_FORMAT))
+                self.conn.commit()
+                self._publish_shared()
+            
+            return {
+                'from_date': window['from_date'],
+                'to_date': window['to_date'],
+                'calls_stored': stored,
+                'complete': stop_reason == 'exhausted',
+                'elapsed_ms': int((time.time() - start) * 1000),
+                'store': self.status()
+            }
+    
+    def status(self) -> Dict[str, Any]:
+        """Coverage and size of the store (callers hold the lock or run single-threaded)."""
+        return {
+            'covered_from': self._get_state('covered_from'),
+            'watermark': self._get_state('watermark'),
+            'synced_at': self._get_state('synced_at'),
+            'pending': json.loads(self._get_state('pending') or 'null'),
+            'calls': self.conn.execute("SELECT COUNT(*) FROM calls").fetchone()[0]
+        }
+    
+    def covers(self, from_date: Optional[str], to_date: Optional[str]) -> bool:
+        """
+        Whether a date range lies inside the synced history.
+        
+        Args:
+            from_date (Optional[str]): Range start (ISO timestamp or date); required
+            to_date (Optional[str]): Range end; defaults to now
+        
+        Returns:
+            bool: True if the store can answer for the range
+        """
+        with self._lock:
+            covered_from = parse_timestamp(self._get_state('covered_from'))
+            watermark = parse_timestamp(self._get_state('watermark'))
+        start = parse_timestamp(from_date)
+        end = parse_timestamp(to_date, end_of_day=True) if to_date else int(time.time())
+        if covered_from is None or watermark is None or start is None or end is None:
+            return False
+        # A date-only end covers the whole day, so only today's part must be synced
+        end = min(end, int(time.time()))
+        return covered_from <= start and end <= watermark + self.max_lag_seconds
+    
+    def _range_clause(self, from_date: Optional[str], to_date: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, args = [], []
+        if from_date:
+            clauses.append("c.started_epoch >= ?")
+            args.append(parse_timestamp(from_date))
+        if to_date:
+            clauses.append("c.started_epoch <= ?")
+            args.append(parse_timestamp(to_date, end_of_day=True))
+        return (" AND ".join(clauses) or "1 = 1"), args
+    
+    def _call_rows(self, sql: str, args: List[Any]) -> List[Dict[str, Any]]:
+        calls = [json.loads(row['data']) for row in self.conn.execute(sql, args)]
+        if not calls:
+            return calls
+        placeholders = ",".join("?" * len(calls))
+        parties = {}
+        for row in self.conn.execute(
+            f"SELECT call_id, speaker_id, user_id, name, email, affiliation, title FROM participants "
+            f"WHERE call_id IN ({placeholders})", [call['id'] for call in calls]
+        ):
+            party = {'speakerId': row['speaker_id'], 'userId': row['user_id'], 'name': row['name'],
+                     'emailAddress': row['email'], 'affiliation': row['affiliation'], 'title': row['title']}
+            parties.setdefault(row['call_id'], []).append({k: v for k, v in party.items() if v is not None})
+        for call in calls:
+            call['parties'] = parties.get(call['id'], [])
+        return calls
+    
+    def query_calls(self, from_date: Optional[str], to_date: Optional[str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Calls started in a range, most recent first, in the get_calls result shape.
+        
+        Args:
+            from_date (Optional[str]): Range start
+            to_date (Optional[str]): Range end
+            limit (Optional[int]): Maximum calls
+        
+        Returns:
+            List[Dict[str, Any]]: Calls with participants
+        """
+        where, args = self._range_clause(from_date, to_date)
+        sql = f"SELECT c.data FROM calls c WHERE {where} ORDER BY c.started_epoch DESC"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        with self._lock:
+            return self._call_rows(sql, args)
+    
+    def search_company(self, company_name: str, from_date: Optional[str], to_date: Optional[str],
+                       limit: int = 10) -> Dict[str, Any]:
+        """
+        Calls whose title, CRM account or external participant email domain matches a company.
+        Matching uses the call index token rules (call_index.query_tokens and
+        call_tokens), so a search gives the same calls from the store as from the index.
+        
+        Args:
+            company_name (str): Company name or domain
+            from_date (Optional[str]): Range start
+            to_date (Optional[str]): Range end
+            limit (int): Maximum calls
+        
+        Returns:
+            Dict[str, Any]: Matching calls (most recent first) and the total number of matches
+        """
+        tokens = sorted(query_tokens(company_name))
+        if not tokens:
+            return {'results': [], 'total_matches': 0}
+        where, args = self._range_clause(from_date, to_date)
+        # A call matches when it carries every token of the company name
+        match = (
+            f"c.id IN (SELECT call_id FROM company_tokens WHERE token IN ({','.join('?' * len(tokens))}) "
+            "GROUP BY call_id HAVING COUNT(DISTINCT token) = ?)"
+        )
+        match_args = tokens + [len(tokens)]
+        with self._lock:
+            total = self.conn.execute(
+                f"SELECT COUNT(*) FROM calls c WHERE {where} AND {match}", args + match_args
+            ).fetchone()[0]
+            calls = self._call_rows(
+                f"SELECT c.data FROM calls c WHERE {where} AND {match} ORDER BY c.started_epoch DESC LIMIT ?",
+                args + match_args + [int(limit)]
+            )
+        return {'results': calls, 'total_matches': total}
+    
+    def stats_columns(self, from_date: Optional[str], to_date: Optional[str],
+                      user_ids: Optional[List[str]] = None) -> Dict[str, List[Any]]:
+        """
+        Per-call statistics inputs for a range, one list per column.
+        
+        Args:
+            from_date (Optional[str]): Range start
+            to_date (Optional[str]): Range end
+            user_ids (Optional[List[str]]): Restrict to calls hosted by these users
+        
+        Returns:
+            Dict[str, List[Any]]: started_epoch, duration, participants, talk_ratio,
+            user, account and direction columns
+        """
+        where, args = self._range_clause(from_date, to_date)
+        if user_ids:
+            where += f" AND c.primary_user_id IN ({','.join('?' * len(user_ids))})"
+            args += [str(user_id) for user_id in user_ids]
+        sql = f"""
+            SELECT c.started_epoch, c.duration, c.talk_ratio, c.primary_user_id AS user, c.direction,
+                   (SELECT COUNT(*) FROM participants p WHERE p.call_id = c.id) AS participants,
+                   COALESCE(
+                       (SELECT a.name FROM accounts a WHERE a.call_id = c.id LIMIT 1),
+                       (SELECT p.email_domain FROM participants p WHERE p.call_id = c.id
+                        AND LOWER(COALESCE(p.affiliation, '')) != 'internal' AND p.email_domain IS NOT NULL LIMIT 1)
+                   ) AS account
+            FROM calls c WHERE {where}
+        """
+        names = ['started_epoch', 'duration', 'participants', 'talk_ratio', 'user', 'account', 'direction']
+        with self._lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return {name: [row[name] for row in rows] for name in names}
+    
+    def call_topics(self, call_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Topics of a stored call.
+        
+        Args:
+            call_id (str): Gong call ID
+        
+        Returns:
+            Optional[List[Dict[str, Any]]]: Topics, or None if the call is not in the store
+        """
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM calls WHERE id = ?", (str(call_id),)).fetchone() is None:
+                return None
+            return [
+                {'name': row['name'], 'duration': row['duration']}
+                for row in self.conn.execute("SELECT name, duration FROM topics WHERE call_id = ?", (str(call_id),))
+            ]
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_call_store(shared_store=None) -> CallStore:
+    """
+    Get the module-level call store, opening it on first use.
+    
+    Args:
+        shared_store: Shared blob store used when the store is opened
+    
+    Returns:
+        CallStore: Store instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CallStore(shared_store=shared_store)
+        return _store
@@ -16,10 +16,50 @@ import base64
 import hmac
 import hashlib
 from datetime import datetime, timedelta, date
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 import re
 import time
 
+from firebolt_common.shared_store import get_shared_store
+from call_index import get_call_index
+from rate_limiter import get_rate_limiter
+from transcript_cache import get_transcript_cache
+from transcript_reducer import reduce_transcript
+from call_store import get_call_store
+from call_stats import NUMPY_AVAILABLE, GROUP_KEYS, BUCKETS, CallColumns, columns_from_calls, rollup, trends
+from concurrent.futures import ThreadPoolExecutor
+
+# Pagination limits for cursor-following call retrieval
+GONG_MAX_RECORDS = int(os.environ.get('GONG_MAX_RECORDS', '1000'))
+GONG_PAGE_TIME_BUDGET = float(os.environ.get('GONG_PAGE_TIME_BUDGET', '20'))
+# Calls read per company index refresh; an unfinished window resumes on the next refresh
+GONG_INDEX_REFRESH_MAX_RECORDS = int(os.environ.get('GONG_INDEX_REFRESH_MAX_RECORDS', '5000'))
+# Calls read per sync run of the local call store; an unfinished window resumes on the next run
+GONG_SYNC_MAX_RECORDS = int(os.environ.get('GONG_SYNC_MAX_RECORDS', '10000'))
+GONG_SYNC_TIME_BUDGET = float(os.environ.get('GONG_SYNC_TIME_BUDGET', '300'))
+# Seconds of the invocation kept back after a sync for the last page (with 429 retries)
+# and for publishing the store to the shared tier
+GONG_SYNC_PUBLISH_MARGIN = float(os.environ.get('GONG_SYNC_PUBLISH_MARGIN', '120'))
+# Calls read from the API for call_rollup / call_trends when the call store does not cover the range
+GONG_STATS_MAX_RECORDS = int(os.environ.get('GONG_STATS_MAX_RECORDS', '10000'))
+
+# 429 handling and parallel transcript retrieval (requests are paced by rate_limiter)
+GONG_RATE_LIMIT_RETRIES = int(os.environ.get('GONG_RATE_LIMIT_RETRIES', '3'))
+GONG_RETRY_AFTER_MAX = float(os.environ.get('GONG_RETRY_AFTER_MAX', '30'))
+GONG_TRANSCRIPT_CONCURRENCY = int(os.environ.get('GONG_TRANSCRIPT_CONCURRENCY', '5'))
+# Transcripts are returned as reduced speaker turns unless 'raw' is requested
+GONG_TRANSCRIPT_FORMAT = os.environ.get('GONG_TRANSCRIPT_FORMAT', 'reduced').lower()
+
+# Shared tier behind the /tmp caches, created once per container. The store
+# implementation is shared with the Firebolt lambdas (packaged from
+# tools/firebolt/firebolt_common); the Gong lambda has its own URI setting.
+shared_store = get_shared_store(os.environ.get('GONG_SHARED_STORE_URI', ''))
+
+# Lambda context of the current invocation, set by lambda_handler
+invocation_context = None
+# When this container last asked for a background call index build (see start_call_index_build)
+index_build_requested_at = 0.0
+
 # Import agent tracer for debugging
 try:
     import sys
@@ -183,40 +223,75 @@ def make_gong_request(
     base_url = "https://api.gong.io/v2"
     url = f"{base_url}/{endpoint}"
     
-    # Generate headers with authentication
-    headers = generate_gong_headers(
-        credentials.get('access_key', ''),
-        credentials.get('access_key_secret', '')
-    )
-    
     # Prepare request data if needed
     data = None
     if body and method in ['POST', 'PUT', 'PATCH']:
         data = json.dumps(body).encode('utf-8')
     
-    # Create request
-    print(f"DEBUG: Making request to {url} with method {method}")
-    print(f"DEBUG: Request headers: {headers}")
-    if data:
-        print(f"DEBUG: Request body: {data.decode('utf-8')}")
-    
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers=headers,
-        method=method
-    )
-    
-    try:
-        # Send request and get response
-        with urllib.request.urlopen(req) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
+    limiter = get_rate_limiter()
+    attempt = 0
+    while True:
+        # Every request, including retries, takes a token so parallel callers share the quota
+        limiter.acquire()
+        
+        # Generate headers with authentication (timestamped, so per attempt)
+        headers = generate_gong_headers(
+            credentials.get('access_key', ''),
+            credentials.get('access_key_secret', '')
+        )
+        
+        # Create request
+        print(f"DEBUG: Making request to {url} with method {method}")
+        print(f"DEBUG: Request headers: {headers}")
+        if data:
+            print(f"DEBUG: Request body: {data.decode('utf-8')}")
+        
+        req = urllib.request.Request(
+            url,
+            data=data,
+            headers=headers,
+            method=method
+        )
+        
+        try:
+            # Send request and get response
+            with urllib.request.urlopen(req) as response:
+                response_data = json.loads(response.read().decode('utf-8'))
+                
+            return response_data
             
-        return response_data
+        except urllib.error.HTTPError as e:
+            error_body = e.read().decode('utf-8')
+            if e.code == 429 and attempt < GONG_RATE_LIMIT_RETRIES:
+                attempt += 1
+                retry_after = parse_retry_after(e.headers.get('Retry-After') if e.headers else None)
+                print(f"Gong rate limit hit on {endpoint}, retrying in {retry_after:.1f}s (attempt {attempt})")
+                limiter.pause(retry_after)
+                continue
+            raise Exception(f"Gong API error: {e.code}, Response: {error_body}")
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date).
+    
+    Args:
+        value (Optional[str]): Header value
+        default (float): Delay used when the header is missing or unreadable
         
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        raise Exception(f"Gong API error: {e.code}, Response: {error_body}")
+    Returns:
+        float: Seconds to wait, capped at GONG_RETRY_AFTER_MAX
+    """
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            from email.utils import parsedate_to_datetime
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return default
+    return min(max(seconds, 0.0), GONG_RETRY_AFTER_MAX)
 
 # Data processing functions
 def clean_gong_response(raw_data: Dict[str, Any], query_type: str) -> Dict[str, Any]:
@@ -259,6 +334,10 @@ def clean_gong_response(raw_data: Dict[str, Any], query_type: str) -> Dict[str,
                 # Handle both string and dict types for call
                 if not isinstance(call, dict):
                     continue
+                
+                # Extensive responses nest the basic call fields under metaData
+                if isinstance(call.get('metaData'), dict):
+                    call = {**call['metaData'], **{k: v for k, v in call.items() if k != 'metaData'}}
                     
                 # Extract and format key call data from actual API response
                 processed_call = {
@@ -276,6 +355,8 @@ def clean_gong_response(raw_data: Dict[str, Any], query_type: str) -> Dict[str,
                     "context": call.get('context'),
                     "meetingUrl": call.get('meetingUrl'),
                     "transcript": call.get('transcript'),
+                    "content": call.get('content'),
+                    "interaction": call.get('interaction'),
                     "parties": call.get('parties', [])
                 }
                 
@@ -326,18 +407,17 @@ def clean_gong_response(raw_data: Dict[str, Any], query_type: str) -> Dict[str,
         }
 
 # Main functions for different Gong API endpoints
-def get_calls(credentials: Dict[str, str], params: Dict[str, Any]) -> Dict[str, Any]:
+def build_calls_endpoint(params: Dict[str, Any], cursor: Optional[str] = None) -> str:
     """
-    Retrieve call data from Gong API.
+    Build the calls endpoint with query parameters for one page.
     
     Args:
-        credentials (Dict[str, str]): Gong API credentials
         params (Dict[str, Any]): Parameters for call retrieval
+        cursor (Optional[str]): Cursor returned with the previous page
         
     Returns:
-        Dict[str, Any]: Structured call data
+        str: Endpoint path with query string
     """
-    # Build query parameters for the endpoint
     query_params = []
     
     # Add date range if provided
@@ -355,20 +435,207 @@ def get_calls(credentials: Dict[str, str], params: Dict[str, Any]) -> Dict[str,
     if params.get('workspace_id'):
         query_params.append(f"workspaceId={params.get('workspace_id')}")
     
-    # Construct endpoint with query params
+    if cursor:
+        query_params.append(f"cursor={urllib.parse.quote(cursor)}")
+    
     endpoint = "calls"
     if query_params:
         endpoint = f"{endpoint}?{'&'.join(query_params)}"
+    return endpoint
+
+def build_extensive_calls_body(params: Dict[str, Any], cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the calls/extensive request body for one page. Extensive calls carry
+    participants and CRM context in addition to the basic call fields.
     
-    # Make the GET request
-    response = make_gong_request(
-        endpoint=endpoint,
-        method="GET",
-        credentials=credentials
-    )
+    Args:
+        params (Dict[str, Any]): Parameters for call retrieval (from_date, to_date,
+            workspace_id, call_ids, exposed_fields)
+        cursor (Optional[str]): Cursor returned with the previous page
+        
+    Returns:
+        Dict[str, Any]: Request body
+    """
+    call_filter = {}
+    if params.get('from_date'):
+        call_filter['fromDateTime'] = params.get('from_date')
+    if params.get('to_date'):
+        call_filter['toDateTime'] = params.get('to_date')
+    if params.get('workspace_id'):
+        call_filter['workspaceId'] = params.get('workspace_id')
+    if params.get('call_ids'):
+        call_filter['callIds'] = [str(call_id) for call_id in params.get('call_ids')]
     
-    # Process the response
-    return clean_gong_response(response, 'calls')
+    body = {
+        "filter": call_filter,
+        "contentSelector": {
+            "context": "Extended",
+            "exposedFields": params.get('exposed_fields') or {"parties": True}
+        }
+    }
+    if cursor:
+        body['cursor'] = cursor
+    return body
+
+def iter_call_pages(
+    credentials: Dict[str, str],
+    params: Dict[str, Any],
+    max_records: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    extensive: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily retrieve pages of calls, following the cursor Gong returns with each page.
+    
+    The next page is only requested when the consumer asks for it, so a caller
+    that has what it needs can stop iterating without fetching the rest.
+    Each yielded page is the clean_gong_response result for that page, plus:
+        page_index   - 0-based position of the page in this iteration
+        cursor       - cursor for the next page (None when there are no more);
+                       calls trimmed from a page by max_records are not revisited
+                       when resuming from it
+        stop_reason  - set on the last page: 'exhausted', 'max_records',
+                       'time_budget' or 'error'; None while more pages follow
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        params (Dict[str, Any]): Parameters for call retrieval; 'cursor' resumes a previous iteration
+        max_records (Optional[int]): Total calls to return across pages (default GONG_MAX_RECORDS)
+        time_budget (Optional[float]): Seconds after which no further page is requested
+            (default GONG_PAGE_TIME_BUDGET)
+        extensive (bool): Read calls/extensive, which adds participants and CRM context
+        
+    Yields:
+        Dict[str, Any]: Cleaned page of call data
+    """
+    max_records = GONG_MAX_RECORDS if max_records is None else max(0, int(max_records))
+    time_budget = GONG_PAGE_TIME_BUDGET if time_budget is None else float(time_budget)
+    deadline = time.time() + time_budget
+    cursor = params.get('cursor')
+    fetched = 0
+    page_index = 0
+    
+    while fetched < max_records:
+        if extensive:
+            response = make_gong_request(
+                endpoint="calls/extensive",
+                method="POST",
+                credentials=credentials,
+                body=build_extensive_calls_body(params, cursor)
+            )
+        else:
+            response = make_gong_request(
+                endpoint=build_calls_endpoint(params, cursor),
+                method="GET",
+                credentials=credentials
+            )
+        page = clean_gong_response(response, 'calls')
+        page['page_index'] = page_index
+        
+        if not page.get('success'):
+            page['stop_reason'] = 'error'
+            yield page
+            return
+        
+        # Trim the last page to the record cap
+        remaining = max_records - fetched
+        if len(page['results']) > remaining:
+            page['results'] = page['results'][:remaining]
+            page['count'] = remaining
+        fetched += page['count']
+        cursor = page.get('cursor')
+        
+        if not cursor:
+            page['stop_reason'] = 'exhausted'
+        elif fetched >= max_records:
+            page['stop_reason'] = 'max_records'
+        elif time.time() >= deadline:
+            page['stop_reason'] = 'time_budget'
+        else:
+            page['stop_reason'] = None
+        
+        yield page
+        
+        if page['stop_reason']:
+            return
+        page_index += 1
+
+def iter_calls(
+    credentials: Dict[str, str],
+    params: Dict[str, Any],
+    max_records: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    extensive: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily retrieve individual calls across pages (see iter_call_pages).
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        params (Dict[str, Any]): Parameters for call retrieval
+        max_records (Optional[int]): Total calls to scan across pages
+        time_budget (Optional[float]): Seconds after which no further page is requested
+        extensive (bool): Read calls/extensive, which adds participants and CRM context
+        
+    Yields:
+        Dict[str, Any]: Cleaned call record
+    """
+    for page in iter_call_pages(credentials, params, max_records, time_budget, extensive):
+        if not page.get('success'):
+            raise Exception(page.get('error', 'Failed to retrieve calls from Gong'))
+        for call in page['results']:
+            yield call
+
+def get_calls(credentials: Dict[str, str], params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Retrieve call data from Gong API, following pagination cursors.
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        params (Dict[str, Any]): Parameters for call retrieval; max_records caps the
+            total returned (defaults to limit, then GONG_MAX_RECORDS) and time_budget
+            bounds the time spent paging
+        
+    Returns:
+        Dict[str, Any]: Structured call data; cursor is set when more calls are available
+    """
+    max_records = params.get('max_records') or params.get('limit') or GONG_MAX_RECORDS
+    results = []
+    last_page = None
+    pages_fetched = 0
+    
+    for page in iter_call_pages(credentials, params, max_records, params.get('time_budget')):
+        last_page = page
+        if not page.get('success'):
+            # Keep whatever earlier pages returned
+            if not results:
+                return page
+            break
+        pages_fetched += 1
+        results.extend(page['results'])
+    
+    if last_page is None:
+        return {
+            "success": True,
+            "results": [],
+            "count": 0,
+            "pages_fetched": 0,
+            "cursor": params.get('cursor')
+        }
+    
+    result = {
+        "success": True,
+        "results": results,
+        "count": len(results),
+        "total_records": last_page.get('total_records', len(results)),
+        "pages_fetched": pages_fetched,
+        "cursor": last_page.get('cursor'),
+        "stop_reason": last_page.get('stop_reason')
+    }
+    if not last_page.get('success'):
+        result["error"] = last_page.get('error')
+        result["message"] = f"Returning {len(results)} calls from {pages_fetched} pages before a page failed"
+    return result
 
 def get_call_details(credentials: Dict[str, str], call_id: str) -> Dict[str, Any]:
     """
@@ -402,18 +669,31 @@ def get_call_details(credentials: Dict[str, str], call_id: str) -> Dict[str, Any
             "call_id": call_id
         }
 
-def get_call_transcript(credentials: Dict[str, str], call_id: str) -> Dict[str, Any]:
+def get_call_transcript(credentials: Dict[str, str], call_id: str, use_cache: bool = True) -> Dict[str, Any]:
     """
-    Get transcript for a specific call.
+    Get transcript for a specific call, from the transcript cache when possible.
     
     Args:
         credentials (Dict[str, str]): Gong API credentials
         call_id (str): ID of the call to get transcript for
+        use_cache (bool): Read and populate the transcript cache
         
     Returns:
         Dict[str, Any]: Call transcript
     """
     try:
+        cache = get_transcript_cache(shared_store) if use_cache else None
+        if cache is not None:
+            transcript, tier = cache.get(call_id)
+            if transcript is not None:
+                return {
+                    "success": True,
+                    "call_id": call_id,
+                    "transcript": transcript,
+                    "cached": True,
+                    "cache_tier": tier
+                }
+        
         # Make the GET request for transcript
         response = make_gong_request(
             endpoint=f"calls/{call_id}/transcript",
@@ -421,11 +701,15 @@ def get_call_transcript(credentials: Dict[str, str], call_id: str) -> Dict[str,
             credentials=credentials
         )
         
+        if cache is not None:
+            cache.put(call_id, response)
+        
         # Process the response
         return {
             "success": True,
             "call_id": call_id,
-            "transcript": response
+            "transcript": response,
+            "cached": False
         }
         
     except Exception as e:
@@ -435,48 +719,494 @@ def get_call_transcript(credentials: Dict[str, str], call_id: str) -> Dict[str,
             "call_id": call_id
         }
 
+def get_call_transcripts(
+    credentials: Dict[str, str],
+    call_ids: List[str],
+    max_workers: int = GONG_TRANSCRIPT_CONCURRENCY,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Get transcripts for several calls in parallel.
+    
+    Cached transcripts are served without a request. The rest run
+    concurrently but are paced by the shared rate limiter, and 429 responses
+    are retried after Gong's Retry-After delay. Transcripts that
+    could not be fetched are reported per call instead of failing the batch.
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        call_ids (List[str]): IDs of the calls to get transcripts for
+        max_workers (int): Maximum concurrent requests
+        use_cache (bool): Read and populate the transcript cache
+        
+    Returns:
+        Dict[str, Any]: Transcripts in call_ids order, plus per-call errors
+    """
+    call_ids = list(dict.fromkeys(str(call_id) for call_id in call_ids if call_id))
+    if not call_ids:
+        return {
+            "success": False,
+            "error": "call_ids is required for transcripts query",
+            "results": []
+        }
+    
+    start_time = time.time()
+    workers = max(1, min(int(max_workers), len(call_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fetched = list(executor.map(lambda call_id: get_call_transcript(credentials, call_id, use_cache), call_ids))
+    
+    results = [item for item in fetched if item.get('success')]
+    errors = {item['call_id']: item.get('error') for item in fetched if not item.get('success')}
+    
+    response = {
+        "success": bool(results),
+        "results": results,
+        "count": len(results),
+        "errors": errors,
+        "partial": bool(results) and bool(errors),
+        "metadata": {
+            "requested": len(call_ids),
+            "concurrency": workers,
+            "elapsed_ms": int((time.time() - start_time) * 1000),
+            "cache_hits": sum(1 for item in results if item.get('cached')),
+            "rate_limiter": get_rate_limiter().get_stats(),
+            "transcript_cache": get_transcript_cache(shared_store).get_stats()
+        }
+    }
+    if not results:
+        response["error"] = "No transcripts could be retrieved"
+    return response
+
+def as_bool(value: Any) -> bool:
+    """Interpret a boolean parameter that may arrive as a string from Bedrock."""
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes', 'y')
+    return bool(value)
+
+def reduce_transcript_results(
+    credentials: Dict[str, str],
+    results: List[Dict[str, Any]],
+    filters: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Replace raw transcripts in successful results with reduced speaker turns
+    (see transcript_reducer), unless filters ask for the raw format.
+    
+    Speakers are named from the calls' parties: cached parties are reused
+    (see TranscriptCache.put_parties) and the rest are read in one request;
+    when that fails, turns are labelled with speaker ids.
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        results (List[Dict[str, Any]]): get_call_transcript results, updated in place
+        filters (Dict[str, Any]): transcript_format ('reduced' or 'raw'), meddpicc (bool),
+            context_turns (int), use_cache (bool)
+        
+    Returns:
+        Dict[str, Any]: Total byte and estimated-token reduction
+    """
+    transcript_format = str(filters.get('transcript_format', GONG_TRANSCRIPT_FORMAT)).lower()
+    successful = [item for item in results if item.get('success')]
+    if transcript_format == 'raw' or not successful:
+        return {"format": "raw"}
+    
+    cache = get_transcript_cache(shared_store) if as_bool(filters.get('use_cache', True)) else None
+    parties = {}
+    if cache is not None:
+        for item in successful:
+            cached = cache.get_parties(item['call_id'])
+            if cached is not None:
+                parties[str(item['call_id'])] = cached
+    missing = [item['call_id'] for item in successful if str(item['call_id']) not in parties]
+    if missing:
+        calls = get_calls_by_ids(credentials, missing)
+        if calls.get('success'):
+            for call in calls['results']:
+                parties[str(call.get('id'))] = call.get('parties', [])
+                if cache is not None:
+                    cache.put_parties(str(call.get('id')), call.get('parties', []))
+        else:
+            print(f"Speaker lookup failed, using speaker ids: {calls.get('error')}")
+    
+    meddpicc = as_bool(filters.get('meddpicc', False))
+    context_turns = int(filters.get('context_turns', 1))
+    totals = {"format": "reduced", "raw_bytes": 0, "reduced_bytes": 0, "raw_tokens_est": 0, "reduced_tokens_est": 0}
+    for item in successful:
+        reduced = reduce_transcript(item['transcript'], parties.get(str(item['call_id'])), meddpicc, context_turns)
+        item['transcript'] = {"calls": reduced['calls']}
+        item['reduction'] = reduced['reduction']
+        for key in ("raw_bytes", "reduced_bytes", "raw_tokens_est", "reduced_tokens_est"):
+            totals[key] += reduced['reduction'][key]
+    
+    totals["reduction_pct"] = round(100.0 * (1 - totals["reduced_bytes"] / totals["raw_bytes"]), 1) if totals["raw_bytes"] else 0.0
+    totals["meddpicc_filtered"] = meddpicc
+    return totals
+
+def get_calls_by_ids(credentials: Dict[str, str], call_ids: List[str]) -> Dict[str, Any]:
+    """
+    Retrieve specific calls, with participants and CRM context, in as few requests as possible.
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        call_ids (List[str]): IDs of the calls to retrieve
+        
+    Returns:
+        Dict[str, Any]: Structured call data in the order of call_ids
+    """
+    if not call_ids:
+        return {"success": True, "results": [], "count": 0}
+    
+    calls = {}
+    for page in iter_call_pages(credentials, {'call_ids': call_ids}, max_records=len(call_ids), extensive=True):
+        if not page.get('success'):
+            return page
+        for call in page['results']:
+            calls[str(call.get('id'))] = call
+    
+    results = [calls[str(call_id)] for call_id in call_ids if str(call_id) in calls]
+    return {
+        "success": True,
+        "results": results,
+        "count": len(results)
+    }
+
+def refresh_call_index(credentials: Dict[str, str], force: bool = False,
+                       time_budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Bring the company call index up to date with calls started since its watermark.
+    The first build reads a year of calls, so it runs from a scheduled or
+    background refresh_call_index invocation rather than from a search.
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        force (bool): Refresh even if the last refresh is recent
+        time_budget (Optional[float]): Seconds to spend reading pages (default GONG_PAGE_TIME_BUDGET)
+        
+    Returns:
+        Dict[str, Any]: Refresh summary and index info
+    """
+    index = get_call_index(shared_store)
+    refresh = index.refresh(
+        lambda params: iter_call_pages(credentials, params, GONG_INDEX_REFRESH_MAX_RECORDS, time_budget, extensive=True),
+        force=force
+    )
+    return {
+        "success": True,
+        "refresh": refresh,
+        "index": index.info()
+    }
+
+def start_call_index_build() -> bool:
+    """
+    Ask for a background refresh_call_index run by invoking this function
+    asynchronously, at most once per GONG_SYNC_TIME_BUDGET from a container.
+    Outside Lambda nothing is invoked; schedule refresh_call_index instead.
+    
+    Returns:
+        bool: True if a build invocation was requested
+    """
+    global index_build_requested_at
+    function_name = os.environ.get('AWS_LAMBDA_FUNCTION_NAME')
+    if not function_name or time.time() - index_build_requested_at < GONG_SYNC_TIME_BUDGET:
+        return False
+    index_build_requested_at = time.time()
+    try:
+        boto3.client('lambda').invoke(
+            FunctionName=function_name,
+            InvocationType='Event',
+            Payload=json.dumps({'query_type': 'refresh_call_index'}).encode('utf-8')
+        )
+        return True
+    except Exception as e:
+        print(f"Call index build invocation failed: {str(e)}")
+        return False
+
+def sync_time_budget() -> float:
+    """
+    Seconds a sync run may spend reading pages: GONG_SYNC_TIME_BUDGET, capped
+    by the invocation's remaining time minus GONG_SYNC_PUBLISH_MARGIN. The
+    deadline is only checked between pages, so the margin has to cover one
+    more page and the shared-tier publish before the function times out.
+    
+    Returns:
+        float: Time budget in seconds
+    """
+    budget = GONG_SYNC_TIME_BUDGET
+    if invocation_context is not None and hasattr(invocation_context, 'get_remaining_time_in_millis'):
+        remaining = invocation_context.get_remaining_time_in_millis() / 1000.0 - GONG_SYNC_PUBLISH_MARGIN
+        budget = min(budget, remaining)
+    return max(1.0, budget)
+
+def sync_call_store(credentials: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Sync calls, participants, CRM accounts and topics started since the call
+    store's watermark into the local store, within sync_time_budget().
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        
+    Returns:
+        Dict[str, Any]: Sync summary and store status
+    """
+    store = get_call_store(shared_store)
+    time_budget = sync_time_budget()
+    sync = store.sync(
+        lambda params: iter_call_pages(
+            credentials,
+            dict(params, exposed_fields={"parties": True, "content": {"topics": True}, "interaction": {"speakers": True}}),
+            GONG_SYNC_MAX_RECORDS,
+            time_budget,
+            extensive=True
+        )
+    )
+    return {
+        "success": True,
+        "sync": sync
+    }
+
+def analytics_range(params: Dict[str, Any]) -> Tuple[str, str]:
+    """Date range for call_rollup / call_trends, defaulting to the last 90 days."""
+    now = datetime.utcnow()
+    from_date = params.get('from_date') or (now - timedelta(days=90)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    to_date = params.get('to_date') or now.strftime('%Y-%m-%dT%H:%M:%SZ')
+    return from_date, to_date
+
+def compute_call_analytics(query_type: str, columns: Dict[str, List[Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the vectorized statistics engine (see call_stats) over call columns.
+    
+    Args:
+        query_type (str): call_rollup or call_trends
+        columns (Dict[str, List[Any]]): Per-call columns from the call store or the API
+        params (Dict[str, Any]): group_by (user, account, direction), bucket (day, week, month),
+            percentiles (list or comma-separated)
+        
+    Returns:
+        Dict[str, Any]: Statistics result
+    """
+    if not NUMPY_AVAILABLE:
+        return {
+            "success": False,
+            "error": "numpy is not installed",
+            "message": f"{query_type} requires numpy in the Lambda package or a layer"
+        }
+    
+    group_by = params.get('group_by') or None
+    if group_by is not None and group_by not in GROUP_KEYS:
+        return {
+            "success": False,
+            "error": f"Unsupported group_by: {group_by}",
+            "message": f"Supported group_by values are: {', '.join(GROUP_KEYS)}"
+        }
+    
+    call_columns = CallColumns(columns)
+    if query_type == 'call_trends':
+        bucket = params.get('bucket', 'week')
+        if bucket not in BUCKETS:
+            return {
+                "success": False,
+                "error": f"Unsupported bucket: {bucket}",
+                "message": f"Supported buckets are: {', '.join(BUCKETS)}"
+            }
+        return {"success": True, "results": trends(call_columns, bucket, group_by)}
+    
+    percentiles = params.get('percentiles')
+    if isinstance(percentiles, str):
+        percentiles = [p for p in percentiles.split(',') if p.strip()]
+    percentiles = [float(p) for p in percentiles] if percentiles else None
+    return {"success": True, "results": rollup(call_columns, group_by, percentiles)}
+
+def get_call_analytics(credentials: Dict[str, str], query_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    call_rollup / call_trends over calls read from the Gong API (used when the
+    call store does not cover the range).
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        query_type (str): call_rollup or call_trends
+        params (Dict[str, Any]): Query parameters (date range, grouping, max_records)
+        
+    Returns:
+        Dict[str, Any]: Statistics result
+    """
+    from_date, to_date = analytics_range(params)
+    page_params = {
+        'from_date': from_date,
+        'to_date': to_date,
+        'workspace_id': params.get('workspace_id'),
+        'exposed_fields': {"parties": True, "interaction": {"speakers": True}}
+    }
+    max_records = params.get('max_records') or GONG_STATS_MAX_RECORDS
+    columns = columns_from_calls(iter_calls(credentials, page_params, max_records, params.get('time_budget'), extensive=True))
+    result = compute_call_analytics(query_type, columns, params)
+    result["source"] = "api"
+    return result
+
+def answer_from_store(
+    query_type: str,
+    params: Dict[str, Any],
+    company_name: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Answer a query from the local call store when it covers the requested range.
+    
+    Args:
+        query_type (str): calls, search_company, topics, call_rollup or call_trends
+        params (Dict[str, Any]): Combined query parameters
+        company_name (Optional[str]): Company name for search_company
+        
+    Returns:
+        Optional[Dict[str, Any]]: Result, or None when the query has to go to the Gong API
+    """
+    if str(params.get('source', '')).lower() == 'live' or params.get('workspace_id') or params.get('cursor'):
+        return None
+    # stats stays on the live path: its response is Gong's own stats/activity shape
+    if query_type not in ('calls', 'search_company', 'topics', 'call_rollup', 'call_trends'):
+        return None
+    
+    store = get_call_store(shared_store)
+    now = datetime.utcnow()
+    
+    if query_type == 'topics':
+        topics = store.call_topics(params['call_id']) if params.get('call_id') else None
+        if topics is None:
+            return None
+        return {"success": True, "results": topics, "count": len(topics), "source": "store"}
+    
+    if query_type in ('call_rollup', 'call_trends'):
+        from_date, to_date = analytics_range(params)
+    elif query_type == 'search_company':
+        from_date = (now - timedelta(days=365)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        to_date = now.strftime('%Y-%m-%dT%H:%M:%SZ')
+    else:
+        from_date = params.get('from_date')
+        to_date = params.get('to_date')
+    
+    if not store.covers(from_date, to_date):
+        return None
+    
+    if query_type in ('call_rollup', 'call_trends'):
+        columns = store.stats_columns(from_date, to_date, params.get('user_ids'))
+        result = compute_call_analytics(query_type, columns, params)
+        result["source"] = "store"
+        return result
+    
+    if query_type == 'calls':
+        limit = params.get('max_records') or params.get('limit') or GONG_MAX_RECORDS
+        calls = store.query_calls(from_date, to_date, limit)
+        return {
+            "success": True,
+            "results": calls,
+            "count": len(calls),
+            "cursor": None,
+            "source": "store"
+        }
+    
+    if query_type == 'search_company':
+        found = store.search_company(company_name, from_date, to_date, int(params.get('limit', 10)))
+        return {
+            "success": True,
+            "results": found['results'],
+            "count": len(found['results']),
+            "total_matches": found['total_matches'],
+            "search_company": company_name,
+            "source": "store"
+        }
+
+def scan_calls_by_company(credentials: Dict[str, str], company_name: str, limit: int = 10) -> Dict[str, Any]:
+    """
+    Search for calls by company name in titles, paging through the last year of calls.
+    Used when the company call index is unavailable.
+    
+    Args:
+        credentials (Dict[str, str]): Gong API credentials
+        company_name (str): Name of the company to search for
+        limit (int): Maximum number of results to return
+        
+    Returns:
+        Dict[str, Any]: Search results
+    """
+    # Page through the last year of calls, stopping once enough titles match
+    params = {
+        'from_date': (datetime.utcnow() - timedelta(days=365)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'to_date': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    }
+    
+    matching_calls = []
+    company_name_lower = company_name.lower()
+    scanned = 0
+    
+    for call in iter_calls(credentials, params):
+        scanned += 1
+        title = (call.get('title') or '').lower()
+        if company_name_lower in title:
+            matching_calls.append(call)
+            if len(matching_calls) >= limit:
+                break
+    
+    return {
+        "success": True,
+        "results": matching_calls,
+        "count": len(matching_calls),
+        "calls_scanned": scanned,
+        "search_company": company_name,
+        "source": "scan"
+    }
+
 def search_calls_by_company(credentials: Dict[str, str], company_name: str, limit: int = 10) -> Dict[str, Any]:
     """
     Search for calls related to a specific company.
     
+    Looks the company up in the call index (title, CRM account and participant
+    domain tokens) and fetches details only for the matching calls. A built
+    index gets a short incremental refresh first. While the index is still
+    being built (a partial index only holds the oldest calls of its window)
+    the search goes straight to a title scan and the build is left to a
+    background refresh_call_index invocation (see start_call_index_build).
+    
     Args:
         credentials (Dict[str, str]): Gong API credentials
-        company_name (str): Name of the company to search for
+        company_name (str): Name or domain of the company to search for
         limit (int): Maximum number of results to return
         
     Returns:
         Dict[str, Any]: Search results
     """
     try:
-        # Get recent calls and filter by company name in title
-        params = {
-            'limit': limit * 5,  # Get more results to filter through
-            'from_date': (datetime.utcnow() - timedelta(days=365)).strftime('%Y-%m-%dT%H:%M:%SZ'),
-            'to_date': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
-        }
-        
-        all_calls = get_calls(credentials, params)
+        limit = int(limit)
+        index = get_call_index(shared_store)
+        if not index.is_built():
+            info = index.info()
+            print(f"Call index still building ({info['calls']} calls), scanning titles instead")
+            info['build_requested'] = start_call_index_build()
+            return dict(scan_calls_by_company(credentials, company_name, limit), index=info)
         
-        if not all_calls.get('success'):
-            return all_calls
+        try:
+            refresh_call_index(credentials)
+        except Exception as e:
+            print(f"Call index refresh failed, searching the last refreshed index: {str(e)}")
         
-        # Filter calls by company name
-        matching_calls = []
-        company_name_lower = company_name.lower()
+        entries = index.lookup(company_name)
+        details = get_calls_by_ids(credentials, [entry['id'] for entry in entries[:limit]])
         
-        for call in all_calls.get('results', []):
-            title = call.get('title', '').lower()
-            if company_name_lower in title:
-                matching_calls.append(call)
-                
-        # Limit results
-        matching_calls = matching_calls[:limit]
+        if details.get('success'):
+            results = details['results']
+        else:
+            # Index entries still identify the calls when the detail fetch fails
+            print(f"Call detail fetch failed: {details.get('error')}")
+            results = [
+                {"id": entry['id'], "title": entry.get('title'), "started": entry.get('started')}
+                for entry in entries[:limit]
+            ]
         
         return {
             "success": True,
-            "results": matching_calls,
-            "count": len(matching_calls),
-            "search_company": company_name
+            "results": results,
+            "count": len(results),
+            "total_matches": len(entries),
+            "search_company": company_name,
+            "source": "index",
+            "index": index.info()
         }
         
     except Exception as e:
@@ -582,7 +1312,8 @@ def get_gong_data(
     Matches the Bedrock Agent function schema signature.
     
     Args:
-        query_type (str): Type of data to retrieve (calls, topics, stats, call_details, transcript, search_company)
+        query_type (str): Type of data to retrieve (calls, topics, stats, call_details, transcript, transcripts,
+            search_company, refresh_call_index, sync_calls, call_rollup, call_trends)
         date_range (Dict[str, str]): Time range for data retrieval
         filters (Dict[str, Any]): Additional filters to apply
         call_id (str): Specific call ID for detailed queries
@@ -605,13 +1336,6 @@ def get_gong_data(
             # Convert string date range to proper from/to format
             date_range = parse_date_range_string(date_range)
         
-        # Use environment variables or defaults for these values
-        secret_name = os.environ.get('GONG_CREDENTIALS_SECRET', 'gong-credentials')
-        region_name = os.environ.get('AWS_REGION', 'us-east-1')
-        
-        # Get Gong credentials
-        credentials = get_gong_credentials(secret_name, region_name)
-        
         # Combine parameters
         params = {
             'from_date': date_range.get('from') if isinstance(date_range, dict) else None,
@@ -620,6 +1344,29 @@ def get_gong_data(
             **filters
         }
         
+        # Serve from the synced local call store when it covers the request
+        try:
+            result = answer_from_store(query_type, params, company_name)
+        except Exception as e:
+            print(f"Call store unavailable, querying Gong: {str(e)}")
+            result = None
+        if result is not None:
+            trace_data_operation(
+                operation_type="GONG_STORE_QUERY",
+                data_source="GONG",
+                query_summary=f"{query_type} from local call store",
+                result_count=result.get('count', 1),
+                execution_time_ms=int((time.time() - start_time) * 1000)
+            )
+            return result
+        
+        # Use environment variables or defaults for these values
+        secret_name = os.environ.get('GONG_CREDENTIALS_SECRET', 'gong-credentials')
+        region_name = os.environ.get('AWS_REGION', 'us-east-1')
+        
+        # Get Gong credentials
+        credentials = get_gong_credentials(secret_name, region_name)
+        
         # Call appropriate function based on query type
         if query_type == 'calls':
             result = get_calls(credentials, params)
@@ -666,7 +1413,8 @@ def get_gong_data(
                     "error": "call_id is required for transcript query",
                     "message": "Please provide a call_id to get transcript"
                 }
-            result = get_call_transcript(credentials, call_id)
+            result = get_call_transcript(credentials, call_id, as_bool(filters.get('use_cache', True)))
+            reduce_transcript_results(credentials, [result], filters)
             
             # Trace operation
             execution_time_ms = int((time.time() - start_time) * 1000)
@@ -680,6 +1428,39 @@ def get_gong_data(
             
             return result
             
+        elif query_type == 'transcripts':
+            # Several calls at once: filters.call_ids (list) or a comma-separated call_id
+            call_ids = filters.get('call_ids') or (call_id.split(',') if call_id else [])
+            if isinstance(call_ids, str):
+                call_ids = call_ids.split(',')
+            call_ids = [str(cid).strip() for cid in call_ids if str(cid).strip()]
+            if not call_ids:
+                return {
+                    "success": False,
+                    "error": "call_ids is required for transcripts query",
+                    "message": "Please provide filters.call_ids or a comma-separated call_id to get transcripts"
+                }
+            result = get_call_transcripts(
+                credentials,
+                call_ids,
+                filters.get('concurrency', GONG_TRANSCRIPT_CONCURRENCY),
+                as_bool(filters.get('use_cache', True))
+            )
+            if result.get('results'):
+                result['metadata']['reduction'] = reduce_transcript_results(credentials, result['results'], filters)
+            
+            # Trace operation
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            trace_data_operation(
+                operation_type="GONG_API_CALL",
+                data_source="GONG",
+                query_summary=f"get_call_transcripts for {len(call_ids)} calls",
+                result_count=result.get('count', 0),
+                execution_time_ms=execution_time_ms
+            )
+            
+            return result
+            
         elif query_type == 'search_company':
             if not company_name:
                 return {
@@ -704,6 +1485,51 @@ def get_gong_data(
             
             return result
             
+        elif query_type in ('call_rollup', 'call_trends'):
+            result = get_call_analytics(credentials, query_type, params)
+            
+            # Trace operation
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            trace_data_operation(
+                operation_type="GONG_API_CALL",
+                data_source="GONG",
+                query_summary=f"{query_type} with params: {str(params)[:50]}...",
+                result_count=result.get('results', {}).get('calls', 0) if result.get('success') else 0,
+                execution_time_ms=execution_time_ms
+            )
+            
+            return result
+            
+        elif query_type == 'sync_calls':
+            result = sync_call_store(credentials)
+            
+            # Trace operation
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            trace_data_operation(
+                operation_type="GONG_API_CALL",
+                data_source="GONG",
+                query_summary="sync_call_store",
+                result_count=result['sync']['calls_stored'],
+                execution_time_ms=execution_time_ms
+            )
+            
+            return result
+            
+        elif query_type == 'refresh_call_index':
+            result = refresh_call_index(credentials, force=bool(filters.get('force', False)), time_budget=sync_time_budget())
+            
+            # Trace operation
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            trace_data_operation(
+                operation_type="GONG_API_CALL",
+                data_source="GONG",
+                query_summary="refresh_call_index",
+                result_count=result.get('refresh', {}).get('calls_fetched', 0),
+                execution_time_ms=execution_time_ms
+            )
+            
+            return result
+            
         elif query_type == 'topics':
             result = get_call_topics(credentials, params)
             
@@ -741,7 +1567,7 @@ def get_gong_data(
             return {
                 "success": False,
                 "error": f"Unknown query_type: {query_type}",
-                "message": "Supported query types are: calls, call_details, transcript, search_company, topics, stats"
+                "message": "Supported query types are: calls, call_details, transcript, transcripts, search_company, refresh_call_index, sync_calls, call_rollup, call_trends, topics, stats"
             }
             
     except Exception as e:
@@ -765,6 +1591,8 @@ def lambda_handler(event, context):
     
     Also supports a debug mode for troubleshooting credential issues.
     """
+    global invocation_context
+    invocation_context = context
     try:
         print(f"Received event: {json.dumps(event)}")
         
@@ -0,0 +1,104 @@
+"""
+RevOps AI Framework V2 - Gong API Rate Limiter
+
+Token bucket shared by every Gong request made from this container, so
+parallel fetches stay within Gong's per-second quota (3 requests/second by
+default). When Gong answers 429, the Retry-After delay pauses the whole
+bucket rather than only the request that was rejected, so the other worker
+threads back off too instead of collecting 429s of their own.
+
+    GONG_RATE_LIMIT_PER_SECOND   sustained requests per second (default 3)
+    GONG_RATE_LIMIT_BURST        requests allowed back to back (default 3)
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Any, Optional
+
+RATE_LIMIT_PER_SECOND = float(os.environ.get('GONG_RATE_LIMIT_PER_SECOND', '3'))
+RATE_LIMIT_BURST = float(os.environ.get('GONG_RATE_LIMIT_BURST', '3'))
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with a shared pause for Retry-After responses.
+    """
+    
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, capacity: float = RATE_LIMIT_BURST):
+        """
+        Initialize the bucket full.
+        
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum tokens held
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.stats = {'acquired': 0, 'waits': 0, 'wait_ms': 0, 'pauses': 0}
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, sleeping until one is available.
+        
+        Args:
+            timeout (Optional[float]): Seconds to wait at most; None waits indefinitely
+        
+        Returns:
+            bool: True if a token was taken, False if the timeout expired first
+        """
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.stats['acquired'] += 1
+                    if waited:
+                        self.stats['waits'] += 1
+                        self.stats['wait_ms'] += int((now - start) * 1000)
+                    return True
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            if timeout is not None and now + delay - start > timeout:
+                return False
+            waited = True
+            time.sleep(delay)
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a while (Gong Retry-After).
+        
+        Args:
+            seconds (float): Seconds to pause
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            # Start from an empty bucket afterwards so requests resume at the sustained rate
+            self.tokens = 0
+            self.stats['pauses'] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, rate=self.rate, capacity=self.capacity)
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> TokenBucket:
+    """
+    Get the module-level Gong rate limiter, creating it on first use.
+    
+    Returns:
+        TokenBucket: Limiter instance
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = TokenBucket()
+        return _limiter
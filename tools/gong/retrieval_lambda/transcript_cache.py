@@ -0,0 +1,319 @@
+"""
+RevOps AI Framework V2 - Gong Transcript Cache
+
+A Gong transcript does not change once the call has been processed, so it is
+fetched from the API once and then served from cache, keyed by call_id:
+    1. in-memory LRU of compressed transcripts, bounded by total bytes
+    2. /tmp directory for the lifetime of the container, bounded by total bytes
+    3. shared tier (GONG_SHARED_STORE_URI) so other containers reuse the fetch
+
+Transcripts are stored as compressed JSON: zstd when the zstandard package is
+installed, gzip otherwise. Blobs are decoded by their magic bytes, so both
+kinds can be read whichever codec is active. Empty transcripts (call not
+processed yet) are never cached. The call's parties, used to name speakers
+when a transcript is reduced, are cached next to it (key "<call_id>.parties")
+so a cached transcript needs no call lookup either.
+
+    GONG_TRANSCRIPT_CACHE_DIR         /tmp directory (default /tmp/gong_transcripts)
+    GONG_TRANSCRIPT_CACHE_MEMORY_MB   in-memory LRU size (default 64)
+    GONG_TRANSCRIPT_CACHE_DISK_MB     /tmp size (default 256)
+"""
+
+import os
+import re
+import json
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+# Optional dependency: zstd compresses transcripts better and faster than gzip
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+CACHE_DIR = os.environ.get('GONG_TRANSCRIPT_CACHE_DIR', '/tmp/gong_transcripts')
+CACHE_MEMORY_BYTES = int(float(os.environ.get('GONG_TRANSCRIPT_CACHE_MEMORY_MB', '64')) * 1024 * 1024)
+CACHE_DISK_BYTES = int(float(os.environ.get('GONG_TRANSCRIPT_CACHE_DISK_MB', '256')) * 1024 * 1024)
+SHARED_KEY_PREFIX = 'transcripts/'
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+def compress_transcript(transcript: Dict[str, Any]) -> bytes:
+    """
+    Compressed JSON form of a transcript.
+    
+    Args:
+        transcript (Dict[str, Any]): Transcript as returned by the Gong API
+    
+    Returns:
+        bytes: zstd or gzip compressed JSON
+    """
+    data = json.dumps(transcript, separators=(',', ':')).encode('utf-8')
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=9).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def decompress_transcript(blob: bytes) -> Dict[str, Any]:
+    """
+    Decode a cached transcript, detecting the codec from its magic bytes.
+    
+    Args:
+        blob (bytes): Compressed JSON
+    
+    Returns:
+        Dict[str, Any]: Transcript
+    """
+    if blob.startswith(ZSTD_MAGIC):
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Cached transcript is zstd-compressed but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(blob)
+    elif blob.startswith(GZIP_MAGIC):
+        data = gzip.decompress(blob)
+    else:
+        data = blob
+    return json.loads(data.decode('utf-8'))
+
+def is_complete_transcript(transcript: Any) -> bool:
+    """
+    Whether a transcript response has content worth caching. Gong returns an
+    empty callTranscripts list until a call has been processed.
+    
+    Args:
+        transcript (Any): Transcript response
+    
+    Returns:
+        bool: True if the transcript has sentences
+    """
+    if not transcript or not isinstance(transcript, dict):
+        return False
+    if 'callTranscripts' in transcript:
+        entries = transcript.get('callTranscripts') or []
+        return any(isinstance(entry, dict) and entry.get('transcript') for entry in entries)
+    return True
+
+class TranscriptCache:
+    """
+    Compressed transcripts by call_id across memory, /tmp and a shared tier.
+    """
+    
+    def __init__(self, directory: str = CACHE_DIR, shared_store=None,
+                 max_memory_bytes: int = CACHE_MEMORY_BYTES, max_disk_bytes: int = CACHE_DISK_BYTES):
+        """
+        Initialize the cache.
+        
+        Args:
+            directory (str): /tmp directory for the disk tier
+            shared_store: Optional shared blob store (see firebolt_common.shared_store)
+            max_memory_bytes (int): Compressed bytes kept in memory
+            max_disk_bytes (int): Compressed bytes kept in the directory
+        """
+        self.directory = directory
+        self.shared_store = shared_store
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'shared_hits': 0, 'misses': 0, 'stored': 0,
+                      'raw_bytes': 0, 'stored_bytes': 0}
+    
+    def _file_name(self, call_id: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_-]', '_', str(call_id)) + '.json.z'
+    
+    def _remember(self, call_id: str, blob: bytes) -> None:
+        with self._lock:
+            previous = self._memory.pop(call_id, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            if len(blob) > self.max_memory_bytes:
+                return
+            self._memory[call_id] = blob
+            self._memory_bytes += len(blob)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+    
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+    
+    def _lookup(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Compressed blob for a cache key and the tier it came from, or (None, None)."""
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                return blob, 'memory'
+        
+        path = os.path.join(self.directory, self._file_name(key))
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+            self._remember(key, blob)
+            return blob, 'disk'
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Transcript cache file unreadable for {key}: {str(e)}")
+        
+        if self.shared_store is not None:
+            try:
+                blob = self.shared_store.get(SHARED_KEY_PREFIX + self._file_name(key))
+                if blob:
+                    self._remember(key, blob)
+                    self._write_file(key, blob)
+                    return blob, 'shared'
+            except Exception as e:
+                print(f"Transcript cache shared tier read failed for {key}: {str(e)}")
+        return None, None
+    
+    def _store(self, key: str, blob: bytes) -> None:
+        self._remember(key, blob)
+        self._write_file(key, blob)
+        if self.shared_store is not None:
+            try:
+                self.shared_store.put(SHARED_KEY_PREFIX + self._file_name(key), blob)
+            except Exception as e:
+                print(f"Transcript cache shared tier write failed for {key}: {str(e)}")
+    
+    def get(self, call_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Cached transcript for a call.
+        
+        Args:
+            call_id (str): Gong call ID
+        
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Optional[str]]: Transcript and the tier it came
+            from ('memory', 'disk', 'shared'), or (None, None) on a miss
+        """
+        blob, tier = self._lookup(str(call_id))
+        if blob is not None:
+            try:
+                transcript = decompress_transcript(blob)
+                self._count(f"{tier}_hits")
+                return transcript, tier
+            except Exception as e:
+                print(f"Transcript cache entry unreadable for {call_id}: {str(e)}")
+        
+        self._count('misses')
+        return None, None
+    
+    def put(self, call_id: str, transcript: Dict[str, Any]) -> bool:
+        """
+        Cache a fetched transcript in every tier.
+        
+        Args:
+            call_id (str): Gong call ID
+            transcript (Dict[str, Any]): Transcript response
+        
+        Returns:
+            bool: True if the transcript was cached (empty transcripts are skipped)
+        """
+        if not is_complete_transcript(transcript):
+            return False
+        blob = compress_transcript(transcript)
+        self._store(str(call_id), blob)
+        with self._lock:
+            self.stats['stored'] += 1
+            self.stats['raw_bytes'] += len(json.dumps(transcript, separators=(',', ':')))
+            self.stats['stored_bytes'] += len(blob)
+        return True
+    
+    def get_parties(self, call_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached parties of a call (see put_parties).
+        
+        Args:
+            call_id (str): Gong call ID
+        
+        Returns:
+            Optional[List[Dict[str, Any]]]: Parties, or None on a miss
+        """
+        blob, _ = self._lookup(f"{call_id}.parties")
+        if blob is None:
+            return None
+        try:
+            return decompress_transcript(blob).get('parties')
+        except Exception as e:
+            print(f"Cached parties unreadable for {call_id}: {str(e)}")
+            return None
+    
+    def put_parties(self, call_id: str, parties: List[Dict[str, Any]]) -> None:
+        """
+        Cache the parties of a call, which name the speakers of its transcript.
+        
+        Args:
+            call_id (str): Gong call ID
+            parties (List[Dict[str, Any]]): Call parties from the calls API
+        """
+        self._store(f"{call_id}.parties", compress_transcript({'parties': parties}))
+    
+    def _write_file(self, call_id: str, blob: bytes) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, self._file_name(call_id))
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+            self._trim_directory()
+        except Exception as e:
+            print(f"Transcript cache file write failed for {call_id}: {str(e)}")
+    
+    def _trim_directory(self) -> None:
+        """Remove the least recently written files once the directory exceeds its size."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json.z'):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        while total > self.max_disk_bytes and entries:
+            _, size, path = entries.pop(0)
+            os.remove(path)
+            total -= size
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit counts per tier, hit rate, compression ratio and memory use."""
+        with self._lock:
+            stats = dict(self.stats)
+            memory_entries = len(self._memory)
+            memory_bytes = self._memory_bytes
+        hits = stats['memory_hits'] + stats['disk_hits'] + stats['shared_hits']
+        lookups = hits + stats['misses']
+        stats.update({
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'compression_ratio': round(stats['raw_bytes'] / stats['stored_bytes'], 2) if stats['stored_bytes'] else None,
+            'codec': 'zstd' if ZSTD_AVAILABLE else 'gzip',
+            'memory_entries': memory_entries,
+            'memory_bytes': memory_bytes
+        })
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_transcript_cache(shared_store=None) -> TranscriptCache:
+    """
+    Get the module-level transcript cache, creating it on first use.
+    
+    Args:
+        shared_store: Shared blob store used when the cache is created
+    
+    Returns:
+        TranscriptCache: Cache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptCache(shared_store=shared_store)
+        return _cache
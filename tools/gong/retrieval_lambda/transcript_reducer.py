@@ -0,0 +1,270 @@
+"""
+RevOps AI Framework V2 - Gong Transcript Reducer
+
+Streaming reduction of raw Gong transcripts before they are returned to the
+agent. A raw transcript is a list of per-sentence objects with speaker ids
+and millisecond timestamps; most of those bytes carry no meaning for deal
+analysis. The pipeline is a chain of generators over the sentences:
+    1. sentences are read in order from the Gong response
+    2. filler tokens (um, uh, hmm, ...) are dropped
+    3. consecutive sentences by the same speaker are merged into one turn
+    4. optionally only turns inside MEDDPICC keyword windows are kept
+Speaker ids are resolved to names and roles once per call, from the call's
+parties, and listed in a single speakers map rather than on every turn.
+"""
+
+import re
+import json
+from collections import deque
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+# Rough size of a model token in bytes of English text
+BYTES_PER_TOKEN = 4
+
+# Disfluencies only: multi-word phrases such as "you know" also occur with real meaning
+FILLER_PATTERN = re.compile(r"(?<![\w'])(?:u+m+|u+h+|uhm+|e+r+m+|er|a+h+|h+m+|m{2,}|mhm+)(?![\w'])[,.]?\s*", re.IGNORECASE)
+SPACE_PATTERN = re.compile(r"\s{2,}")
+
+# Keywords that mark the parts of a call relevant to MEDDPICC qualification
+MEDDPICC_KEYWORDS = {
+    'metrics': ['roi', 'return on investment', 'kpi', 'save', 'savings', 'cost', 'reduce', 'faster', 'latency',
+                'performance', 'percent', 'budget', 'spend', 'revenue'],
+    'economic_buyer': ['cfo', 'cto', 'ceo', 'vp', 'budget owner', 'sign off', 'signs off', 'approve', 'approval',
+                       'final say', 'decision maker', 'exec', 'executive'],
+    'decision_criteria': ['criteria', 'requirement', 'requirements', 'must have', 'evaluate', 'evaluation',
+                          'benchmark', 'poc', 'proof of concept', 'compare', 'scalability', 'security'],
+    'decision_process': ['timeline', 'next step', 'next steps', 'decide', 'decision', 'process', 'stakeholders',
+                         'committee', 'by end of', 'quarter', 'q1', 'q2', 'q3', 'q4'],
+    'paper_process': ['contract', 'legal', 'procurement', 'msa', 'dpa', 'security review', 'purchase order',
+                      'po', 'redlines', 'terms', 'pricing', 'invoice'],
+    'identify_pain': ['pain', 'problem', 'issue', 'challenge', 'struggle', 'struggling', 'slow', 'expensive',
+                      'frustrat*', 'bottleneck', 'outage', 'broken', "can't", 'cannot'],
+    'champion': ['champion', 'internally', 'advocate', 'push for', 'sell this', 'on board', 'my boss', 'our team'],
+    'competition': ['snowflake', 'databricks', 'bigquery', 'redshift', 'clickhouse', 'competitor', 'alternative',
+                    'incumbent', 'versus', 'vs']
+}
+
+def _keyword_pattern(words: List[str]) -> re.Pattern:
+    # Whole words only, so 'po' does not match 'point'; a trailing * marks a stem ('frustrat*')
+    alternatives = [
+        re.escape(word[:-1]) + r"[a-z]*" if word.endswith('*') else re.escape(word)
+        for word in sorted(words, key=len, reverse=True)
+    ]
+    return re.compile(r"(?<![a-z0-9])(?:" + "|".join(alternatives) + r")(?![a-z0-9])", re.IGNORECASE)
+
+MEDDPICC_PATTERNS = {category: _keyword_pattern(words) for category, words in MEDDPICC_KEYWORDS.items()}
+
+def estimate_tokens(num_bytes: int) -> int:
+    """Approximate model tokens for a number of bytes of text."""
+    return (num_bytes + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+def format_timestamp(milliseconds: Optional[int]) -> Optional[str]:
+    """Call offset in milliseconds as [h:]mm:ss."""
+    if milliseconds is None:
+        return None
+    seconds = int(milliseconds) // 1000
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+def build_speaker_map(parties: Optional[List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Speaker id -> name and role from a call's parties.
+    
+    Args:
+        parties (Optional[List[Dict[str, Any]]]): Parties from calls/extensive
+    
+    Returns:
+        Dict[str, Dict[str, Any]]: name, role (internal/external) and title per speaker id
+    """
+    speakers = {}
+    for party in parties or []:
+        if not isinstance(party, dict) or not party.get('speakerId'):
+            continue
+        speaker = {
+            'name': party.get('name') or party.get('emailAddress') or f"Speaker {party['speakerId']}",
+            'role': str(party.get('affiliation') or 'unknown').lower(),
+            'title': party.get('title')
+        }
+        speakers[str(party['speakerId'])] = {k: v for k, v in speaker.items() if v is not None}
+    return speakers
+
+def call_transcripts(response: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Per-call transcript entries in a Gong transcript response.
+    
+    Args:
+        response (Dict[str, Any]): Raw transcript response
+    
+    Yields:
+        Dict[str, Any]: Entry with callId and a transcript list of speaker blocks
+    """
+    if not isinstance(response, dict):
+        return
+    if isinstance(response.get('callTranscripts'), list):
+        for entry in response['callTranscripts']:
+            if isinstance(entry, dict):
+                yield entry
+    elif isinstance(response.get('transcript'), list):
+        yield response
+
+def iter_sentences(entry: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Sentences of one call transcript in order, with their speaker.
+    
+    Args:
+        entry (Dict[str, Any]): Call transcript entry
+    
+    Yields:
+        Dict[str, Any]: speaker_id, start (ms) and text
+    """
+    for block in entry.get('transcript') or []:
+        if not isinstance(block, dict):
+            continue
+        speaker_id = str(block.get('speakerId', ''))
+        for sentence in block.get('sentences') or []:
+            if isinstance(sentence, dict) and sentence.get('text'):
+                yield {'speaker_id': speaker_id, 'start': sentence.get('start'), 'text': sentence['text']}
+
+def drop_fillers(sentences: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Remove filler tokens; sentences left empty are dropped.
+    
+    Args:
+        sentences (Iterable[Dict[str, Any]]): Sentences from iter_sentences
+    
+    Yields:
+        Dict[str, Any]: Sentences with filler-free text
+    """
+    for sentence in sentences:
+        text = SPACE_PATTERN.sub(' ', FILLER_PATTERN.sub('', sentence['text'])).strip(' ,')
+        if text and any(ch.isalnum() for ch in text):
+            yield dict(sentence, text=text[0].upper() + text[1:])
+
+def merge_turns(sentences: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Merge consecutive sentences by the same speaker into turns.
+    
+    Args:
+        sentences (Iterable[Dict[str, Any]]): Sentences in call order
+    
+    Yields:
+        Dict[str, Any]: speaker_id, start (ms) and merged text
+    """
+    turn = None
+    for sentence in sentences:
+        if turn is not None and sentence['speaker_id'] == turn['speaker_id']:
+            turn['parts'].append(sentence['text'])
+            continue
+        if turn is not None:
+            yield {'speaker_id': turn['speaker_id'], 'start': turn['start'], 'text': ' '.join(turn['parts'])}
+        turn = {'speaker_id': sentence['speaker_id'], 'start': sentence['start'], 'parts': [sentence['text']]}
+    if turn is not None:
+        yield {'speaker_id': turn['speaker_id'], 'start': turn['start'], 'text': ' '.join(turn['parts'])}
+
+def meddpicc_categories(text: str) -> List[str]:
+    """MEDDPICC categories whose keywords appear in a piece of text."""
+    return [category for category, pattern in MEDDPICC_PATTERNS.items() if pattern.search(text)]
+
+def meddpicc_windows(turns: Iterable[Dict[str, Any]], context_turns: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Keep only turns that mention a MEDDPICC keyword, plus context_turns turns
+    on either side. Matching turns are tagged with their categories.
+    
+    Args:
+        turns (Iterable[Dict[str, Any]]): Turns in call order
+        context_turns (int): Neighbouring turns kept around each match
+    
+    Yields:
+        Dict[str, Any]: Kept turns
+    """
+    before = deque(maxlen=max(0, context_turns))
+    after_remaining = 0
+    for turn in turns:
+        categories = meddpicc_categories(turn['text'])
+        if categories:
+            while before:
+                yield before.popleft()
+            yield dict(turn, meddpicc=categories)
+            after_remaining = context_turns
+        elif after_remaining > 0:
+            yield turn
+            after_remaining -= 1
+        elif context_turns > 0:
+            before.append(turn)
+
+def reduce_call_transcript(
+    entry: Dict[str, Any],
+    speakers: Optional[Dict[str, Dict[str, Any]]] = None,
+    meddpicc: bool = False,
+    context_turns: int = 1
+) -> Dict[str, Any]:
+    """
+    Reduce one call transcript to speaker turns.
+    
+    Args:
+        entry (Dict[str, Any]): Call transcript entry (callId, transcript)
+        speakers (Optional[Dict[str, Dict[str, Any]]]): Speaker map from build_speaker_map
+        meddpicc (bool): Keep only turns in MEDDPICC keyword windows
+        context_turns (int): Neighbouring turns kept around each MEDDPICC match
+    
+    Returns:
+        Dict[str, Any]: call_id, speakers used and the list of turns
+    """
+    speakers = speakers or {}
+    turns = merge_turns(drop_fillers(iter_sentences(entry)))
+    if meddpicc:
+        turns = meddpicc_windows(turns, context_turns)
+    
+    used = {}
+    reduced_turns = []
+    for turn in turns:
+        speaker = speakers.get(turn['speaker_id'])
+        name = speaker['name'] if speaker else f"Speaker {turn['speaker_id']}"
+        if name not in used:
+            used[name] = {k: v for k, v in (speaker or {}).items() if k != 'name'}
+        reduced = {'t': format_timestamp(turn['start']), 'speaker': name, 'text': turn['text']}
+        if turn.get('meddpicc'):
+            reduced['meddpicc'] = turn['meddpicc']
+        reduced_turns.append(reduced)
+    
+    return {
+        'call_id': entry.get('callId'),
+        'speakers': used,
+        'turns': reduced_turns
+    }
+
+def reduce_transcript(
+    response: Dict[str, Any],
+    parties: Optional[List[Dict[str, Any]]] = None,
+    meddpicc: bool = False,
+    context_turns: int = 1
+) -> Dict[str, Any]:
+    """
+    Reduce a raw Gong transcript response and report how much smaller it got.
+    
+    Args:
+        response (Dict[str, Any]): Raw transcript response
+        parties (Optional[List[Dict[str, Any]]]): Call parties used to name speakers
+        meddpicc (bool): Keep only turns in MEDDPICC keyword windows
+        context_turns (int): Neighbouring turns kept around each MEDDPICC match
+    
+    Returns:
+        Dict[str, Any]: Reduced transcripts plus byte and estimated-token reduction
+    """
+    speakers = build_speaker_map(parties)
+    calls = [reduce_call_transcript(entry, speakers, meddpicc, context_turns) for entry in call_transcripts(response)]
+    reduced = {'calls': calls}
+    
+    raw_bytes = len(json.dumps(response, separators=(',', ':')).encode('utf-8'))
+    reduced_bytes = len(json.dumps(reduced, separators=(',', ':')).encode('utf-8'))
+    reduced['reduction'] = {
+        'raw_bytes': raw_bytes,
+        'reduced_bytes': reduced_bytes,
+        'raw_tokens_est': estimate_tokens(raw_bytes),
+        'reduced_tokens_est': estimate_tokens(reduced_bytes),
+        'reduction_pct': round(100.0 * (1 - reduced_bytes / raw_bytes), 1) if raw_bytes else 0.0,
+        'turns': sum(len(call['turns']) for call in calls),
+        'meddpicc_filtered': meddpicc
+    }
+    return reduced